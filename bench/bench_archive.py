@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+# Times saving and loading snarks with the pickled_snarks and
+# snark_archive exporters/parsers, and loading a date range or a
+# few columns from an archive. Loaded snarks are checked against
+# the originals.
+
+import optparse
+import os
+import shutil
+import tempfile
+import urllib
+from datetime import timedelta
+
+import benchutils
+import synthetic
+
+from lib import common
+from lib import snarkarchive
+from lib import snarkutils
+
+
+FORMATS = ["pickled_snarks", "snark_archive"]
+
+
+def file_url(path):
+  """Returns a "file:" url for a local path."""
+  return "file:"+ urllib.pathname2url(os.path.abspath(path))
+
+def generate_processed_snarks(count):
+  """Returns snarks with the attributes an exporter would see."""
+  snarks = synthetic.generate_snarks(count, urls=True, multiline=0.05, bursts=0.01)
+  colors = [(i/40.0, 1-i/40.0, 0.5) for i in range(40)]
+  for (i, snark) in enumerate(snarks):
+    snark["time"] = snark["date"] - snarks[0]["date"]
+    snark["color"] = colors[i % len(colors)]
+  return snarks
+
+
+def save(format_name, snarks, path):
+  exporter_mod = snarkutils.get_exporter(format_name)
+  with open(path, "wb") as f:
+    exporter_mod.write_snarks(f, snarks, timedelta(seconds=6), {})
+
+def load(format_name, path):
+  parser_mod = snarkutils.get_parser(format_name)
+  return parser_mod.fetch_snarks(file_url(path), None, {})
+
+def load_range(path, since_date, until_date):
+  with snarkarchive.ArchiveReader(path) as reader:
+    return reader.read_snarks(since_date=since_date, until_date=until_date)
+
+def load_columns(path, columns):
+  with snarkarchive.ArchiveReader(path) as reader:
+    return reader.read_snarks(columns=columns)
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--sizes", dest="sizes", default="100k,1m",
+                        help="comma-separated snark counts [default: %default]")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  work_dir = tempfile.mkdtemp(prefix="compilesubs_bench_")
+
+  results = []
+  mismatches = 0
+  def add_result(count, format_name, operation, snarks_out, wall_seconds, cpu_seconds, byte_count, identical):
+    print "%10d %15s %10s %10d %10.2f %10.2f %12d %10s" % (count, format_name, operation, snarks_out, wall_seconds, cpu_seconds, byte_count, identical)
+    results.append({"snarks":count, "format":format_name, "operation":operation, "snarks_out":snarks_out,
+                    "wall_seconds":wall_seconds, "cpu_seconds":cpu_seconds, "bytes":byte_count, "identical":identical})
+
+  try:
+    print "%10s %15s %10s %10s %10s %10s %12s %10s" % ("snarks", "format", "operation", "out", "wall (s)", "cpu (s)", "bytes", "identical")
+    for count in benchutils.parse_sizes(options.sizes):
+      snarks = generate_processed_snarks(count)
+
+      for format_name in FORMATS:
+        path = os.path.join(work_dir, "archive_%s" % format_name)
+        ignored, wall_seconds, cpu_seconds = benchutils.time_call(save, format_name, snarks, path)
+        add_result(count, format_name, "save", count, wall_seconds, cpu_seconds, os.path.getsize(path), None)
+
+        loaded, wall_seconds, cpu_seconds = benchutils.time_call(load, format_name, path)
+        identical = (loaded == snarks)
+        if (not identical): mismatches += 1
+        add_result(count, format_name, "load", len(loaded), wall_seconds, cpu_seconds, os.path.getsize(path), identical)
+        del loaded
+
+        if (format_name == "snark_archive" and count > 0):
+          # An hour from the middle.
+          since_date = snarks[count // 2]["date"]
+          until_date = since_date + timedelta(hours=1)
+          expected = [x for x in snarks if (since_date <= x["date"] <= until_date)]
+          loaded, wall_seconds, cpu_seconds = benchutils.time_call(load_range, path, since_date, until_date)
+          identical = (loaded == expected)
+          if (not identical): mismatches += 1
+          add_result(count, format_name, "range", len(loaded), wall_seconds, cpu_seconds, 0, identical)
+          del loaded, expected
+
+          loaded, wall_seconds, cpu_seconds = benchutils.time_call(load_columns, path, ["user", "msg"])
+          identical = (loaded == [{"user":x["user"], "msg":x["msg"]} for x in snarks])
+          if (not identical): mismatches += 1
+          add_result(count, format_name, "columns", len(loaded), wall_seconds, cpu_seconds, 0, identical)
+          del loaded
+
+        os.remove(path)
+
+      del snarks
+
+  finally:
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "archive", results)
+
+  if (mismatches > 0):
+    print "Loaded snarks differed from the originals %d times." % mismatches
+    raise SystemExit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+# Times exporting and parsing archives with each compression codec,
+# reporting file sizes alongside CPU seconds, to weigh I/O saved
+# against CPU spent. Parsed snarks are checked against the
+# uncompressed archive's.
+
+import optparse
+import os
+import shutil
+import tempfile
+import urllib
+from datetime import timedelta
+
+import benchutils
+import synthetic
+
+from lib import common
+from lib import compression
+from lib import snarkutils
+
+
+FORMATS = ["tabbed_text", "pickled_snarks", "jsonl", "tweetsubs_log"]
+CODECS = [None, "gzip", "bz2", "xz"]
+
+
+def file_url(path):
+  """Returns a "file:" url for a local path."""
+  return "file:"+ urllib.pathname2url(os.path.abspath(path))
+
+def get_extension(codec):
+  """Returns the file extension for a codec (or "" for None)."""
+  for (ext, ext_codec) in compression.extensions.items():
+    if (ext_codec == codec): return ext
+  return ""
+
+
+def export_archive(format_name, snarks, path):
+  """Writes snarks with an exporter, as export_snarks() would."""
+  config = common.Bunch(exporter_name=format_name, dest_path=path, exporter_options={},
+                        show_time=timedelta(seconds=6))
+  snarkutils.export_snarks(config, snarks)
+
+def write_log(snarks, path):
+  """Writes a TweetSubs log (which has no exporter), compressing as needed."""
+  with common.atomic_write(path) as f:
+    codec = compression.get_codec(path)
+    if (codec):
+      with compression.CompressedWriter(f, codec) as compressed_file:
+        synthetic.write_tweetsubs_log(compressed_file, snarks)
+    else:
+      synthetic.write_tweetsubs_log(f, snarks)
+
+def parse_archive(format_name, path):
+  """Calls a parser's fetch_snarks() on a local file."""
+  parser_mod = snarkutils.get_parser(format_name)
+  return parser_mod.fetch_snarks(file_url(path), None, {})
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--sizes", dest="sizes", default="100k",
+                        help="comma-separated snark counts [default: %default]")
+  arg_parser.add_option("--formats", dest="formats", default=",".join(FORMATS),
+                        help="comma-separated archive formats [default: %default]")
+  arg_parser.add_option("--disk-mbps", dest="disk_mbps", type="float", default=50.0,
+                        help="storage throughput to estimate I/O time with [default: %default]")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  format_names = [x.strip() for x in options.formats.split(",") if (x.strip())]
+  for name in format_names:
+    if (name not in FORMATS):
+      arg_parser.error("Unsupported archive format: %s" % name)
+
+  codecs = [codec for codec in CODECS if (codec is None or compression.is_available(codec))]
+  for codec in CODECS:
+    if (codec not in codecs): print "Skipping the %s codec (unavailable)." % codec
+
+  work_dir = tempfile.mkdtemp(prefix="compilesubs_bench_")
+
+  results = []
+  mismatches = 0
+  try:
+    print "%10s %15s %6s %12s %7s %10s %10s %10s %10s %12s" % ("snarks", "format", "codec", "bytes", "ratio", "write (s)", "cpu (s)", "read (s)", "cpu (s)", "read+io (s)")
+    for count in benchutils.parse_sizes(options.sizes):
+      snarks = synthetic.generate_snarks(count, urls=True, multiline=0.05, bursts=0.01)
+      for snark in snarks:
+        snark["time"] = snark["date"] - snarks[0]["date"]
+
+      for format_name in format_names:
+        expected = None
+        plain_bytes = None
+        for codec in codecs:
+          path = os.path.join(work_dir, "archive_%s.txt%s" % (format_name, get_extension(codec)))
+
+          if (format_name == "tweetsubs_log"):
+            ignored, write_wall, write_cpu = benchutils.time_call(write_log, snarks, path)
+          else:
+            ignored, write_wall, write_cpu = benchutils.time_call(export_archive, format_name, snarks, path)
+          byte_count = os.path.getsize(path)
+          if (plain_bytes is None): plain_bytes = byte_count
+
+          parsed, read_wall, read_cpu = benchutils.time_call(parse_archive, format_name, path)
+          if (expected is None):
+            expected = parsed
+            identical = None
+          else:
+            identical = (parsed == expected)
+            if (not identical): mismatches += 1
+          del parsed
+
+          # Time to read from storage at the given speed, plus decoding.
+          io_seconds = byte_count / (options.disk_mbps * 1048576)
+
+          print "%10d %15s %6s %12d %6.1fx %10.2f %10.2f %10.2f %10.2f %12.2f" % (count, format_name, (codec or "none"), byte_count, plain_bytes / float(max(byte_count, 1)),
+                                                                               write_wall, write_cpu, read_wall, read_cpu, io_seconds + read_cpu)
+          results.append({"snarks":count, "format":format_name, "codec":codec, "bytes":byte_count,
+                          "write_wall_seconds":write_wall, "write_cpu_seconds":write_cpu,
+                          "read_wall_seconds":read_wall, "read_cpu_seconds":read_cpu,
+                          "estimated_io_seconds":io_seconds, "identical":identical})
+          os.remove(path)
+        del expected
+
+      del snarks
+
+  finally:
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "compression", results)
+
+  if (mismatches > 0):
+    print "Parsed snarks differed from the uncompressed archive's %d times." % mismatches
+    raise SystemExit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+# Times dropping repeated snarks, as the Twitter parsers do after
+# overlapping passes: the old repr()-based uniquify_list(), and
+# common.SnarkDeduper keyed on (user, date, msg) or on tweet ids,
+# all at once or a page at a time. Results are checked against
+# uniquify_list()'s (less any distinct snarks that happen to share
+# a user, date and msg, for the content key).
+
+import optparse
+import random
+
+import benchutils
+import synthetic
+
+from lib import common
+
+
+# Fraction of snarks that are repeated.
+DUPLICATE_FRACTION = 0.1
+
+# Snarks per page, when deduping as pages arrive.
+PAGE_SIZE = 200
+
+
+def uniquify_list(seq):
+  """The Twitter parsers' old approach."""
+  seen = set()
+  seen_add = seen.add
+  return [x for x in seq if repr(x) not in seen and not seen_add( repr(x) )]
+
+def generate_repeated_snarks(count):
+  """Returns (snarks, ids), with some snarks repeated as copies."""
+  originals = synthetic.generate_snarks(count, urls=True)
+  ids = range(len(originals))
+  rng = random.Random(1)
+  for i in rng.sample(xrange(len(originals)), int(count * DUPLICATE_FRACTION)):
+    originals.append(dict(originals[i]))
+    ids.append(i)
+  return (originals, ids)
+
+
+def dedupe_by_content(snarks, ids):
+  return common.SnarkDeduper().dedupe(snarks)
+
+def dedupe_by_id(snarks, ids):
+  return common.SnarkDeduper().dedupe(snarks, ids)
+
+def dedupe_by_page(snarks, ids):
+  deduper = common.SnarkDeduper()
+  result = []
+  for i in xrange(0, len(snarks), PAGE_SIZE):
+    for (snark, key) in zip(snarks[i:i+PAGE_SIZE], ids[i:i+PAGE_SIZE]):
+      if (deduper.add(snark, key)): result.append(snark)
+  return result
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--sizes", dest="sizes", default="100k",
+                        help="comma-separated snark counts [default: %default]")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  methods = [("repr", lambda snarks, ids: uniquify_list(snarks)),
+             ("content", dedupe_by_content), ("id", dedupe_by_id), ("id_paged", dedupe_by_page)]
+
+  results = []
+  mismatches = 0
+  print "%10s %10s %10s %10s %10s %10s" % ("snarks", "method", "out", "wall (s)", "cpu (s)", "identical")
+  for count in benchutils.parse_sizes(options.sizes):
+    snarks, ids = generate_repeated_snarks(count)
+    expected = None
+    for (method_name, method) in methods:
+      deduped, wall_seconds, cpu_seconds = benchutils.time_call(method, snarks, ids)
+      if (expected is None): expected = deduped
+      if (method_name == "content"):
+        keys = set()
+        identical = (deduped == [x for x in expected if (common.get_snark_key(x) not in keys and not keys.add(common.get_snark_key(x)))])
+      else:
+        identical = (deduped == expected)
+      if (not identical): mismatches += 1
+      print "%10d %10s %10d %10.3f %10.3f %10s" % (len(snarks), method_name, len(deduped), wall_seconds, cpu_seconds, identical)
+      results.append({"snarks":len(snarks), "method":method_name, "snarks_out":len(deduped),
+                      "wall_seconds":wall_seconds, "cpu_seconds":cpu_seconds, "identical":identical})
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "dedupe", results)
+
+  if (mismatches > 0):
+    print "Deduped snarks differed from uniquify_list()'s %d times." % mismatches
+    raise SystemExit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+# Compares ignoring snarks the old way (re.search() per pattern,
+# a list of users) against a FilterEngine.
+
+import optparse
+import re
+
+import benchutils
+import synthetic
+
+from lib import common
+from lib import snarkutils
+
+
+def make_rules(pattern_count):
+  """Returns (ignore_users, ignore_regexes), mixing plain substrings and regexes."""
+  ignore_users = ["@user%d" % i for i in range(150, 200)]
+  ignore_regexes = ["^RT ", "bad$", "(?:lol ){3}", "wh(?:at|y) the", "[0-9]{4}", "^\\s*$", "cat+s? budget", "#\\w+tag"]
+  i = 0
+  while (len(ignore_regexes) < pattern_count):
+    if (i % 4 == 3):
+      ignore_regexes.append("spoiler%d\\w*!" % i)
+    else:
+      ignore_regexes.append("spoiler number %d" % i)
+    i += 1
+  return (ignore_users, ignore_regexes)
+
+def scan_snarks(ignore_users, ignore_regexes, snarks):
+  """Flags snarks the old way, returning how many were ignored."""
+  result = 0
+  for snark in snarks:
+    if (snark["user"] in ignore_users):
+      result += 1
+    else:
+      for ptn in ignore_regexes:
+        if (re.search(ptn, snark["msg"])):
+          result += 1
+          break
+  return result
+
+def engine_snarks(ignore_users, ignore_regexes, snarks):
+  """Flags snarks with a FilterEngine, returning how many were ignored."""
+  filter_engine = snarkutils.FilterEngine(ignore_users, ignore_regexes)
+  result = 0
+  for snark in snarks:
+    if (filter_engine.is_ignored(snark)): result += 1
+  return result
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--sizes", dest="sizes", default="500k",
+                        help="comma-separated snark counts [default: %default]")
+  arg_parser.add_option("--patterns", dest="patterns", default="10,50,100",
+                        help="comma-separated ignore_regexes counts [default: %default]")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  results = []
+  print "%10s %9s %10s %12s %12s %8s" % ("snarks", "patterns", "ignored", "scan (s)", "engine (s)", "speedup")
+  for count in benchutils.parse_sizes(options.sizes):
+    snarks = synthetic.generate_snarks(count)
+
+    for pattern_count in benchutils.parse_sizes(options.patterns):
+      ignore_users, ignore_regexes = make_rules(pattern_count)
+
+      scan_result, scan_seconds, scan_cpu = benchutils.time_call(scan_snarks, ignore_users, ignore_regexes, snarks)
+      engine_result, engine_seconds, engine_cpu = benchutils.time_call(engine_snarks, ignore_users, ignore_regexes, snarks)
+      if (scan_result != engine_result):
+        raise common.CompileSubsException("FilterEngine ignored %d snarks, but scanning ignored %d." % (engine_result, scan_result))
+
+      print "%10d %9d %10d %12.2f %12.2f %7.1fx" % (count, pattern_count, engine_result, scan_seconds, engine_seconds, scan_seconds/engine_seconds)
+      results.append({"snarks":count, "patterns":pattern_count, "ignored":engine_result, "scan_seconds":scan_seconds, "engine_seconds":engine_seconds})
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "filter_engine", results)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+# Compares per-user fudge lookups: a backward scan through
+# each user's list vs a FudgeIndex binary search.
+
+import optparse
+import random
+from datetime import timedelta
+
+import benchutils
+
+from lib import common
+from lib import snarkutils
+
+
+def scan_lookups(config, queries):
+  """Looks up fudges the old way, searching backward through lists."""
+  result = []
+  for (user, global_time) in queries:
+    fudge_value = None
+    if (user in config.fudge_users):
+      for (bookmark, amount) in reversed(config.fudge_users[user]):
+        if (global_time >= bookmark):
+          fudge_value = amount
+          break
+    result.append(fudge_value)
+  return result
+
+def index_lookups(config, queries):
+  """Looks up fudges with a cached FudgeIndex, as the GUI grid does."""
+  result = []
+  for (user, global_time) in queries:
+    result.append(snarkutils.get_fudge_index(config).get_fudge(user, global_time))
+  return result
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--bookmarks", dest="bookmarks", default="10,100,1k",
+                        help="comma-separated bookmarks per user [default: %default]")
+  arg_parser.add_option("--lookups", dest="lookups", type="int", default=200000,
+                        help="lookups to time [default: %default]")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  rng = random.Random(1)
+  users = ["@user%d" % i for i in range(20)]
+  movie_seconds = 3 * 3600
+
+  results = []
+  print "%10s %12s %12s %8s" % ("bookmarks", "scan (s)", "index (s)", "speedup")
+  for count in benchutils.parse_sizes(options.bookmarks):
+    config = common.Bunch(fudge_users={})
+    for user in users:
+      for i in range(count):
+        bookmark = timedelta(seconds=movie_seconds * i // count)
+        snarkutils.config_add_user_fudge(config, user, (bookmark, timedelta(seconds=rng.randint(-60, 60))))
+    queries = [(rng.choice(users), timedelta(seconds=rng.randint(0, movie_seconds))) for i in xrange(options.lookups)]
+
+    scan_result, scan_seconds, scan_cpu = benchutils.time_call(scan_lookups, config, queries)
+    index_result, index_seconds, index_cpu = benchutils.time_call(index_lookups, config, queries)
+    if (scan_result != index_result):
+      raise common.CompileSubsException("FudgeIndex results differed from scanning (%d bookmarks)." % count)
+
+    print "%10d %12.2f %12.2f %7.1fx" % (count, scan_seconds, index_seconds, scan_seconds/index_seconds)
+    results.append({"bookmarks":count, "lookups":options.lookups, "scan_seconds":scan_seconds, "index_seconds":index_seconds})
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "fudge_index", results)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+# Times tweetsubs_log parsing a local log with 1..N worker processes.
+
+import multiprocessing
+import optparse
+import os
+import shutil
+import tempfile
+
+import benchutils
+import synthetic
+
+from lib import common
+from lib.parsers import tweetsubs_log
+
+
+def parse_log(path, workers):
+  """Parses a local TweetSubs log, returning the snarks."""
+  return tweetsubs_log.fetch_snarks("file:"+ os.path.abspath(path), None, {"tweetsubs_log.workers":workers})
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--sizes", dest="sizes", default="1m",
+                        help="comma-separated snark counts [default: %default]")
+  arg_parser.add_option("--workers", dest="workers", default=None,
+                        help="comma-separated worker counts [default: powers of 2, up to the cpu count]")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  if (options.workers):
+    worker_counts = benchutils.parse_sizes(options.workers)
+  else:
+    worker_counts = [1]
+    while (worker_counts[-1] * 2 <= multiprocessing.cpu_count()):
+      worker_counts.append(worker_counts[-1] * 2)
+    if (worker_counts[-1] != multiprocessing.cpu_count()):
+      worker_counts.append(multiprocessing.cpu_count())
+
+  work_dir = tempfile.mkdtemp(prefix="compilesubs_bench_")
+  path = os.path.join(work_dir, "log.txt")
+
+  results = []
+  try:
+    print "%10s %12s %8s %10s %8s" % ("snarks", "log (MB)", "workers", "wall (s)", "speedup")
+    for count in benchutils.parse_sizes(options.sizes):
+      with open(path, "wb") as f:
+        synthetic.write_tweetsubs_log(f, synthetic.generate_snarks(count, multiline=0.05, bursts=0.01))
+      log_bytes = os.path.getsize(path)
+
+      expected = None
+      base_seconds = None
+      for workers in worker_counts:
+        snarks, wall_seconds, cpu_seconds = benchutils.time_call(parse_log, path, workers)
+        if (expected is None):
+          expected = snarks
+          base_seconds = wall_seconds
+        elif (snarks != expected):
+          raise common.CompileSubsException("Results with %d workers differed from 1 worker (%d snarks)." % (workers, count))
+        del snarks
+
+        print "%10d %12.1f %8d %10.2f %7.1fx" % (count, log_bytes/1048576.0, workers, wall_seconds, base_seconds/wall_seconds)
+        results.append({"snarks":count, "log_bytes":log_bytes, "workers":workers, "wall_seconds":wall_seconds})
+      del expected
+
+  finally:
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "parallel_parse", results)
+
+
+if __name__ == "__main__":
+  main()
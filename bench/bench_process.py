@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+# Times process_snarks() with and without the NumPy backend,
+# on lists of snark dicts and, optionally, on SnarkTables.
+
+import optparse
+from datetime import timedelta
+
+import benchutils
+import synthetic
+
+from lib import common
+from lib import snarktable
+from lib import snarkutils
+from lib import vectorized
+
+
+def make_config():
+  """Returns a config with a typical amount of fudging and ignoring."""
+  config = common.Bunch(fudge_time=timedelta(seconds=-30), end_time=None,
+                        ignore_users=["@user5", "@user11"], ignore_regexes=["^RT ", "bad$"],
+                        color_enabled="random", show_time=timedelta(seconds=6))
+  config.fudge_users = {}
+  for i in range(0, 40, 4):
+    config.fudge_users["@user%d" % i] = [(timedelta(minutes=m), timedelta(seconds=(m % 7) * 5 - 15)) for m in range(0, 240, 15)]
+  return config
+
+def process_copy(config, snarks, columnar=False):
+  """Processes copies of snarks, returning the new list (or SnarkTable)."""
+  if (columnar):
+    result = snarktable.SnarkTable(snarks)
+  else:
+    result = [dict(snark) for snark in snarks]
+  snarkutils.process_snarks(config, result)
+  return result
+
+def time_both(snarks, columnar):
+  """Processes snarks with and without NumPy.
+
+  :return: A tuple: kept snark count, pure-Python seconds, NumPy seconds.
+  :raises: CompileSubsException if the results differed.
+  """
+  vectorized.enabled = False
+  python_result, python_seconds, python_cpu = benchutils.time_call(process_copy, make_config(), snarks, columnar)
+
+  vectorized.enabled = True
+  numpy_result, numpy_seconds, numpy_cpu = benchutils.time_call(process_copy, make_config(), snarks, columnar)
+
+  # Colors are random, so compare everything else.
+  keys = ["user", "msg", "date", "time"]
+  if ([[x[k] for k in keys] for x in python_result] != [[x[k] for k in keys] for x in numpy_result]):
+    raise common.CompileSubsException("NumPy results differed from pure-Python results (%d snarks)." % len(snarks))
+
+  return (len(python_result), python_seconds, numpy_seconds)
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--sizes", dest="sizes", default="10k,100k,1m",
+                        help="comma-separated snark counts [default: %default]")
+  arg_parser.add_option("--table", dest="table", action="store_true", default=False,
+                        help="also time SnarkTables (slow without NumPy)")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  if (not vectorized.is_available()):
+    arg_parser.error("NumPy is not installed.")
+  # Time the NumPy backend at every size, to find where it pays off.
+  vectorized.min_snarks = vectorized.min_table_snarks = 0
+
+  results = []
+  print "%10s %8s %12s %12s %8s" % ("snarks", "storage", "python (s)", "numpy (s)", "speedup")
+  for count in benchutils.parse_sizes(options.sizes):
+    snarks = synthetic.generate_snarks(count)
+
+    for columnar in ([False, True] if (options.table) else [False]):
+      storage = ("table" if (columnar) else "dicts")
+      kept, python_seconds, numpy_seconds = time_both(snarks, columnar)
+
+      print "%10d %8s %12.2f %12.2f %7.1fx" % (count, storage, python_seconds, numpy_seconds, python_seconds/numpy_seconds)
+      results.append({"snarks":count, "storage":storage, "kept":kept, "python_seconds":python_seconds, "numpy_seconds":numpy_seconds})
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "process_snarks", results)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+
+# Compares the memory used by a list of snark dicts and a SnarkTable.
+
+import gc
+import optparse
+
+import benchutils
+import synthetic
+
+from lib import snarktable
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--sizes", dest="sizes", default="10k,100k,1m",
+                        help="comma-separated snark counts [default: %default]")
+  arg_parser.add_option("--urls", dest="urls", action="store_true", default=False,
+                        help="include user_url/msg_url attributes")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  results = []
+  print "%10s %14s %14s %7s %10s" % ("snarks", "dicts (MB)", "table (MB)", "ratio", "build (s)")
+  for count in benchutils.parse_sizes(options.sizes):
+    snarks = synthetic.generate_snarks(count, urls=options.urls)
+    for snark in snarks:
+      snark["time"] = snark["date"] - snarks[0]["date"]
+      snark["_ignored"] = False
+    dict_bytes = benchutils.deep_sizeof(snarks)
+
+    table, wall_seconds, cpu_seconds = benchutils.time_call(snarktable.SnarkTable, snarks)
+    del snarks
+    gc.collect()
+    table_bytes = benchutils.deep_sizeof(table)
+
+    print "%10d %14.1f %14.1f %6.1fx %10.2f" % (count, dict_bytes/1048576.0, table_bytes/1048576.0, dict_bytes/float(table_bytes), wall_seconds)
+    results.append({"snarks":count, "dict_bytes":dict_bytes, "table_bytes":table_bytes, "build_seconds":wall_seconds})
+    del table
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "snarktable_memory", results)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+
+# Counts the sorts and comparisons done while processing snarks,
+# comparing the current code against the sort-everything approach
+# it replaced (each stage re-sorting by date and by time).
+
+import __builtin__
+import operator
+import optparse
+from datetime import timedelta
+
+import benchutils
+import synthetic
+
+from lib import common
+from lib import snarkutils
+from lib import vectorized
+
+
+class SortCounter(object):
+  """Stands in for sorted(), counting calls and key comparisons."""
+
+  def __init__(self):
+    object.__init__(self)
+    self.sorts = 0
+    self.comparisons = 0
+    self.checks = 0
+
+  def sorted(self, iterable, key=None, reverse=False):
+    self.sorts += 1
+    if (key is None): key = lambda x: x
+    counter = self
+
+    class CountedKey(object):
+      __slots__ = ["value"]
+      def __init__(self, value):
+        self.value = value
+      def __lt__(self, other):
+        counter.comparisons += 1
+        return (self.value < other.value)
+
+    return __builtin__.sorted(iterable, key=lambda x: CountedKey(key(x)), reverse=reverse)
+
+  def is_sorted(self, snarks, key):
+    self.checks += 1
+    self.comparisons += max(0, len(snarks)-1)
+    return original_is_sorted(snarks, key)
+
+original_is_sorted = snarkutils._is_sorted
+
+
+def legacy_process_snarks(config, snarks):
+  """The old process_snarks(), minus coloring: two full sorts and three filter passes."""
+  snarks[:] = sorted(snarks, key=lambda k: k["date"])
+
+  fudge_index = snarkutils.get_fudge_index(config)
+  for snark in snarks:
+    snark["time"] = snark["date"] - snarks[0]["date"] + config.fudge_time
+    fudge_value = fudge_index.get_fudge(snark["user"], snark["time"])
+    if (fudge_value is not None):
+      snark["time"] += fudge_value
+
+  filter_engine = snarkutils.get_filter_engine(config)
+  for snark in snarks:
+    filter_engine.flag(snark)
+
+  snarks[:] = [s for s in snarks if (not ("_ignored" in s and s["_ignored"]))]
+  snarks[:] = [x for x in snarks if (abs(x["time"]) == x["time"])]
+  if (config.end_time is not None):
+    snarks[:] = [x for x in snarks if (x["time"] <= config.end_time)]
+
+  snarks[:] = sorted(snarks, key=lambda k: k["time"])
+
+def legacy_gui_snarks(config, snarks):
+  """The old GUI stages, minus coloring: a date sort and a time sort at each step."""
+  snarks[:] = sorted(snarks, key=lambda k: k["date"])
+  for snark in snarks:
+    snark["_globally fudged time"] = snark["date"] - snarks[0]["date"] + config.fudge_time
+    snark["time"] = snark["_globally fudged time"]
+  snarks[:] = sorted(snarks, key=lambda k: k["time"])
+  filter_engine = snarkutils.get_filter_engine(config)
+  for snark in snarks:
+    filter_engine.flag(snark)
+
+  snarks[:] = sorted(snarks, key=lambda k: k["date"])
+  fudge_index = snarkutils.get_fudge_index(config)
+  for snark in snarks:
+    snark["time"] = snark["_globally fudged time"]
+    fudge_value = fudge_index.get_fudge(snark["user"], snark["time"])
+    if (fudge_value is not None):
+      snark["time"] += fudge_value
+  snarks[:] = sorted(snarks, key=lambda k: k["time"])
+
+  snarks[:] = [s for s in snarks if (not ("_ignored" in s and s["_ignored"]))]
+  snarks[:] = [x for x in snarks if (abs(x["time"]) == x["time"])]
+  if (config.end_time is not None):
+    snarks[:] = [x for x in snarks if (x["time"] <= config.end_time)]
+  snarks[:] = sorted(snarks, key=lambda k: k["time"])
+
+def current_process_snarks(config, snarks):
+  snarkutils.process_snarks(config, snarks)
+
+def current_gui_snarks(config, snarks):
+  snarkutils.gui_preprocess_snarks(config, snarks)
+  snarkutils.gui_fudge_users(config, snarks)
+  snarkutils.gui_postprocess_snarks(config, snarks)
+
+
+def make_config():
+  """Returns a config with a typical amount of fudging and ignoring (colors off)."""
+  config = common.Bunch(fudge_time=timedelta(seconds=-30), end_time=None,
+                        ignore_users=["@user5", "@user11"], ignore_regexes=["^RT ", "bad$"],
+                        color_enabled="default", show_time=timedelta(seconds=6))
+  config.fudge_users = {}
+  for i in range(0, 40, 4):
+    config.fudge_users["@user%d" % i] = [(timedelta(minutes=m), timedelta(seconds=(m % 7) * 5 - 15)) for m in range(0, 240, 15)]
+  return config
+
+def make_warm_config():
+  """Returns a config with its fudge index and filter engine already built.
+
+  Building those sorts each user's bookmarks, which is
+  setup, not processing.
+  """
+  config = make_config()
+  snarkutils.get_fudge_index(config)
+  snarkutils.get_filter_engine(config)
+  return config
+
+def count_sorting(func, snarks):
+  """Runs a processing function on copies of snarks, with sorting instrumented.
+
+  :return: A SortCounter.
+  """
+  config = make_warm_config()
+  snarks = [dict(snark) for snark in snarks]
+  counter = SortCounter()
+  patched = [(snarkutils, "sorted", counter.sorted), (snarkutils, "_is_sorted", counter.is_sorted),
+             (globals(), "sorted", counter.sorted)]
+  try:
+    for (target, name, value) in patched:
+      if (isinstance(target, dict)): target[name] = value
+      else: setattr(target, name, value)
+
+    func(config, snarks)
+  finally:
+    del snarkutils.sorted
+    snarkutils._is_sorted = original_is_sorted
+    del globals()["sorted"]
+  return counter
+
+def time_processing(func, snarks):
+  """Runs a processing function on copies of snarks, returning wall seconds."""
+  snarks = [dict(snark) for snark in snarks]
+  result, wall_seconds, cpu_seconds = benchutils.time_call(func, make_warm_config(), snarks)
+  return wall_seconds
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--sizes", dest="sizes", default="10k,100k",
+                        help="comma-separated snark counts [default: %default]")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  vectorized.enabled = False  # Count the pure-Python path.
+
+  stages = [("process", legacy_process_snarks, current_process_snarks),
+            ("gui", legacy_gui_snarks, current_gui_snarks)]
+
+  results = []
+  print "%10s %8s %8s %7s %14s %10s" % ("snarks", "stages", "version", "sorts", "comparisons", "wall (s)")
+  for count in benchutils.parse_sizes(options.sizes):
+    snarks = synthetic.generate_snarks(count)
+
+    for (stage_name, legacy_func, current_func) in stages:
+      for (version, func) in [("before", legacy_func), ("after", current_func)]:
+        counter = count_sorting(func, snarks)
+        wall_seconds = time_processing(func, snarks)
+
+        print "%10d %8s %8s %7d %14d %10.2f" % (count, stage_name, version, counter.sorts, counter.comparisons, wall_seconds)
+        results.append({"snarks":count, "stages":stage_name, "version":version, "sorts":counter.sorts,
+                        "sortedness_checks":counter.checks, "comparisons":counter.comparisons, "wall_seconds":wall_seconds})
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "sorting", results)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+# Times storing a show's snarks with the sqlite_store exporter,
+# loading them all back, and indexed queries by in-movie time,
+# user and date. Queried snarks are checked against the
+# originals, filtered in Python.
+
+import optparse
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+import benchutils
+import synthetic
+
+from lib import common
+from lib import snarkstore
+from lib import snarkutils
+
+
+def generate_processed_snarks(count):
+  """Returns snarks with the attributes an exporter would see."""
+  snarks = synthetic.generate_snarks(count, urls=True, multiline=0.05, bursts=0.01)
+  colors = [(i/40.0, 1-i/40.0, 0.5) for i in range(40)]
+  for (i, snark) in enumerate(snarks):
+    snark["time"] = snark["date"] - snarks[0]["date"]
+    snark["color"] = colors[i % len(colors)]
+  return snarks
+
+
+def store(snarks, db_path, show_id):
+  exporter_mod = snarkutils.get_exporter("sqlite_store")
+  options = {"sqlite_store.db_path":db_path, "sqlite_store.show_id":show_id}
+  exporter_mod.write_snarks(None, snarks, timedelta(seconds=6), options)
+
+def query(db_path, **kwargs):
+  return snarkstore.query_snarks(db_path, **kwargs)
+
+def get_size(db_path):
+  """Returns the bytes in a database, and its write-ahead log."""
+  return sum(os.path.getsize(x) for x in [db_path, db_path+"-wal"] if (os.path.exists(x)))
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--sizes", dest="sizes", default="100k,1m",
+                        help="comma-separated snark counts [default: %default]")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  work_dir = tempfile.mkdtemp(prefix="compilesubs_bench_")
+
+  results = []
+  mismatches = 0
+  def add_result(count, operation, snarks_out, wall_seconds, cpu_seconds, byte_count, identical):
+    print "%10d %12s %10d %10.2f %10.2f %12d %10s" % (count, operation, snarks_out, wall_seconds, cpu_seconds, byte_count, identical)
+    results.append({"snarks":count, "operation":operation, "snarks_out":snarks_out,
+                    "wall_seconds":wall_seconds, "cpu_seconds":cpu_seconds, "bytes":byte_count, "identical":identical})
+
+  try:
+    print "%10s %12s %10s %10s %10s %12s %10s" % ("snarks", "operation", "out", "wall (s)", "cpu (s)", "bytes", "identical")
+    for count in benchutils.parse_sizes(options.sizes):
+      snarks = generate_processed_snarks(count)
+      db_path = os.path.join(work_dir, "store_%d.db" % count)
+
+      ignored, wall_seconds, cpu_seconds = benchutils.time_call(store, snarks, db_path, "show")
+      add_result(count, "ingest", count, wall_seconds, cpu_seconds, get_size(db_path), None)
+
+      # A second show, so queries have something to skip.
+      store(snarks[:count // 10], db_path, "rerun")
+
+      loaded, wall_seconds, cpu_seconds = benchutils.time_call(query, db_path, show_ids=["show"])
+      identical = (loaded == snarks)
+      if (not identical): mismatches += 1
+      add_result(count, "load", len(loaded), wall_seconds, cpu_seconds, 0, identical)
+      del loaded
+
+      if (count > 0):
+        # Five minutes of one show, from the middle.
+        since_time = snarks[count // 2]["time"]
+        until_time = since_time + timedelta(minutes=5)
+        expected = [x for x in snarks if (since_time <= x["time"] <= until_time)]
+        loaded, wall_seconds, cpu_seconds = benchutils.time_call(query, db_path, show_ids=["show"], since_time=since_time, until_time=until_time)
+        identical = (loaded == expected)
+        if (not identical): mismatches += 1
+        add_result(count, "time", len(loaded), wall_seconds, cpu_seconds, 0, identical)
+
+        # A quiet user, across both shows ("rerun" sorts first).
+        user = snarks[-1]["user"]
+        expected = [x for x in snarks[:count // 10] if (x["user"] == user)] + [x for x in snarks if (x["user"] == user)]
+        loaded, wall_seconds, cpu_seconds = benchutils.time_call(query, db_path, users=[user.upper()])
+        identical = (loaded == expected)
+        if (not identical): mismatches += 1
+        add_result(count, "user", len(loaded), wall_seconds, cpu_seconds, 0, identical)
+
+        # An hour from the middle, across both shows.
+        since_date = snarks[count // 2]["date"]
+        until_date = since_date + timedelta(hours=1)
+        expected = [x for x in snarks if (since_date <= x["date"] <= until_date)]
+        loaded, wall_seconds, cpu_seconds = benchutils.time_call(query, db_path, show_ids=["show"], since_date=since_date, until_date=until_date)
+        identical = (loaded == expected)
+        if (not identical): mismatches += 1
+        add_result(count, "date", len(loaded), wall_seconds, cpu_seconds, 0, identical)
+        del loaded, expected
+
+      del snarks
+
+  finally:
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "sqlite_store", results)
+
+  if (mismatches > 0):
+    print "Queried snarks differed from the originals %d times." % mismatches
+    raise SystemExit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+
+# Times the subrip exporter in cues per second, and checks its output
+# is byte-identical to the original (regex-per-step) implementation,
+# which is kept below as the golden reference.
+
+import hashlib
+import optparse
+import os
+import random
+import re
+import shutil
+import tempfile
+from datetime import timedelta
+
+import benchutils
+import synthetic
+
+from lib import common
+from lib.exporters import subrip
+
+
+def generate_cues(count, seed=1):
+  """Returns processed snarks with awkward msgs: stray spaces, CR's,
+  blank lines and links, most of them colored.
+  """
+  rng = random.Random(seed)
+  snarks = synthetic.generate_snarks(count, multiline=0.1, seed=seed)
+  colors = [(rng.random(), rng.random(), rng.random()) for i in range(40)]
+  first_date = snarks[0]["date"] if (snarks) else None
+
+  for snark in snarks:
+    msg = snark["msg"]
+    r = rng.random()
+    if (r < 0.05): msg = "  "+ msg +"  "
+    elif (r < 0.10): msg = msg.replace("\n", " \r\n ")
+    elif (r < 0.13): msg = msg.replace("\n", "\n\n \n")
+    elif (r < 0.25): msg += " http://t.co/%x" % rng.getrandbits(32)
+    elif (r < 0.27): msg = "https://example.com/x\n"+ msg +"\n"
+    snark["msg"] = msg
+
+    snark["time"] = snark["date"] - first_date
+    if (rng.random() < 0.01): snark["time"] += timedelta(microseconds=rng.randint(0, 999999))
+    if (rng.random() < 0.9): snark["color"] = rng.choice(colors)
+
+  return snarks
+
+
+def reference_write_snarks(dest_file, snarks, show_time, include_names):
+  """The subrip exporter as it was, for a golden copy."""
+  unique_colors = list(set([x["color"] for x in snarks if ("color" in x)]))
+  srt_index = 0
+  palette_start = subrip.srt_delta_str(timedelta(seconds=1))
+  palette_end = subrip.srt_delta_str(timedelta(seconds=1) + show_time)
+  palette_msg = ""
+  for c in unique_colors:
+    palette_msg += subrip.color_message("#", c)
+  if (len(palette_msg) > 0):
+    srt_index += 1
+    reference_write_cue(dest_file, srt_index, palette_start +" --> "+ palette_end, palette_msg)
+
+  for snark in snarks:
+    srt_start = subrip.srt_delta_str(snark["time"])
+    srt_end = subrip.srt_delta_str(snark["time"] + show_time)
+    srt_msg = snark["msg"]
+    srt_msg = re.sub("\r", "", srt_msg)
+    srt_msg = re.sub("\n\n+", "\n", srt_msg)
+    srt_msg = re.sub("^ +", "", srt_msg)
+    srt_msg = re.sub(" *\n *", "\n", srt_msg)
+    srt_msg = srt_msg.rstrip(" \n")
+    srt_msg = re.sub(" *https?://[^ ]+", "", srt_msg)
+    if (include_names is True):
+      srt_msg = "%s: %s" % (snark["user"].replace("@",""), srt_msg)
+    srt_msg = re.sub("\n", "\r\n", srt_msg)
+    if ("color" in snark and snark["color"] is not None):
+      srt_msg = subrip.color_message(srt_msg, snark["color"])
+    srt_index += 1
+    reference_write_cue(dest_file, srt_index, srt_start +" --> "+ srt_end, srt_msg)
+
+def reference_write_cue(dest_file, srt_index, srt_times, srt_msg):
+  dest_file.write(str(srt_index) +"\r\n")
+  dest_file.write(srt_times +"\r\n")
+  dest_file.write(srt_msg +"\r\n")
+  dest_file.write("\r\n")
+
+
+def write_reference(path, snarks, show_time, include_names):
+  with open(path, "wb") as f:
+    reference_write_snarks(f, snarks, show_time, include_names)
+
+def write_subrip(path, snarks, show_time, include_names, streaming):
+  with open(path, "wb") as f:
+    subrip.write_snarks(f, (iter(snarks) if (streaming) else snarks), show_time, {"subrip.include_names":include_names})
+
+def file_digest(path):
+  h = hashlib.md5()
+  with open(path, "rb") as f:
+    for block in iter(lambda: f.read(1024*1024), ""):
+      h.update(block)
+  return h.hexdigest()
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--sizes", dest="sizes", default="1m",
+                        help="comma-separated cue counts [default: %default]")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  work_dir = tempfile.mkdtemp(prefix="compilesubs_bench_")
+  golden_path = os.path.join(work_dir, "golden.srt")
+  output_path = os.path.join(work_dir, "output.srt")
+  show_time = timedelta(seconds=6)
+
+  results = []
+  mismatches = 0
+  try:
+    print "%10s %8s %10s %10s %12s %10s" % ("cues", "names", "writer", "wall (s)", "cues/s", "identical")
+    for count in benchutils.parse_sizes(options.sizes):
+      snarks = generate_cues(count)
+
+      for include_names in [True, False]:
+        golden, wall_seconds, cpu_seconds = benchutils.time_call(write_reference, golden_path, snarks, show_time, include_names)
+        golden_digest = file_digest(golden_path)
+        print "%10d %8s %10s %10.2f %12d %10s" % (count, include_names, "reference", wall_seconds, count / max(wall_seconds, 0.001), "-")
+        results.append({"cues":count, "include_names":include_names, "writer":"reference",
+                        "wall_seconds":wall_seconds, "cpu_seconds":cpu_seconds, "identical":None})
+
+        for streaming in [False, True]:
+          writer_name = ("streaming" if (streaming) else "list")
+          written, wall_seconds, cpu_seconds = benchutils.time_call(write_subrip, output_path, snarks, show_time, include_names, streaming)
+          identical = (file_digest(output_path) == golden_digest)
+          if (not identical): mismatches += 1
+          print "%10d %8s %10s %10.2f %12d %10s" % (count, include_names, writer_name, wall_seconds, count / max(wall_seconds, 0.001), identical)
+          results.append({"cues":count, "include_names":include_names, "writer":writer_name,
+                          "wall_seconds":wall_seconds, "cpu_seconds":cpu_seconds, "identical":identical})
+
+      del snarks
+
+  finally:
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "subrip", results)
+
+  if (mismatches > 0):
+    print "Output differed from the golden copy %d times." % mismatches
+    raise SystemExit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+# Times each parser, process_snarks() and each exporter in isolation,
+# then whole parse/process/export runs, on generated inputs.
+# Compare --json output between versions to catch regressions.
+
+import contextlib
+import optparse
+import os
+import shutil
+import StringIO
+import tempfile
+import urllib
+from datetime import timedelta
+
+import benchutils
+import synthetic
+
+from lib import common
+from lib import parsecache
+from lib import snarkutils
+
+
+PARSERS = ["tweetsubs_log", "tabbed_text", "transcript_lousycanuck", "pickled_snarks", "jsonl"]
+EXPORTERS = ["subrip", "tabbed_text", "transcript_html", "pickled_snarks", "jsonl"]
+
+
+def make_config(parser_name=None, exporter_name=None, src_path=None, dest_path=None):
+  """Returns a config with a typical amount of fudging and ignoring."""
+  config = common.Bunch(parser_name=parser_name, exporter_name=exporter_name,
+                        src_path=src_path, dest_path=dest_path, first_msg=None,
+                        fudge_time=timedelta(seconds=-30), end_time=None,
+                        ignore_users=["@user5", "@user11"], ignore_regexes=["^RT ", "bad$"],
+                        color_enabled="random", show_time=timedelta(seconds=6),
+                        parser_options={}, exporter_options={})
+  config.fudge_users = {}
+  for i in range(0, 40, 4):
+    config.fudge_users["@user%d" % i] = [(timedelta(minutes=m), timedelta(seconds=(m % 7) * 5 - 15)) for m in range(0, 240, 15)]
+  return config
+
+def file_url(path):
+  """Returns a "file:" url for a local path."""
+  return "file:"+ urllib.pathname2url(os.path.abspath(path))
+
+
+def write_input(parser_name, snarks, work_dir):
+  """Writes snarks in a parser's format.
+
+  :return: The path to the new file.
+  """
+  path = os.path.join(work_dir, "input_%s.txt" % parser_name)
+  with open(path, "wb") as f:
+    synthetic.INPUT_WRITERS[parser_name](f, snarks)
+  return path
+
+def parse_file(parser_name, path):
+  """Calls a parser's fetch_snarks() on a local file."""
+  parser_mod = snarkutils.get_parser(parser_name)
+  return parser_mod.fetch_snarks(file_url(path), None, {})
+
+def process_copy(config, snarks):
+  """Processes copies of snarks, returning the new list."""
+  result = [dict(snark) for snark in snarks]
+  snarkutils.process_snarks(config, result)
+  return result
+
+def export_buffer(exporter_name, snarks, show_time):
+  """Calls an exporter's write_snarks() into memory.
+
+  :return: The number of bytes written.
+  """
+  exporter_mod = snarkutils.get_exporter(exporter_name)
+  with contextlib.closing(StringIO.StringIO()) as buf:
+    exporter_mod.write_snarks(buf, snarks, show_time, {})
+    return buf.tell()
+
+def run_end_to_end(config):
+  """Parses, processes and exports, as compilesubs.py would.
+
+  :return: The number of snarks exported.
+  """
+  snarks = snarkutils.parse_snarks(config)
+  snarkutils.process_snarks(config, snarks)
+  snarkutils.export_snarks(config, snarks)
+  return len(snarks)
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--sizes", dest="sizes", default="1k,10k,100k",
+                        help="comma-separated snark counts, up to 5m or so [default: %default]")
+  arg_parser.add_option("--parsers", dest="parsers", default=",".join(PARSERS),
+                        help="comma-separated parsers [default: %default]")
+  arg_parser.add_option("--exporters", dest="exporters", default=",".join(EXPORTERS),
+                        help="comma-separated exporters [default: %default]")
+  arg_parser.add_option("--users", dest="users", type="int", default=200,
+                        help="distinct users [default: %default]")
+  arg_parser.add_option("--multiline", dest="multiline", type="float", default=0.05,
+                        help="fraction of msgs spanning several lines [default: %default]")
+  arg_parser.add_option("--bursts", dest="bursts", type="float", default=0.01,
+                        help="fraction of msgs that begin a dense burst [default: %default]")
+  arg_parser.add_option("--work-dir", dest="work_dir", default=None,
+                        help="keep generated files in this dir, instead of a temp dir")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  parsecache.disable()  # Time the parsers, not cache hits.
+
+  parser_names = [x.strip() for x in options.parsers.split(",") if (x.strip())]
+  exporter_names = [x.strip() for x in options.exporters.split(",") if (x.strip())]
+  for name in parser_names:
+    if (name not in synthetic.INPUT_WRITERS):
+      arg_parser.error("No input generator for parser: %s" % name)
+
+  work_dir = options.work_dir
+  if (work_dir is None):
+    work_dir = tempfile.mkdtemp(prefix="compilesubs_bench_")
+  elif (not os.path.isdir(work_dir)):
+    os.makedirs(work_dir)
+
+  results = []
+  def add_result(count, stage, plugin, result, wall_seconds, cpu_seconds, byte_count):
+    snarks_per_second = result / max(wall_seconds, 1e-6)
+    print "%10d %12s %30s %10d %10.2f %10.2f %12d %12d" % (count, stage, plugin, result, wall_seconds, cpu_seconds, byte_count, snarks_per_second)
+    results.append({"snarks":count, "stage":stage, "plugin":plugin, "snarks_out":result,
+                    "wall_seconds":wall_seconds, "cpu_seconds":cpu_seconds, "bytes":byte_count,
+                    "snarks_per_second":snarks_per_second})
+
+  try:
+    print "%10s %12s %30s %10s %10s %10s %12s %12s" % ("snarks", "stage", "plugin", "out", "wall (s)", "cpu (s)", "bytes", "snarks/s")
+    for count in benchutils.parse_sizes(options.sizes):
+      snarks = synthetic.generate_snarks(count, user_count=options.users, urls=True,
+                                         multiline=options.multiline, bursts=options.bursts)
+
+      # Parsers, each reading its own format.
+      input_paths = {}
+      for parser_name in parser_names:
+        input_paths[parser_name] = write_input(parser_name, snarks, work_dir)
+        parsed, wall_seconds, cpu_seconds = benchutils.time_call(parse_file, parser_name, input_paths[parser_name])
+        add_result(count, "parse", parser_name, len(parsed), wall_seconds, cpu_seconds, os.path.getsize(input_paths[parser_name]))
+        del parsed
+
+      # Processing, on its own.
+      processed, wall_seconds, cpu_seconds = benchutils.time_call(process_copy, make_config(), snarks)
+      add_result(count, "process", "process_snarks", len(processed), wall_seconds, cpu_seconds, 0)
+
+      # Exporters, writing into memory.
+      for exporter_name in exporter_names:
+        byte_count, wall_seconds, cpu_seconds = benchutils.time_call(export_buffer, exporter_name, processed, timedelta(seconds=6))
+        add_result(count, "export", exporter_name, len(processed), wall_seconds, cpu_seconds, byte_count)
+      del processed
+
+      # Everything together, each parser into the first exporter.
+      if (len(exporter_names) > 0):
+        for parser_name in parser_names:
+          dest_path = os.path.join(work_dir, "output_%s.%s" % (parser_name, exporter_names[0]))
+          config = make_config(parser_name, exporter_names[0], file_url(input_paths[parser_name]), dest_path)
+          exported, wall_seconds, cpu_seconds = benchutils.time_call(run_end_to_end, config)
+          add_result(count, "end_to_end", "%s>%s" % (parser_name, exporter_names[0]), exported, wall_seconds, cpu_seconds, os.path.getsize(dest_path))
+
+      del snarks
+
+  finally:
+    if (options.work_dir is None):
+      shutil.rmtree(work_dir, ignore_errors=True)
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "suite", results)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+
+# Times fetching search result pages through the bundled tweepy,
+# from a local HTTPS stand-in server, with a new connection per
+# page (as before connection pooling) and with pooled keep-alive
+# connections. The server's certificate is generated with the
+# openssl command, unless --cert and --key are given.
+
+import BaseHTTPServer
+import json
+import optparse
+import os
+import shutil
+import socket
+import SocketServer
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+
+import benchutils
+
+from lib import tweepy
+from lib.tweepy.parsers import RawParser
+from lib.tweepy.pool import ConnectionPool
+
+
+class StandInHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+  """Answers every GET with the same page of search results."""
+  protocol_version = "HTTP/1.1"  # Keep-alive.
+  payload = "{}"
+
+  def setup(self):
+    BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+    # Otherwise Nagle's algorithm delays each response (~40ms).
+    self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+  def do_GET(self):
+    self.send_response(200)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(self.payload)))
+    self.end_headers()
+    self.wfile.write(self.payload)
+
+  def log_message(self, format, *args):
+    pass
+
+
+class StandInServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+  daemon_threads = True
+
+  def handle_error(self, request, client_address):
+    pass  # Clients hang up without closing TLS first.
+
+
+def make_payload(status_count):
+  """Returns a JSON page of search results, resembling Twitter's."""
+  statuses = []
+  for i in range(status_count):
+    statuses.append({"id":300000000000000000+i, "text":"@MockTM this movie is so bad %d" % i,
+                     "created_at":"Wed May 01 20:00:%02d +0000 2013" % (i % 60),
+                     "user":{"screen_name":"user%d" % i, "name":"User %d" % i}})
+  return json.dumps({"statuses":statuses, "search_metadata":{"count":status_count}})
+
+def make_cert(work_dir):
+  """Generates a self-signed certificate for localhost.
+
+  :return: A (cert path, key path) tuple.
+  """
+  cert_path = os.path.join(work_dir, "cert.pem")
+  key_path = os.path.join(work_dir, "key.pem")
+  with open(os.devnull, "w") as devnull:
+    subprocess.check_call(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                           "-subj", "/CN=localhost", "-keyout", key_path, "-out", cert_path],
+                          stdout=devnull, stderr=devnull)
+  return (cert_path, key_path)
+
+def start_server(cert_path, key_path, payload):
+  """Starts an HTTPS server on a free localhost port, in a daemon thread."""
+  StandInHandler.payload = payload
+  server = StandInServer(("localhost", 0), StandInHandler)
+  server.socket = ssl.wrap_socket(server.socket, certfile=cert_path, keyfile=key_path, server_side=True)
+  t = threading.Thread(target=server.serve_forever, name="StandInServer")
+  t.daemon = True
+  t.start()
+  return server
+
+
+def fetch_pages(api, page_count, thread_count):
+  """Fetches pages with several threads sharing one API.
+
+  :return: A list of per-page latencies, in seconds.
+  """
+  latencies = []
+  errors = []
+  def fetch(n):
+    try:
+      for i in range(n):
+        start = time.time()
+        api.search(q="@MockTM", max_id=str(i))
+        latencies.append(time.time() - start)
+    except (Exception) as err:
+      errors.append(err)
+
+  threads = [threading.Thread(target=fetch, args=(page_count // thread_count,)) for i in range(thread_count)]
+  for t in threads: t.start()
+  for t in threads: t.join()
+  if (errors): raise errors[0]
+  return latencies
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--pages", dest="pages", type="int", default=200,
+                        help="pages to fetch per run [default: %default]")
+  arg_parser.add_option("--statuses", dest="statuses", type="int", default=100,
+                        help="statuses per page [default: %default]")
+  arg_parser.add_option("--threads", dest="threads", default="1,4",
+                        help="comma-separated counts of threads sharing one API [default: %default]")
+  arg_parser.add_option("--cert", dest="cert_path", default=None,
+                        help="server certificate for localhost (PEM)")
+  arg_parser.add_option("--key", dest="key_path", default=None,
+                        help="server private key (PEM)")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  work_dir = tempfile.mkdtemp(prefix="compilesubs_bench_")
+
+  results = []
+  try:
+    if (options.cert_path and options.key_path):
+      cert_path, key_path = options.cert_path, options.key_path
+    else:
+      cert_path, key_path = make_cert(work_dir)
+
+    server = start_server(cert_path, key_path, make_payload(options.statuses))
+    host = "localhost:%d" % server.server_address[1]
+    ssl_context = ssl.create_default_context(cafile=cert_path)
+
+    print "%8s %10s %8s %10s %10s %10s %10s" % ("threads", "pool", "pages", "wall (s)", "cpu (s)", "mean (ms)", "p95 (ms)")
+    for thread_count in benchutils.parse_sizes(options.threads):
+      for (pool_name, max_idle) in [("none", 0), ("keepalive", 4)]:
+        pool = ConnectionPool(max_idle=max_idle, ssl_context=ssl_context)
+        api = tweepy.API(host=host, search_host=host, parser=RawParser(), pool=pool)
+
+        latencies, wall_seconds, cpu_seconds = benchutils.time_call(fetch_pages, api, options.pages, thread_count)
+        pool.close_all()
+
+        latencies.sort()
+        mean_ms = 1000 * sum(latencies) / max(len(latencies), 1)
+        p95_ms = 1000 * latencies[int(len(latencies) * 0.95)] if (latencies) else 0
+        print "%8d %10s %8d %10.2f %10.2f %10.2f %10.2f" % (thread_count, pool_name, len(latencies), wall_seconds, cpu_seconds, mean_ms, p95_ms)
+        results.append({"threads":thread_count, "pool":pool_name, "pages":len(latencies),
+                        "wall_seconds":wall_seconds, "cpu_seconds":cpu_seconds,
+                        "mean_ms":mean_ms, "p95_ms":p95_ms})
+
+    server.shutdown()
+
+  finally:
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "tweepy_pool", results)
+
+
+if __name__ == "__main__":
+  main()
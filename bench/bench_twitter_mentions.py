@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+
+# Times a full pull with the twitter_mentions parser (800 mentions
+# and 3200 timeline tweets, by default), from a local HTTPS
+# stand-in for Twitter that answers after a simulated network
+# delay, then a re-run from the saved checkpoints, after a few
+# new tweets. Each timeline pages by max_id and since_id, as
+# Twitter's does. The parsed snarks are checked for tweets that
+# came back twice, and re-runs against the full pull.
+
+import json
+import optparse
+import shutil
+import ssl
+import tempfile
+import threading
+import time
+import urlparse
+from datetime import datetime, timedelta
+
+import benchutils
+from bench_tweepy_pool import StandInHandler, StandInServer, make_cert
+
+from lib import global_config
+from lib import tweepy
+from lib.parsers import twitter_mentions
+from lib.subsystems import tweepy_backend
+from lib.tweepy.pool import ConnectionPool
+
+
+SCREEN_NAME = "MockTM"
+
+
+class TimelineHandler(StandInHandler):
+  """Answers timeline requests a page at a time, newest first."""
+  latency = 0.1  # Seconds to wait before answering.
+  timelines = {}  # Path suffix -> [(id, status JSON), ...], newest first.
+  rate_json = "{}"
+  request_count = 0
+
+  def do_GET(self):
+    TimelineHandler.request_count += 1
+    time.sleep(self.latency)
+    p = urlparse.urlparse(self.path)
+    params = dict(urlparse.parse_qsl(p.query))
+
+    payload = None
+    if (p.path.endswith("/application/rate_limit_status.json")):
+      payload = self.rate_json
+    else:
+      for (suffix, timeline) in self.timelines.items():
+        if (not p.path.endswith(suffix)): continue
+        max_id = int(params.get("max_id", timeline[0][0]))
+        since_id = int(params.get("since_id", 0))
+        count = int(params.get("count", 20))
+        page = [status_json for (status_id, status_json) in timeline if (since_id < status_id <= max_id)][:count]
+        payload = "["+ ",".join(page) +"]"
+
+    if (payload is None):
+      self.send_error(404)
+      return
+    self.send_response(200)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(payload)))
+    self.end_headers()
+    self.wfile.write(payload)
+
+
+class StandInAuth(object):
+  """Stands in for an OAuth handler, which would sign requests."""
+  def apply_auth(self, url, method, headers, parameters):
+    pass
+
+  def get_username(self):
+    return SCREEN_NAME
+
+
+def make_timeline(first_id, status_count, start_date, mention):
+  """Returns a list of (id, status JSON) tuples, newest first."""
+  timeline = []
+  for i in range(status_count):
+    n = status_count - i  # Counting from the oldest.
+    status_id = first_id + n * 7
+    date = start_date - timedelta(seconds=i * 11)
+    text = "this movie is so bad &amp; it's great %d" % n
+    if (mention): text = "@%s %s" % (SCREEN_NAME, text)
+    status = {"id":status_id, "text":text, "created_at":date.strftime("%a %b %d %H:%M:%S +0000 %Y"),
+              "user":{"screen_name":"user%d" % (n % 97), "name":"User %d" % (n % 97)}}
+    timeline.append((status_id, json.dumps(status)))
+  return timeline
+
+def make_rate_json(calls):
+  reset = int(time.time()) + 900
+  resources = {}
+  for name in ["/statuses/mentions_timeline", "/statuses/user_timeline"]:
+    resources[name] = {"limit":calls, "remaining":calls, "reset":reset}
+  return json.dumps({"resources":{"statuses":resources}})
+
+def start_server(cert_path, key_path):
+  """Starts an HTTPS server on a free localhost port, in a daemon thread."""
+  server = StandInServer(("localhost", 0), TimelineHandler)
+  server.socket = ssl.wrap_socket(server.socket, certfile=cert_path, keyfile=key_path, server_side=True)
+  t = threading.Thread(target=server.serve_forever, name="StandInServer")
+  t.daemon = True
+  t.start()
+  return server
+
+
+def set_timelines(mention_count, timeline_count, new_count):
+  """Sets the stand-in's tweets. Extra new tweets are newer
+  than the rest, which keep the same ids and dates.
+  """
+  start_date = datetime(2013, 5, 1, 22, 0, 0) + timedelta(seconds=new_count * 11)
+  TimelineHandler.timelines = {"/statuses/mentions_timeline.json":make_timeline(400000000000000000, mention_count + new_count, start_date, True),
+                               "/statuses/user_timeline.json":make_timeline(400000000000000003, timeline_count + new_count, start_date, False)}
+
+def pull(full_refresh):
+  """Fetches snarks with the twitter_mentions parser.
+
+  :return: A (snarks, request count) tuple.
+  """
+  TimelineHandler.request_count = 0
+  snarks = twitter_mentions.fetch_snarks(None, None, {"twitter_mentions.full_refresh":full_refresh})
+  return (snarks, TimelineHandler.request_count)
+
+
+def main():
+  arg_parser = optparse.OptionParser()
+  arg_parser.add_option("--mentions", dest="mentions", type="int", default=800,
+                        help="mentions on the stand-in [default: %default]")
+  arg_parser.add_option("--timeline", dest="timeline", type="int", default=3200,
+                        help="timeline tweets on the stand-in [default: %default]")
+  arg_parser.add_option("--new", dest="new", type="int", default=20,
+                        help="new tweets per timeline before a re-run [default: %default]")
+  arg_parser.add_option("--latency", dest="latency_ms", type="float", default=100,
+                        help="simulated delay per request, in ms [default: %default]")
+  arg_parser.add_option("--runs", dest="runs", type="int", default=3,
+                        help="pulls to time [default: %default]")
+  arg_parser.add_option("--cert", dest="cert_path", default=None,
+                        help="server certificate for localhost (PEM)")
+  arg_parser.add_option("--key", dest="key_path", default=None,
+                        help="server private key (PEM)")
+  arg_parser.add_option("--json", dest="json_path", default=None,
+                        help="write results as JSON to a file (or - for stdout)")
+  options, args = arg_parser.parse_args()
+
+  work_dir = tempfile.mkdtemp(prefix="compilesubs_bench_")
+  global_config._settings_dir = work_dir  # For checkpoints.
+
+  results = []
+  mismatches = 0
+  try:
+    if (options.cert_path and options.key_path):
+      cert_path, key_path = options.cert_path, options.key_path
+    else:
+      cert_path, key_path = make_cert(work_dir)
+
+    TimelineHandler.latency = options.latency_ms / 1000.0
+    TimelineHandler.rate_json = make_rate_json(180)
+
+    server = start_server(cert_path, key_path)
+    host = "localhost:%d" % server.server_address[1]
+    pool = ConnectionPool(ssl_context=ssl.create_default_context(cafile=cert_path))
+    tweepy_backend.tweepy_api = tweepy.API(auth_handler=StandInAuth(), host=host, search_host=host, pool=pool)
+
+    print "%6s %10s %10s %10s %10s %10s %10s" % ("run", "pull", "snarks", "requests", "wall (s)", "cpu (s)", "correct")
+    for run in range(options.runs):
+      set_timelines(options.mentions, options.timeline, 0)
+      (snarks, request_count), wall_seconds, cpu_seconds = benchutils.time_call(pull, True)
+      correct = (len(set(x["msg_url"] for x in snarks)) == len(snarks))
+      if (not correct): mismatches += 1
+      print "%6d %10s %10d %10d %10.2f %10.2f %10s" % (run, "full", len(snarks), request_count, wall_seconds, cpu_seconds, correct)
+      results.append({"run":run, "pull":"full", "snarks":len(snarks), "requests":request_count, "latency_ms":options.latency_ms,
+                      "wall_seconds":wall_seconds, "cpu_seconds":cpu_seconds, "correct":correct})
+
+      set_timelines(options.mentions, options.timeline, options.new)
+      (snarks, request_count), wall_seconds, cpu_seconds = benchutils.time_call(pull, False)
+      # Compared with a full pull, except for older tweets,
+      # which only the checkpoint still has.
+      expected, ignored = pull(True)
+      expected_urls = set(x["msg_url"] for x in expected)
+      correct = ([x for x in snarks if (x["msg_url"] in expected_urls)] == expected)
+      if (not correct): mismatches += 1
+      print "%6d %10s %10d %10d %10.2f %10.2f %10s" % (run, "checkpoint", len(snarks), request_count, wall_seconds, cpu_seconds, correct)
+      results.append({"run":run, "pull":"checkpoint", "snarks":len(snarks), "requests":request_count, "latency_ms":options.latency_ms,
+                      "wall_seconds":wall_seconds, "cpu_seconds":cpu_seconds, "correct":correct})
+
+    pool.close_all()
+    server.shutdown()
+
+  finally:
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+  if (options.json_path):
+    benchutils.write_results(options.json_path, "twitter_mentions", results)
+
+  if (mismatches > 0):
+    print "Pulls repeated or missed tweets %d times." % mismatches
+    raise SystemExit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,105 @@
+import array
+import gc
+import json
+import os
+import platform
+import sys
+import time
+
+
+# Let benchmarks import the lib package from the parent dir.
+repo_folder = os.path.realpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+if (repo_folder not in sys.path): sys.path.insert(0, repo_folder)
+
+lib_subfolder = os.path.join(repo_folder, "lib")
+if (lib_subfolder not in sys.path): sys.path.insert(0, lib_subfolder)
+
+
+def deep_sizeof(obj):
+  """Returns the approximate bytes used by an object and everything it references.
+  Objects referenced more than once are only counted once.
+
+  :param obj: Any object (dicts, lists, tuples, arrays and instances are traversed).
+  :return: A number of bytes.
+  """
+  seen = set()
+  pending = [obj]
+  total = 0
+
+  while (pending):
+    o = pending.pop()
+    if (id(o) in seen): continue
+    seen.add(id(o))
+    total += sys.getsizeof(o)
+
+    if (isinstance(o, dict)):
+      pending.extend(o.keys())
+      pending.extend(o.values())
+    elif (isinstance(o, (list, tuple, set, frozenset))):
+      pending.extend(o)
+    elif (isinstance(o, (basestring, int, long, float, array.array))):
+      pass
+    else:
+      if (hasattr(o, "__dict__")):
+        pending.append(o.__dict__)
+      for slot in getattr(type(o), "__slots__", []):
+        if (hasattr(o, slot)): pending.append(getattr(o, slot))
+
+  return total
+
+
+def time_call(func, *args, **kwargs):
+  """Calls a function with the garbage collector paused.
+
+  :return: A (result, wall seconds, cpu seconds) tuple.
+  """
+  gc_was_enabled = gc.isenabled()
+  gc.collect()
+  gc.disable()
+  try:
+    wall_start = time.time()
+    cpu_start = time.clock()
+    result = func(*args, **kwargs)
+    cpu_seconds = time.clock() - cpu_start
+    wall_seconds = time.time() - wall_start
+  finally:
+    if (gc_was_enabled): gc.enable()
+
+  return (result, wall_seconds, cpu_seconds)
+
+
+def parse_sizes(s):
+  """Parses a comma-separated list of counts, allowing "k" and "m" suffixes.
+
+  :param s: A string such as "10k,100k,1m".
+  :return: A list of ints.
+  """
+  result = []
+  for token in s.split(","):
+    token = token.strip().lower()
+    if (not token): continue
+    multiplier = 1
+    if (token.endswith("k")): multiplier, token = 1000, token[:-1]
+    elif (token.endswith("m")): multiplier, token = 1000000, token[:-1]
+    result.append(int(float(token) * multiplier))
+  return result
+
+
+def write_results(path, bench_name, results):
+  """Writes benchmark results as JSON, along with some environment info.
+
+  :param path: A file path, or "-" for stdout.
+  :param bench_name: A name for this benchmark.
+  :param results: A list of dicts.
+  """
+  report = {"benchmark":bench_name,
+            "python":platform.python_version(),
+            "platform":platform.platform(aliased=True, terse=True),
+            "date":time.strftime("%Y-%m-%d %H:%M:%S"),
+            "results":results}
+  text = json.dumps(report, indent=2, sort_keys=True)
+  if (path == "-"):
+    print text
+  else:
+    with open(path, "w") as f:
+      f.write(text +"\n")
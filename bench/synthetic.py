@@ -0,0 +1,132 @@
+import cgi
+from datetime import datetime, timedelta
+import json
+import pickle
+import random
+
+from lib import common
+
+
+WORDS = ["lol", "this", "movie", "is", "so", "bad", "wait", "what", "why",
+         "robot", "explosion", "the", "a", "hero", "villain", "plot", "hole",
+         "again", "MockTM", "RT", "seriously", "budget", "acting", "cat"]
+
+
+def generate_snarks(count, user_count=200, start_date=datetime(2013, 5, 1, 20, 0, 0),
+                    mean_gap=0.5, urls=False, multiline=0.0, bursts=0.0, seed=1):
+  """Generates parsed snark dicts{user,msg,date}, resembling a live chat.
+
+  :param count: The number of snarks.
+  :param user_count: The number of distinct users.
+  :param start_date: The date of the first snark.
+  :param mean_gap: Average seconds between snarks (bursts are common).
+  :param urls: Boolean to add "user_url" and "msg_url" attributes.
+  :param multiline: Fraction of msgs that span several lines.
+  :param bursts: Fraction of snarks that begin a dense burst,
+                 dozens of msgs within a few seconds.
+  :param seed: Random seed, so runs are comparable.
+  :return: A list of snark dicts, in chronological order.
+  """
+  rng = random.Random(seed)
+  users = ["@user%d" % i for i in range(user_count)]
+  date = start_date
+  burst_remaining = 0
+  snarks = []
+
+  for i in xrange(count):
+    # A few users are far chattier than the rest.
+    user = users[min(int(rng.expovariate(6.0/user_count)), user_count-1)]
+    msg = " ".join(rng.choice(WORDS) for w in range(rng.randint(2, 12)))
+    if (rng.random() < 0.1): msg = "RT "+ msg
+
+    if (multiline and rng.random() < multiline):
+      msg += "".join("\n"+ " ".join(rng.choice(WORDS) for w in range(rng.randint(1, 6))) for n in range(rng.randint(1, 3)))
+
+    if (burst_remaining > 0):
+      burst_remaining -= 1
+      if (rng.random() < 0.1): date = date + timedelta(seconds=1)
+    else:
+      if (bursts and rng.random() < bursts):
+        burst_remaining = rng.randint(20, 100)
+      if (rng.random() < 0.7):
+        date = date + timedelta(seconds=int(rng.expovariate(1.0/mean_gap)))
+
+    snark = {"user":user, "msg":msg, "date":date}
+    if (urls):
+      snark["user_url"] = "http://www.twitter.com/%s" % user[1:]
+      snark["msg_url"] = "http://twitter.com/#!/%s/status/%d" % (user[1:], 300000000000000000+i)
+    snarks.append(snark)
+
+  return snarks
+
+
+def write_tweetsubs_log(f, snarks, seed=1):
+  """Writes snarks as a TweetSubs log, with random lag and occasional noise.
+
+  :param f: A binary-mode file-like object.
+  :param snarks: A list of snark dicts{user,msg,date}, as from generate_snarks().
+  """
+  rng = random.Random(seed)
+  f.write("%s INFO: Logging started\r\n" % (snarks[0]["date"] if (snarks) else datetime.now()).strftime("%Y-%m-%d %H:%M:%S"))
+  for snark in snarks:
+    lag = rng.randint(0, 9)
+    stamp = (snark["date"] + timedelta(seconds=lag)).strftime("%Y-%m-%d %H:%M:%S")
+    f.write("%s INFO: Tweet shown (lag %ds): %s: %s\r\n" % (stamp, lag, snark["user"].lstrip("@"), snark["msg"].replace("\n", "\r\n")))
+    if (rng.random() < 0.02):
+      f.write("%s WARNING: Tweet queue is getting long\r\n" % stamp)
+
+def write_tabbed_text(f, snarks):
+  """Writes snarks as tab-separated text, the way the tabbed_text exporter would.
+
+  :param f: A binary-mode file-like object.
+  :param snarks: A list of snark dicts{user,msg,date}, as from generate_snarks().
+  """
+  f.write("\t".join(["In-Movie Time", "Original Date", "Color", "User", "Msg"]) +"\r\n")
+  for snark in snarks:
+    snark_start = common.delta_str(snark["date"] - snarks[0]["date"])
+    snark_date = snark["date"].strftime("%Y-%m-%d %H:%M:%S")
+    f.write("\t".join([snark_start, snark_date, "", snark["user"], snark["msg"].replace("\n", "\\n")]) +"\r\n")
+
+def write_lousycanuck_html(f, snarks):
+  """Writes snarks as a LousyCanuck transcript blog post.
+  Msgs are flattened to one line, as on the blog.
+
+  :param f: A binary-mode file-like object.
+  :param snarks: A list of snark dicts, as from generate_snarks(urls=True).
+  """
+  f.write("<html>\r\n<body>\r\n<div class=\"entry-content\">\r\n")
+  for i, snark in enumerate(snarks):
+    user_url = snark.get("user_url", "http://www.twitter.com/%s" % snark["user"][1:])
+    msg_url = snark.get("msg_url", "http://twitter.com/#!/%s/status/%d" % (snark["user"][1:], i))
+    msg = cgi.escape(snark["msg"].replace("\n", " "))
+    snark_date = snark["date"].strftime("%Y-%m-%d %H:%M:%S")
+    f.write("<p><a href='%s'>%s</a>: %s <br/><font size=-3><a href='%s' style='color: grey; text-decoration: none;'>%s</a></font></p>\r\n" % (user_url, snark["user"], msg, msg_url, snark_date))
+  f.write("<div class=\"sharedaddy robots-nocontent\">\r\n</div>\r\n</div>\r\n</body>\r\n</html>\r\n")
+
+def write_pickled_snarks(f, snarks):
+  """Writes snarks as a pickle, the way the pickled_snarks exporter would.
+
+  :param f: A binary-mode file-like object.
+  :param snarks: A list of snark dicts.
+  """
+  pickle.dump(snarks, f)
+
+def write_jsonl(f, snarks):
+  """Writes snarks as JSON lines, the way the jsonl exporter would.
+
+  :param f: A binary-mode file-like object.
+  :param snarks: A list of snark dicts{user,msg,date}, as from generate_snarks().
+  """
+  for snark in snarks:
+    record = dict(snark)
+    record["date"] = snark["date"].isoformat()
+    record["time"] = common.delta_seconds(snark["date"] - snarks[0]["date"])
+    f.write(json.dumps(record, separators=(",",":")) +"\n")
+
+
+# Parser names, mapped to functions writing input they can parse.
+INPUT_WRITERS = {"tweetsubs_log":write_tweetsubs_log,
+                 "tabbed_text":write_tabbed_text,
+                 "transcript_lousycanuck":write_lousycanuck_html,
+                 "pickled_snarks":write_pickled_snarks,
+                 "jsonl":write_jsonl}
@@ -59,12 +59,17 @@ if __name__ == "__main__":
 # Import everything else.
 try:
   from datetime import datetime, timedelta
+  import multiprocessing
+  import optparse
   import platform
   import re
   import urllib2
 
   from lib import common
   from lib import global_config
+  from lib import instrumentation
+  from lib import parsecache
+  from lib import pipeline
   from lib import snarkutils
 
 except (Exception) as err:
@@ -73,9 +78,11 @@ except (Exception) as err:
 
 
 
-def main_cli():
+def main_cli(options):
   config = None
-  snarks = []
+
+  if (options.profile_path):
+    instrumentation.enable()
 
   try:
     # If common's backend prompt funcs were to be replaced
@@ -89,17 +96,7 @@ def main_cli():
     sys.dont_write_bytecode = False
     config = common.Changeling(config)  # A copy w/o module baggage.
 
-    logging.info("Calling %s parser..." % config.parser_name)
-    snarks = snarkutils.parse_snarks(config)
-    if (len(snarks) == 0):
-      raise common.CompileSubsException("No messages were parsed.")
-
-    snarkutils.process_snarks(config, snarks)
-    if (len(snarks) == 0):
-      raise common.CompileSubsException("After processing, no messages were left.")
-
-    logging.info("Calling %s exporter..." % config.exporter_name)
-    snarkutils.export_snarks(config, snarks)
+    pipeline.run_pipeline(config, stream=options.stream, columnar=options.columnar)
 
     logging.info("Done.")
 
@@ -112,10 +109,72 @@ def main_cli():
     logging.exception(err)
     sys.exit(1)
 
+  finally:
+    if (options.profile_path):
+      instrumentation.disable()
+      write_profile(options.profile_path, options)
+
+
+def main_batch(options):
+  config_paths = pipeline.find_configs(options.batch_patterns)
+  if (len(config_paths) == 0):
+    logging.error("No config files matched: %s" % ", ".join(options.batch_patterns))
+    sys.exit(1)
+
+  workers = options.workers
+  if (workers == 0): workers = multiprocessing.cpu_count()
+  logging.info("Compiling %d configs, %d at a time..." % (len(config_paths), workers))
+
+  results = pipeline.run_batch(config_paths, workers=workers, stream=options.stream, columnar=options.columnar)
+  pipeline.log_batch_summary(results)
+
+  if (len(results) < len(config_paths) or not all(r["ok"] for r in results)):
+    sys.exit(1)
+
+
+def write_profile(path, options):
+  """Logs a summary of instrumented stages and writes them as JSON."""
+  instrumentation.log_summary()
+  try:
+    instrumentation.write_report(path, extra_info={"stream":options.stream, "columnar":options.columnar})
+    logging.info("Wrote profile: %s" % path)
+  except (IOError) as err:
+    logging.error("Could not write profile: %s" % str(err))
+
 
 def main():
+  arg_parser = optparse.OptionParser(version="CompileSubs %s" % global_config.VERSION)
+  arg_parser.add_option("--stream", dest="stream", action="store_true", default=False,
+                        help="parse, process and export one snark at a time (for huge logs)")
+  arg_parser.add_option("--columnar", dest="columnar", action="store_true", default=False,
+                        help="store parsed snarks in compact columns to save memory")
+  arg_parser.add_option("--profile", dest="profile_path", metavar="FILE", default=None,
+                        help="write per-stage timing and memory use to a JSON file (summarized in log.txt)")
+  arg_parser.add_option("--cache", dest="cache", action="store_true", default=False,
+                        help="reuse cached parser results, while the source and parser options are unchanged")
+  arg_parser.add_option("--purge-cache", dest="purge_cache", action="store_true", default=False,
+                        help="delete all cached parser results first")
+  arg_parser.add_option("--batch", dest="batch_patterns", metavar="DIR_OR_GLOB", action="append", default=[],
+                        help="compile each config file in a dir (or matching a glob), instead of config.py (repeatable)")
+  arg_parser.add_option("--workers", dest="workers", type="int", default=0,
+                        help="with --batch, how many configs to compile at once (0 is one per CPU) [default: %default]")
+  options, args = arg_parser.parse_args()
+
+  if (options.workers < 0):
+    arg_parser.error("--workers can't be negative.")
+  if (options.batch_patterns and options.profile_path):
+    arg_parser.error("--profile can't be used with --batch.")
+
   logging.info("CompileSubs %s (on %s)" % (global_config.VERSION, platform.platform(aliased=True, terse=False)))
-  main_cli()
+  if (options.cache):
+    parsecache.enable()
+  if (options.purge_cache):
+    logging.info("Purged %d cached parser results." % parsecache.purge())
+
+  if (options.batch_patterns):
+    main_batch(options)
+  else:
+    main_cli(options)
 
 
 
@@ -0,0 +1,307 @@
+import bz2
+import os
+import urlparse
+import zlib
+
+try:
+  import lzma
+except (ImportError) as err:
+  try:
+    from backports import lzma
+  except (ImportError) as err:
+    lzma = None
+
+from lib import common
+
+
+# File extensions, and the codecs they imply.
+extensions = {".gz":"gzip", ".bz2":"bz2", ".xz":"xz"}
+
+# Compression levels to write with, per codec (1-9).
+# Higher levels spend more CPU for smaller files.
+levels = {"gzip":6, "bz2":9, "xz":6}
+
+# Compressed bytes to read at a time.
+read_size = 256*1024
+
+# Uncompressed bytes to gather before compressing. Callers
+# like pickle make many tiny writes.
+write_size = 64*1024
+
+
+def get_codec(path):
+  """Returns the codec a path's extension implies, or None.
+
+  :param path: A file path, or a url.
+  :return: "gzip", "bz2", "xz", or None.
+  """
+  if (not path): return None
+  p = urlparse.urlparse(path)
+  if (len(p.scheme) > 1): path = p.path  # Not a drive letter.
+  return extensions.get(os.path.splitext(path)[1].lower())
+
+def is_available(codec):
+  """Returns True if a codec can be used, False otherwise.
+  The "xz" codec needs the lzma module (or backports.lzma).
+  """
+  if (codec == "xz"): return (lzma is not None)
+  return (codec in levels)
+
+
+def _check_codec(codec):
+  if (codec not in levels):
+    raise common.CompileSubsException("Unknown compression codec: %s" % codec)
+  if (not is_available(codec)):
+    raise common.CompileSubsException("The %s codec requires the lzma module, which could not be imported." % codec)
+
+def _new_compressor(codec, level):
+  if (codec == "gzip"):
+    return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+  elif (codec == "bz2"):
+    return bz2.BZ2Compressor(level)
+  else:
+    return lzma.LZMACompressor(preset=level)
+
+def _new_decompressor(codec):
+  if (codec == "gzip"):
+    return zlib.decompressobj(16 + zlib.MAX_WBITS)
+  elif (codec == "bz2"):
+    return bz2.BZ2Decompressor()
+  else:
+    return lzma.LZMADecompressor()
+
+
+class CompressedWriter(object):
+  """A file-like wrapper that compresses whatever is written,
+  passing it on to another file in a single stream.
+
+  Closing this writes the end of the stream, but leaves
+  the underlying file open.
+  """
+
+  def __init__(self, dest_file, codec, level=None):
+    """Constructor.
+
+    :param dest_file: A binary-mode file-like object to write into.
+    :param codec: "gzip", "bz2", or "xz".
+    :param level: Compression level (1-9), or None for the codec's default in the levels dict.
+    :raises: CompileSubsException
+    """
+    object.__init__(self)
+    _check_codec(codec)
+    self.dest_file = dest_file
+    self.codec = codec
+    self.closed = False
+    self._compressor = _new_compressor(codec, (level if (level is not None) else levels[codec]))
+    self._pending = []  # Uncompressed strings.
+    self._pending_size = 0
+
+  def write(self, data):
+    if (self.closed): raise ValueError("I/O operation on closed file")
+    if (isinstance(data, unicode)): data = str(data)  # Same as a real file in binary mode.
+    self._pending.append(data)
+    self._pending_size += len(data)
+    if (self._pending_size >= write_size): self._compress_pending()
+
+  def _compress_pending(self):
+    block = self._compressor.compress("".join(self._pending))
+    del self._pending[:]
+    self._pending_size = 0
+    if (block): self.dest_file.write(block)
+
+  def writelines(self, lines):
+    for line in lines:
+      self.write(line)
+
+  def flush(self):
+    """Passes on whatever has been compressed so far.
+    The compressor may still hold some back.
+    """
+    if (self.closed): raise ValueError("I/O operation on closed file")
+    self._compress_pending()
+    self.dest_file.flush()
+
+  def close(self):
+    if (self.closed): return
+    self.closed = True
+    self._compress_pending()
+    self.dest_file.write(self._compressor.flush())
+    self._compressor = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+
+class DecompressedReader(object):
+  """A file-like wrapper that decompresses another file while
+  it's being read, a block at a time.
+
+  Concatenated streams (as from "cat a.gz b.gz") are read
+  one after another. Corrupt data raises IOError.
+  """
+
+  def __init__(self, src_file, codec):
+    """Constructor.
+
+    :param src_file: A binary-mode file-like object to read from.
+    :param codec: "gzip", "bz2", or "xz".
+    :raises: CompileSubsException
+    """
+    object.__init__(self)
+    _check_codec(codec)
+    self.src_file = src_file
+    self.codec = codec
+    self.closed = False
+    self._decompressor = _new_decompressor(codec)
+    self._stream_ended = False  # Whether the current stream is complete.
+    self._buf = ""
+    self._pos = 0  # Read position in the buffer.
+    self._eof = False
+    self._read_any = False
+
+  def _fill(self):
+    """Decompresses more data into the buffer.
+
+    :return: False at the end of the file, True otherwise.
+    :raises: IOError
+    """
+    while (not self._eof):
+      data = self.src_file.read(read_size)
+      if (not data):
+        self._eof = True
+        if (self._read_any and not self._stream_ended and not self._is_stream_over()):
+          raise IOError("Compressed file ended before the end-of-stream marker was reached")
+        return False
+      self._read_any = True
+
+      try:
+        block = self._decompress(data)
+      except (zlib.error, EOFError) as err:
+        raise IOError("Invalid %s data: %s" % (self.codec, str(err)))
+      except (Exception) as err:
+        if (lzma is not None and isinstance(err, lzma.LZMAError)):
+          raise IOError("Invalid %s data: %s" % (self.codec, str(err)))
+        raise
+
+      if (block):
+        self._buf = self._buf[self._pos:] + block
+        self._pos = 0
+        return True
+    return False
+
+  def _decompress(self, data):
+    """Decompresses data, starting new streams as old ones end."""
+    blocks = []
+    while (data):
+      if (self._stream_ended):
+        if (not data.strip("\0")): break  # Trailing padding.
+        self._decompressor = _new_decompressor(self.codec)
+        self._stream_ended = False
+
+      try:
+        blocks.append(self._decompressor.decompress(data))
+      except (EOFError) as err:
+        self._stream_ended = True  # The stream had ended exactly at the last block.
+        continue
+
+      unused_data = self._decompressor.unused_data
+      if (unused_data):
+        self._stream_ended = True
+      elif (getattr(self._decompressor, "eof", False)):
+        self._stream_ended = True
+      data = unused_data
+
+    return "".join(blocks)
+
+  def _is_stream_over(self):
+    """Returns True if the current stream has ended.
+
+    Older zlib and bz2 decompressors can't say, unless
+    given more data, which they'll refuse or set aside.
+    """
+    d = self._decompressor
+    if (hasattr(d, "eof")): return d.eof
+    try:
+      d.decompress("\0")
+    except (EOFError) as err:
+      return True
+    except (Exception) as err:
+      return False
+    return (d.unused_data != "")
+
+  def _take(self, end):
+    """Removes and returns buffered data, up to an offset from the read position."""
+    result = self._buf[self._pos:end]
+    self._pos = end
+    if (self._pos >= len(self._buf)):
+      self._buf, self._pos = "", 0
+    return result
+
+  def read(self, size=-1):
+    if (self.closed): raise ValueError("I/O operation on closed file")
+    if (size is None or size < 0):
+      while (self._fill()): pass
+      return self._take(len(self._buf))
+
+    end = self._pos + size
+    if (end < len(self._buf)):
+      # Already buffered. This is the common case, with pickles.
+      result = self._buf[self._pos:end]
+      self._pos = end
+      return result
+
+    while (len(self._buf) - self._pos < size and self._fill()): pass
+    return self._take(min(self._pos + size, len(self._buf)))
+
+  def read_block(self):
+    """Returns whatever has been decompressed so far, or
+    the next block. At the end of the file, returns "".
+    """
+    if (self.closed): raise ValueError("I/O operation on closed file")
+    if (self._pos >= len(self._buf)): self._fill()
+    return self._take(len(self._buf))
+
+  def readline(self, size=-1):
+    if (self.closed): raise ValueError("I/O operation on closed file")
+    i = self._buf.find("\n", self._pos)
+    if (i != -1 and (size is None or size < 0)):
+      result = self._buf[self._pos:i+1]
+      self._pos = i + 1
+      return result
+
+    searched = 0  # Chars past the read position known to lack a newline.
+    while (True):
+      i = self._buf.find("\n", self._pos + searched)
+      if (i != -1):
+        end = i + 1
+        break
+      searched = len(self._buf) - self._pos
+      if (not self._fill()):  # This moves the read position.
+        end = len(self._buf)
+        break
+
+    if (size is not None and size >= 0): end = min(end, self._pos + size)
+    return self._take(end)
+
+  def __iter__(self):
+    return self
+
+  def next(self):
+    line = self.readline()
+    if (not line): raise StopIteration
+    return line
+
+  def close(self):
+    if (self.closed): return
+    self.closed = True
+    self._buf, self._pos = "", 0
+    self.src_file.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
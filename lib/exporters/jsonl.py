@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+import json
+import logging
+import re
+import sys
+import time
+
+from lib import arginfo
+from lib import common
+from lib import global_config
+
+
+# Namespace for options.
+ns = "jsonl."
+
+# Whether dest_file arg is used.
+uses_dest_file = True
+
+# Whether the snarks arg may be a one-pass iterator, rather than a list.
+streams_snarks = True
+
+# Names of lib.subsystem modules that should be set up in advance.
+required_subsystems = []
+
+# Lines to serialize before each write to dest_file.
+lines_per_write = 1000
+
+
+def get_description():
+  return "Writes snarks as JSON lines, one object per snark."
+
+def get_arginfo():
+  args = []
+  return args
+
+def write_snarks(dest_file, snarks, show_time, options={}, keep_alive_func=None, sleep_func=None):
+  """Writes snarks as JSON lines, one object per snark.
+
+  This will save EVERY attribute of snarks, in case a
+  parser adds non-standard ones. Dates become ISO 8601
+  strings ("2013-05-01T20:00:00"), times become integer
+  seconds, and colors become [r, g, b] lists (or null).
+  Other attributes must be strings, numbers, booleans,
+  None, datetimes or timedeltas (written the same way
+  as dates and times). Text is escaped to ASCII, so
+  newlines in msgs can't break lines.
+
+  :param dest_file: A binary-mode file-like object to write into.
+  :param snarks: A list (or iterator) of processed snark dicts.
+  :param show_time: Timedelta duration each msg appears on-screen.
+  :param options: A dict of extra options specific to this exporter.
+                  Not used.
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :raises: ExporterError
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  # Python 2.7's C encoder is skipped if keys are sorted.
+  encoder = json.JSONEncoder(separators=(",",":"), default=_encode_value)
+
+  chunk = []
+  try:
+    for snark in snarks:
+      record = dict(snark.items())
+      if (isinstance(record.get("date"), datetime)): record["date"] = record["date"].isoformat()
+      if (isinstance(record.get("time"), timedelta)): record["time"] = common.delta_seconds(record["time"])
+
+      chunk.append(encoder.encode(record))
+      if (len(chunk) >= lines_per_write):
+        chunk.append("")
+        dest_file.write("\n".join(chunk))
+        del chunk[:]
+        if (keep_alive_func() is False): return
+
+  except (TypeError, ValueError) as err:
+    raise common.ExporterError("A snark attribute can't be written as JSON: %s" % str(err))
+
+  if (chunk):
+    chunk.append("")
+    dest_file.write("\n".join(chunk))
+
+def _encode_value(value):
+  """Returns a JSON-friendly equivalent for values the encoder lacks."""
+  if (isinstance(value, datetime)): return value.isoformat()
+  if (isinstance(value, timedelta)): return common.delta_seconds(value)
+  raise TypeError("%r is not JSON serializable" % (value,))
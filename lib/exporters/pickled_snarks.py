@@ -1,47 +1,53 @@
-from datetime import datetime, timedelta
-import logging
-import pickle
-import re
-import sys
-import time
-
-from lib import arginfo
-from lib import common
-from lib import global_config
-
-
-# Namespace for options.
-ns = "pickled_snarks."
-
-# Whether dest_file arg is used.
-uses_dest_file = True
-
-# Names of lib.subsystem modules that should be set up in advance.
-required_subsystems = []
-
-
-def get_description():
-  return "Writes snarks to a pickle file."
-
-def get_arginfo():
-  args = []
-  return args
-
-def write_snarks(dest_file, snarks, show_time, options={}, keep_alive_func=None, sleep_func=None):
-  """Writes snarks to a pickle file.
-
-  This will save EVERY attribute of snarks, in case a
-  parser adds non-standard ones.
-
-  :param dest_file: A binary-mode file-like object to write into.
-  :param snarks: A list of processed snark dicts.
-  :param show_time: Timedelta duration each msg appears on-screen.
-  :param options: A dict of extra options specific to this exporter.
-                  Not used.
-  :param keep_alive_func: Optional replacement to get an abort boolean.
-  :param sleep_func: Optional replacement to sleep N seconds.
-  """
-  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
-  if (sleep_func is None): sleep_func = global_config.nap
-
-  pickle.dump(snarks, dest_file)
+from datetime import datetime, timedelta
+import logging
+import pickle
+import re
+import sys
+import time
+
+from lib import arginfo
+from lib import common
+from lib import global_config
+
+
+# Namespace for options.
+ns = "pickled_snarks."
+
+# Whether dest_file arg is used.
+uses_dest_file = True
+
+# Whether the snarks arg may be a one-pass iterator, rather than a list.
+streams_snarks = False
+
+# Names of lib.subsystem modules that should be set up in advance.
+required_subsystems = []
+
+
+def get_description():
+  return "Writes snarks to a pickle file."
+
+def get_arginfo():
+  args = []
+  return args
+
+def write_snarks(dest_file, snarks, show_time, options={}, keep_alive_func=None, sleep_func=None):
+  """Writes snarks to a pickle file.
+
+  This will save EVERY attribute of snarks, in case a
+  parser adds non-standard ones.
+
+  :param dest_file: A binary-mode file-like object to write into.
+  :param snarks: A list of processed snark dicts.
+  :param show_time: Timedelta duration each msg appears on-screen.
+  :param options: A dict of extra options specific to this exporter.
+                  Not used.
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  if (not isinstance(snarks, list)):
+    snarks = [dict(x.items()) for x in snarks]  # Plain dicts, as from a SnarkTable.
+
+  pickle.dump(snarks, dest_file)
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+import logging
+import re
+import sys
+import time
+
+from lib import arginfo
+from lib import common
+from lib import global_config
+from lib import snarkarchive
+
+
+# Namespace for options.
+ns = "snark_archive."
+
+# Whether dest_file arg is used.
+uses_dest_file = True
+
+# Whether the snarks arg may be a one-pass iterator, rather than a list.
+streams_snarks = True
+
+# Names of lib.subsystem modules that should be set up in advance.
+required_subsystems = []
+
+
+def get_description():
+  return "Writes snarks to a snark archive file."
+
+def get_arginfo():
+  args = []
+  return args
+
+def write_snarks(dest_file, snarks, show_time, options={}, keep_alive_func=None, sleep_func=None):
+  """Writes snarks to a snark archive file.
+
+  This will save EVERY attribute of snarks, in case a
+  parser adds non-standard ones (strings, numbers,
+  booleans, dates and times). Unlike a pickle, the
+  archive can be loaded partially, and loading it
+  can't run arbitrary code. See lib/snarkarchive.py.
+
+  :param dest_file: A binary-mode file-like object to write into.
+  :param snarks: A list (or iterator) of processed snark dicts.
+  :param show_time: Timedelta duration each msg appears on-screen.
+  :param options: A dict of extra options specific to this exporter.
+                  Not used.
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :raises: ExporterError
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  try:
+    snarkarchive.write_archive(dest_file, snarks)
+  except (common.CompileSubsException) as err:
+    raise common.ExporterError(str(err))
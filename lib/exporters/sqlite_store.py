@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+import logging
+import re
+import sys
+import time
+
+from lib import arginfo
+from lib import common
+from lib import global_config
+from lib import snarkstore
+
+
+# Namespace for options.
+ns = "sqlite_store."
+
+# Whether dest_file arg is used.
+uses_dest_file = False
+
+# Whether the snarks arg may be a one-pass iterator, rather than a list.
+streams_snarks = True
+
+# Names of lib.subsystem modules that should be set up in advance.
+required_subsystems = []
+
+
+def get_description():
+  return "Writes snarks to an SQLite snark store, as one show among many."
+
+def get_arginfo():
+  args = []
+  args.append(arginfo.Arg(name="db_path", type=arginfo.FILE,
+              required=True, default=None, choices=None, multiple=False,
+              description="Database file to write into.\nIt will be created if necessary."))
+  args.append(arginfo.Arg(name="show_id", type=arginfo.STRING,
+              required=True, default=None, choices=None, multiple=False,
+              description="A name for this show.\nSnarks stored earlier under the same name are replaced."))
+  return args
+
+def write_snarks(dest_file, snarks, show_time, options={}, keep_alive_func=None, sleep_func=None):
+  """Writes snarks to an SQLite snark store.
+
+  The database is updated in place, in a single transaction,
+  so other shows' snarks are left alone, and an interrupted
+  export changes nothing. It's indexed by show, in-movie
+  time, date and user, for the sqlite_store parser's
+  queries. See lib/snarkstore.py.
+
+  This will save EVERY attribute of snarks, in case a
+  parser adds non-standard ones (strings, numbers,
+  booleans, dates and times).
+
+  :param dest_file: Not used.
+  :param snarks: A list (or iterator) of processed snark dicts.
+  :param show_time: Timedelta duration each msg appears on-screen.
+  :param options: A dict of extra options specific to this exporter.
+                  db_path:
+                      Database file to write into.
+                  show_id:
+                      A name for this show.
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :raises: ExporterError
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  missing_options = [o for o in ["db_path","show_id"] if ((ns+o) not in options or not options[ns+o])]
+  if (len(missing_options) > 0):
+    logging.error("Required exporter options weren't provided: %s." % ", ".join(missing_options))
+    raise common.ExporterError("Exporter failed.")
+
+  try:
+    snarkstore.store_snarks(options[ns+"db_path"], options[ns+"show_id"], snarks, keep_alive_func=keep_alive_func)
+  except (common.CompileSubsException) as err:
+    logging.error(str(err))
+    raise common.ExporterError("Exporter failed.")
@@ -1,118 +1,260 @@
-from datetime import datetime, timedelta
-import logging
-import re
-import sys
-import time
-
-from lib import arginfo
-from lib import common
-from lib import global_config
-
-
-# Namespace for options.
-ns = "subrip."
-
-# Whether dest_file arg is used.
-uses_dest_file = True
-
-# Names of lib.subsystem modules that should be set up in advance.
-required_subsystems = []
-
-
-def get_description():
-  return "Writes snarks as SubRip subtitles."
-
-def get_arginfo():
-  args = []
-  args.append(arginfo.Arg(name="include_names", type=arginfo.BOOLEAN,
-              required=False, default=True, choices=[True,False], multiple=False,
-              description="Boolean to prepend each snark msg with user.\nDefault is True."))
-  return args
-
-def write_snarks(dest_file, snarks, show_time, options={}, keep_alive_func=None, sleep_func=None):
-  """Writes snarks as SubRip subtitles.
-
-  :param dest_file: A binary-mode file-like object to write into.
-  :param snarks: A list of processed snark dicts.
-  :param show_time: Timedelta duration each msg appears on-screen.
-  :param options: A dict of extra options specific to this exporter.
-                  include_names (optional):
-                      Boolean to prepend each snark msg with user.
-                      Default is True.
-  :param keep_alive_func: Optional replacement to get an abort boolean.
-  :param sleep_func: Optional replacement to sleep N seconds.
-  """
-  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
-  if (sleep_func is None): sleep_func = global_config.nap
-
-  include_names = True
-  if (ns+"include_names" in options and not options[ns+"include_names"]):
-    include_names = False
-
-  srt_index = 0
-
-  palette_start = srt_delta_str(timedelta(seconds=1))
-  palette_end = srt_delta_str(timedelta(seconds=1) + show_time)
-  palette_msg = ""
-
-  unique_colors = list(set([x["color"] for x in snarks if ("color" in x)]))
-  if (len(unique_colors) > 0):
-    for c in unique_colors:
-      palette_msg += color_message("#", c)
-
-    if (len(palette_msg) > 0):
-      srt_index += 1
-      dest_file.write(str(srt_index) +"\r\n")
-      dest_file.write(palette_start +" --> "+ palette_end +"\r\n")
-      dest_file.write(palette_msg +"\r\n")
-      dest_file.write("\r\n")
-
-  for snark in snarks:
-    srt_start = srt_delta_str(snark["time"])
-    srt_end = srt_delta_str(snark["time"] + show_time)
-    srt_msg = snark["msg"]
-
-    # SubRip tolerates multiple lines, but not blank lines.
-    srt_msg = re.sub("\r", "", srt_msg)
-    srt_msg = re.sub("\n\n+", "\n", srt_msg)
-
-    # Remove empty space and links.
-    srt_msg = re.sub("^ +", "", srt_msg)
-    srt_msg = re.sub(" *\n *", "\n", srt_msg)
-    srt_msg = srt_msg.rstrip(" \n")
-    srt_msg = re.sub(" *https?://[^ ]+", "", srt_msg)
-
-    if (include_names is True):
-      srt_msg = "%s: %s" % (snark["user"].replace("@",""), srt_msg)
-
-    srt_msg = re.sub("\n", "\r\n", srt_msg)  # Reintroduce CR's.
-
-    if ("color" in snark and snark["color"] is not None):
-      srt_msg = color_message(srt_msg, snark["color"])
-
-    srt_index += 1
-    dest_file.write(str(srt_index) +"\r\n")
-    dest_file.write(srt_start +" --> "+ srt_end +"\r\n")
-    dest_file.write(srt_msg +"\r\n")
-    dest_file.write("\r\n")
-
-
-def srt_delta_str(delta):
-  """Formats a timedelta as an srt string.
-  A millisecond suffix is appended to make
-  SubRip happy.
-
-  :return: The string.
-  """
-  return ("%s,000" % common.delta_str(delta))
-
-
-def color_message(text, color):
-  """Wraps a string with an html/srt FONT tag of the given color.
-
-  :param text: A snark message.
-  :param color: An RGB float tuple (value range: 0.0-1.0).
-  :return: The wrapped string.
-  """
-  text = "<font color=\"#%s\">%s</font>" % (common.rgb_to_hex(color), text)
-  return text
+from datetime import datetime, timedelta
+import contextlib
+import logging
+import marshal
+import re
+import sys
+import tempfile
+import time
+
+from lib import arginfo
+from lib import common
+from lib import global_config
+
+
+# Namespace for options.
+ns = "subrip."
+
+# Whether dest_file arg is used.
+uses_dest_file = True
+
+# Whether the snarks arg may be a one-pass iterator, rather than a list.
+streams_snarks = True
+
+# Names of lib.subsystem modules that should be set up in advance.
+required_subsystems = []
+
+# Cues to render before each write to dest_file.
+cues_per_write = 1000
+
+# Msg cleanup patterns (see clean_msg()).
+_blank_lines_ptn = re.compile("\n\n+")
+_newline_spaces_ptn = re.compile(" *\n *")
+_link_ptn = re.compile(" *https?://[^ ]+")
+
+
+def get_description():
+  return "Writes snarks as SubRip subtitles."
+
+def get_arginfo():
+  args = []
+  args.append(arginfo.Arg(name="include_names", type=arginfo.BOOLEAN,
+              required=False, default=True, choices=[True,False], multiple=False,
+              description="Boolean to prepend each snark msg with user.\nDefault is True."))
+  return args
+
+def write_snarks(dest_file, snarks, show_time, options={}, keep_alive_func=None, sleep_func=None):
+  """Writes snarks as SubRip subtitles.
+
+  :param dest_file: A binary-mode file-like object to write into.
+  :param snarks: A list (or iterator) of processed snark dicts.
+  :param show_time: Timedelta duration each msg appears on-screen.
+  :param options: A dict of extra options specific to this exporter.
+                  include_names (optional):
+                      Boolean to prepend each snark msg with user.
+                      Default is True.
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  include_names = True
+  if (ns+"include_names" in options and not options[ns+"include_names"]):
+    include_names = False
+
+  cue_formatter = CueFormatter(show_time, include_names)
+
+  if (iter(snarks) is snarks):
+    # A one-pass iterator can't be scanned for colors in advance,
+    # so spool formatted cues to disk until the palette is known.
+    unique_colors = set()
+    with contextlib.closing(tempfile.TemporaryFile()) as spool_file:
+      for snark in snarks:
+        if ("color" in snark): unique_colors.add(snark["color"])
+        marshal.dump(cue_formatter.format_cue(snark), spool_file)
+      spool_file.seek(0)
+
+      def iter_spooled_cues():
+        while (True):
+          try:
+            yield marshal.load(spool_file)
+          except (EOFError) as err:
+            break
+
+      srt_index = write_palette(dest_file, 0, list(unique_colors), show_time)
+      write_cues(dest_file, srt_index, iter_spooled_cues())
+    return
+
+  unique_colors = list(set([x["color"] for x in snarks if ("color" in x)]))
+  srt_index = write_palette(dest_file, 0, unique_colors, show_time)
+
+  write_cues(dest_file, srt_index, (cue_formatter.format_cue(snark) for snark in snarks))
+
+
+def write_palette(dest_file, srt_index, unique_colors, show_time):
+  """Writes a cue demonstrating every color, if there are any.
+
+  :param dest_file: A binary-mode file-like object to write into.
+  :param srt_index: The number of cues written so far.
+  :param unique_colors: A list of RGB float tuples (value range: 0.0-1.0).
+  :param show_time: Timedelta duration the cue appears on-screen.
+  :return: The new number of cues written.
+  """
+  palette_start = srt_delta_str(timedelta(seconds=1))
+  palette_end = srt_delta_str(timedelta(seconds=1) + show_time)
+  palette_msg = ""
+
+  if (len(unique_colors) > 0):
+    for c in unique_colors:
+      palette_msg += color_message("#", c)
+
+    if (len(palette_msg) > 0):
+      srt_index += 1
+      write_cue(dest_file, srt_index, palette_start +" --> "+ palette_end, palette_msg)
+
+  return srt_index
+
+
+class CueFormatter(object):
+  """Formats snarks' SubRip timing lines and text.
+
+  Timing strings and color tags are remembered, since
+  the same few recur across many cues.
+  """
+
+  def __init__(self, show_time, include_names):
+    """Constructor.
+
+    :param show_time: Timedelta duration each msg appears on-screen.
+    :param include_names: Boolean to prepend each msg with user.
+    """
+    object.__init__(self)
+    self.show_time = show_time
+    self.show_seconds = common.delta_seconds(show_time)
+    self.include_names = include_names
+    self._time_strs = {}   # Total seconds -> srt string.
+    self._color_tags = {}  # RGB tuple -> opening FONT tag.
+
+  def format_cue(self, snark):
+    """Formats a snark's SubRip timing line and text.
+
+    :param snark: A processed snark dict.
+    :return: A (timing, text) tuple of strings.
+    """
+    start_seconds = common.delta_seconds(snark["time"])
+    if (self.show_time.microseconds == 0):
+      end_seconds = start_seconds + self.show_seconds
+    else:
+      end_seconds = common.delta_seconds(snark["time"] + self.show_time)  # Fractions might carry.
+    srt_times = "%s --> %s" % (self._time_str(start_seconds), self._time_str(end_seconds))
+
+    srt_msg = clean_msg(snark["msg"])
+
+    if (self.include_names is True):
+      srt_msg = "%s: %s" % (snark["user"].replace("@",""), srt_msg)
+
+    if ("\n" in srt_msg):
+      srt_msg = srt_msg.replace("\n", "\r\n")  # Reintroduce CR's.
+
+    color = snark.get("color")
+    if (color is not None):
+      color_tag = self._color_tags.get(color)
+      if (color_tag is None):
+        color_tag = "<font color=\"#%s\">" % common.rgb_to_hex(color)
+        self._color_tags[color] = color_tag
+      srt_msg = "%s%s</font>" % (color_tag, srt_msg)
+
+    return (srt_times, srt_msg)
+
+  def _time_str(self, total_seconds):
+    result = self._time_strs.get(total_seconds)
+    if (result is None):
+      result = srt_delta_str(timedelta(seconds=total_seconds))
+      self._time_strs[total_seconds] = result
+    return result
+
+
+def format_cue(snark, show_time, include_names):
+  """Formats a snark's SubRip timing line and text.
+  To format many snarks, a CueFormatter is faster.
+
+  :param snark: A processed snark dict.
+  :param show_time: Timedelta duration the msg appears on-screen.
+  :param include_names: Boolean to prepend the msg with user.
+  :return: A (timing, text) tuple of strings.
+  """
+  return CueFormatter(show_time, include_names).format_cue(snark)
+
+
+def clean_msg(msg):
+  """Removes blank lines, surrounding spaces, and links from a msg.
+  Patterns that couldn't match are skipped.
+
+  :return: The cleaned string, with "\n" newlines.
+  """
+  # SubRip tolerates multiple lines, but not blank lines.
+  if ("\r" in msg): msg = msg.replace("\r", "")
+  if ("\n\n" in msg): msg = _blank_lines_ptn.sub("\n", msg)
+
+  # Remove empty space and links.
+  msg = msg.lstrip(" ")
+  if ("\n" in msg): msg = _newline_spaces_ptn.sub("\n", msg)
+  msg = msg.rstrip(" \n")
+  if ("http" in msg): msg = _link_ptn.sub("", msg)
+
+  return msg
+
+
+def write_cues(dest_file, srt_index, cues):
+  """Writes numbered SubRip cues, several at a time.
+
+  :param dest_file: A binary-mode file-like object to write into.
+  :param srt_index: The number of cues written so far.
+  :param cues: An iterable of (timing, text) tuples, from format_cue().
+  :return: The new number of cues written.
+  """
+  chunk = []
+  for (srt_times, srt_msg) in cues:
+    srt_index += 1
+    chunk.append("%d\r\n%s\r\n%s\r\n\r\n" % (srt_index, srt_times, srt_msg))
+    if (len(chunk) >= cues_per_write):
+      dest_file.write("".join(chunk))
+      del chunk[:]
+
+  if (len(chunk) > 0):
+    dest_file.write("".join(chunk))
+
+  return srt_index
+
+
+def write_cue(dest_file, srt_index, srt_times, srt_msg):
+  """Writes a numbered SubRip cue.
+
+  :param dest_file: A binary-mode file-like object to write into.
+  :param srt_index: The cue's number.
+  :param srt_times: The timing line, from format_cue().
+  :param srt_msg: The text, from format_cue().
+  """
+  write_cues(dest_file, srt_index - 1, [(srt_times, srt_msg)])
+
+
+def srt_delta_str(delta):
+  """Formats a timedelta as an srt string.
+  A millisecond suffix is appended to make
+  SubRip happy.
+
+  :return: The string.
+  """
+  return ("%s,000" % common.delta_str(delta))
+
+
+def color_message(text, color):
+  """Wraps a string with an html/srt FONT tag of the given color.
+
+  :param text: A snark message.
+  :param color: An RGB float tuple (value range: 0.0-1.0).
+  :return: The wrapped string.
+  """
+  text = "<font color=\"#%s\">%s</font>" % (common.rgb_to_hex(color), text)
+  return text
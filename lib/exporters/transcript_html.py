@@ -1,97 +1,282 @@
-from datetime import datetime, timedelta
-import cgi
-import logging
-import re
-import sys
-import time
-import urllib2
-
-from lib import arginfo
-from lib import common
-from lib import global_config
-
-
-# Namespace for options.
-ns = "transcript_html."
-
-# Whether dest_file arg is used.
-uses_dest_file = True
-
-# Names of lib.subsystem modules that should be set up in advance.
-required_subsystems = []
-
-
-def get_description():
-  return "Writes snarks as html with links to each user and comment."
-
-def get_arginfo():
-  args = []
-  args.append(arginfo.Arg(name="excerpt_only", type=arginfo.BOOLEAN,
-              required=False, default=True, choices=[True,False], multiple=False,
-              description="Boolean to only generate an excerpt to paste elsewhere.\nDefault is True."))
-  args.append(arginfo.Arg(name="faux_twitter_links", type=arginfo.BOOLEAN,
-              required=False, default=False, choices=[True,False], multiple=False,
-              description="Boolean to guess twitter user links, if the parser didn't provide them.\nLinks to comments still can't be guessed and will be \"#\"\nDefault is False."))
-  return args
-
-def write_snarks(dest_file, snarks, show_time, options={}, keep_alive_func=None, sleep_func=None):
-  """Writes snarks as html with links to each user and comment.
-
-  Links will be inert unless snarks have the non-standard
-  "user_url" and "msg_url" attributes, or the faux_twitter_links
-  option is set.
-
-  :param dest_file: A binary-mode file-like object to write into.
-  :param snarks: A list of processed snark dicts.
-  :param show_time: Timedelta duration each msg appears on-screen.
-  :param options: A dict of extra options specific to this exporter.
-                  excerpt_only (optional):
-                      Boolean to only generate an excerpt to paste
-                      elsewhere. Default is True.
-                  faux_twitter_links (optional):
-                      Boolean to guess twitter user links, if snarks
-                      lack the "user_url" attribute. But links to
-                      comments will still be "#". Default is False.
-  :param keep_alive_func: Optional replacement to get an abort boolean.
-  :param sleep_func: Optional replacement to sleep N seconds.
-  """
-  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
-  if (sleep_func is None): sleep_func = global_config.nap
-
-  if (ns+"excerpt_only" in options and options[ns+"excerpt_only"] is False):
-    dest_file.write("<html>\r\n<body>\r\n")
-
-  for snark in snarks:
-    snark_user_url = "#"
-    if ("user_url" in snark):
-      snark_user_url = snark["user_url"]
-    elif (ns+"faux_twitter_links" in options and ns+"faux_twitter_links"):
-      snark_user_url = "http://www.twitter.com/%s" % urllib2.quote(re.sub("^@", "", snark["user"]))
-
-    snark_msg_url = "#"
-    if ("msg_url" in snark):
-      snark_msg_url = snark["msg_url"]
-    elif (ns+"faux_twitter_links" in options and ns+"faux_twitter_links"):
-      pass
-
-    snark_date = snark["date"].strftime("%Y-%m-%d %H:%M:%S")
-
-    # User names will always have @.
-    snark_user = re.sub("^[^@]", "@&", snark["user"])
-
-    snark_msg = snark["msg"]
-    snark_msg = cgi.escape(snark_msg)  # Escape [<>&]
-
-    # Represent newlines with <br/>.
-    snark_msg = re.sub("\n", "<br/>", snark_msg)
-
-    # Numerically escape exotic chars.
-    badchar_ptn = re.compile(eval(r'u"[\u0080-\uffff]"'))  # Removed &<>\" from [] brackets.
-
-    snark_msg = re.sub(badchar_ptn, lambda m: ("&#%d;" % ord(m.group(0))), snark_msg)
-
-    dest_file.write("<a href='%s'>%s</a>: %s <br/><font size=-3><a href='%s' style='color: grey; text-decoration: none;'>%s</a></font><br/>" % (snark_user_url, snark_user, snark_msg, snark_msg_url, snark_date))
-    dest_file.write("\r\n")
-
-  if (ns+"excerpt_only" in options and options[ns+"excerpt_only"] is False):
-    dest_file.write("</body>\r\n</html>\r\n")
+from datetime import datetime, timedelta
+import itertools
+import logging
+import os
+import re
+import sys
+import time
+import urllib2
+
+from lib import arginfo
+from lib import common
+from lib import compression
+from lib import global_config
+
+
+# Namespace for options.
+ns = "transcript_html."
+
+# Whether dest_file arg is used.
+uses_dest_file = True
+
+# Whether the snarks arg may be a one-pass iterator, rather than a list.
+streams_snarks = True
+
+# Names of lib.subsystem modules that should be set up in advance.
+required_subsystems = []
+
+# Rows to render before each write to dest_file.
+rows_per_write = 1000
+
+page_header = "<html>\r\n<body>\r\n"
+page_footer = "</body>\r\n</html>\r\n"
+
+_row_template = "<a href='%s'>%s</a>: %s <br/><font size=-3><a href='%s' style='color: grey; text-decoration: none;'>%s</a></font><br/>\r\n"
+
+_index_row_template = "<a href='%s'>Page %d</a> (%s - %s, %d comments)<br/>\r\n"
+
+# Characters to escape, with their replacements. Exotic chars
+# not listed here get a numeric reference (see escape_msg()).
+_char_refs = {"&":"&amp;", "<":"&lt;", ">":"&gt;", "\n":"<br/>"}
+_escape_ptn = re.compile(u"[&<>\n\u0080-\uffff]")
+
+
+def get_description():
+  return "Writes snarks as html with links to each user and comment."
+
+def get_arginfo():
+  args = []
+  args.append(arginfo.Arg(name="excerpt_only", type=arginfo.BOOLEAN,
+              required=False, default=True, choices=[True,False], multiple=False,
+              description="Boolean to only generate an excerpt to paste elsewhere.\nDefault is True."))
+  args.append(arginfo.Arg(name="faux_twitter_links", type=arginfo.BOOLEAN,
+              required=False, default=False, choices=[True,False], multiple=False,
+              description="Boolean to guess twitter user links, if the parser didn't provide them.\nLinks to comments still can't be guessed and will be \"#\"\nDefault is False."))
+  args.append(arginfo.Arg(name="page_size", type=arginfo.INTEGER,
+              required=False, default=0, choices=None, multiple=False,
+              description="Comments per page, when not an excerpt.\nThe dest file becomes an index of pages.\nDefault is 0 (one page)."))
+  args.append(arginfo.Arg(name="page_path", type=arginfo.FILE,
+              required=False, default=None, choices=None, multiple=False,
+              description="Where to write each page, with %d for its number.\nRelative paths are in the dest file's dir.\nExample: \"transcript_%d.html\""))
+  return args
+
+def write_snarks(dest_file, snarks, show_time, options={}, keep_alive_func=None, sleep_func=None):
+  """Writes snarks as html with links to each user and comment.
+
+  Links will be inert unless snarks have the non-standard
+  "user_url" and "msg_url" attributes, or the faux_twitter_links
+  option is set.
+
+  :param dest_file: A binary-mode file-like object to write into.
+  :param snarks: A list (or iterator) of processed snark dicts.
+  :param show_time: Timedelta duration each msg appears on-screen.
+  :param options: A dict of extra options specific to this exporter.
+                  excerpt_only (optional):
+                      Boolean to only generate an excerpt to paste
+                      elsewhere. Default is True.
+                  faux_twitter_links (optional):
+                      Boolean to guess twitter user links, if snarks
+                      lack the "user_url" attribute. But links to
+                      comments will still be "#". Default is False.
+                  page_size (optional):
+                      Comments per page, when not an excerpt. The
+                      dest file becomes an index of pages. Default
+                      is 0 (one page).
+                  page_path (optional):
+                      Where to write each page, with %d for its
+                      number. Required with page_size. Relative
+                      paths are in dest_path's dir. Pages ending
+                      in ".gz", ".bz2" or ".xz" are compressed.
+                  dest_path (optional):
+                      Path of the dest file, if any (supplied by
+                      snarkutils.export_snarks()).
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :raises: ExporterError
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  excerpt_only = (options.get(ns+"excerpt_only", True) is not False)
+  page_size = (options.get(ns+"page_size") or 0)
+  page_path = options.get(ns+"page_path")
+
+  row_formatter = RowFormatter(bool(options.get(ns+"faux_twitter_links", False)))
+
+  if (excerpt_only or page_size <= 0):
+    if (not excerpt_only): dest_file.write(page_header)
+    write_rows(dest_file, row_formatter, snarks, keep_alive_func=keep_alive_func)
+    if (not excerpt_only): dest_file.write(page_footer)
+    return
+
+  if (not page_path or "%d" not in page_path):
+    raise common.ExporterError("The %s exporter's \"page_path\" option needs a \"%%d\" when paging." % re.sub(".*[.]", "", __name__))
+
+  dest_path = options.get("dest_path")
+  dest_dir = (os.path.dirname(os.path.abspath(dest_path)) if (dest_path) else None)
+  if (dest_dir is not None and not os.path.isabs(page_path)):
+    page_path = os.path.join(dest_dir, page_path)
+
+  # Write each page as its snarks arrive, then an index.
+  page_infos = []  # (page number, first snark time, last snark time, snark count)
+  snarks = iter(snarks)
+  next_snark = next(snarks, None)
+  while (next_snark is not None):
+    page_num = len(page_infos) + 1
+    page_snarks = list(itertools.chain([next_snark], itertools.islice(snarks, page_size - 1)))
+    next_snark = next(snarks, None)  # Peek, to know whether there's another page.
+
+    # Like the dest file, each page replaces any earlier one
+    # only once complete, and may be compressed.
+    has_next = (next_snark is not None)
+    try:
+      with common.atomic_write(page_path % page_num) as page_file:
+        codec = compression.get_codec(page_path % page_num)
+        if (codec):
+          with compression.CompressedWriter(page_file, codec) as compressed_file:
+            write_page(compressed_file, page_path, page_num, row_formatter, page_snarks, has_next=has_next)
+        else:
+          write_page(page_file, page_path, page_num, row_formatter, page_snarks, has_next=has_next)
+    except (IOError, OSError) as err:
+      raise common.ExporterError("Could not write page %s: %s" % (page_path % page_num, str(err)))
+
+    page_infos.append((page_num, page_snarks[0]["time"], page_snarks[-1]["time"], len(page_snarks)))
+    if (keep_alive_func() is False): break
+
+  dest_file.write(page_header)
+  for (page_num, first_time, last_time, count) in page_infos:
+    dest_file.write(_index_row_template % (_index_link(page_path, page_num, dest_dir), page_num,
+                    common.delta_str(first_time), common.delta_str(last_time), count))
+  dest_file.write(page_footer)
+
+
+class RowFormatter(object):
+  """Renders snarks as html rows.
+
+  Users' links and names, and recent dates, are remembered,
+  since they recur across many rows.
+  """
+
+  def __init__(self, faux_twitter_links):
+    """Constructor.
+
+    :param faux_twitter_links: Boolean to guess user links, when snarks lack "user_url".
+    """
+    object.__init__(self)
+    self.faux_twitter_links = faux_twitter_links
+    self._users = {}  # User -> (faux url, html name).
+    self._last_date = None
+    self._last_date_str = None
+
+  def format_row(self, snark):
+    """Returns a snark's html row, ending with a newline."""
+    user = snark["user"]
+    user_info = self._users.get(user)
+    if (user_info is None):
+      faux_url = "http://www.twitter.com/%s" % urllib2.quote(re.sub("^@", "", user))
+
+      # User names will always have @.
+      html_user = (user if (user.startswith("@") or user == "") else "@"+ user)
+
+      user_info = (faux_url, html_user)
+      self._users[user] = user_info
+
+    snark_user_url = "#"
+    if ("user_url" in snark):
+      snark_user_url = snark["user_url"]
+    elif (self.faux_twitter_links):
+      snark_user_url = user_info[0]
+
+    snark_msg_url = snark.get("msg_url", "#")
+
+    date = snark["date"]
+    if (date != self._last_date):
+      self._last_date = date
+      self._last_date_str = date.strftime("%Y-%m-%d %H:%M:%S")
+
+    return _row_template % (snark_user_url, user_info[1], escape_msg(snark["msg"]), snark_msg_url, self._last_date_str)
+
+
+def escape_msg(msg):
+  """Escapes [<>&], numerically escapes exotic chars, and
+  represents newlines with <br/>, all in one pass.
+  """
+  return _escape_ptn.sub(_escape_char, msg)
+
+def _escape_char(m):
+  c = m.group(0)
+  return (_char_refs.get(c) or "&#%d;" % ord(c))
+
+
+def write_rows(dest_file, row_formatter, snarks, keep_alive_func=None):
+  """Writes html rows, several at a time.
+
+  :param dest_file: A binary-mode file-like object to write into.
+  :param row_formatter: A RowFormatter.
+  :param snarks: An iterable of processed snark dicts.
+  :return: The number of rows written.
+  """
+  count = 0
+  chunk = []
+  for snark in snarks:
+    chunk.append(row_formatter.format_row(snark))
+    if (len(chunk) >= rows_per_write):
+      dest_file.write("".join(chunk))
+      count += len(chunk)
+      del chunk[:]
+      if (keep_alive_func is not None and keep_alive_func() is False): return count
+
+  if (len(chunk) > 0):
+    dest_file.write("".join(chunk))
+    count += len(chunk)
+
+  return count
+
+
+def write_page(page_file, page_path, page_num, row_formatter, snarks, has_next):
+  """Writes one page of a paged transcript.
+
+  :param page_file: A binary-mode file-like object to write into.
+  :param page_path: Where to write each page, with %d for its number.
+  :param page_num: This page's number (1-based).
+  :param row_formatter: A RowFormatter.
+  :param snarks: A list of processed snark dicts.
+  :param has_next: True if another page follows.
+  """
+  page_file.write(page_header)
+  page_file.write(_page_nav(page_path, page_num, has_next=has_next))
+  write_rows(page_file, row_formatter, snarks)
+  page_file.write(_page_nav(page_path, page_num, has_next=has_next))
+  page_file.write(page_footer)
+
+
+def _index_link(page_path, page_num, dest_dir):
+  """Returns a page's path relative to the index, to link to it.
+
+  :param dest_dir: The index's dir, or None if it isn't a file.
+  """
+  path = page_path % page_num
+  try:
+    if (dest_dir is not None):
+      path = os.path.relpath(path, dest_dir)
+    elif (os.path.isabs(path)):
+      path = os.path.basename(path)
+  except (ValueError) as err:
+    path = os.path.basename(path)  # On another drive.
+  return urllib2.quote(path.replace(os.sep, "/"))
+
+def _page_link(page_path, page_num):
+  """Returns a page's filename, to link to it from a sibling file."""
+  return urllib2.quote(os.path.basename(page_path % page_num))
+
+def _page_nav(page_path, page_num, has_next):
+  """Returns links to neighboring pages.
+
+  :param has_next: True to link to the next page.
+  """
+  links = []
+  if (page_num > 1):
+    links.append("<a href='%s'>Previous</a>" % _page_link(page_path, page_num - 1))
+  if (has_next):
+    links.append("<a href='%s'>Next</a>" % _page_link(page_path, page_num + 1))
+  return "<p>Page %d %s</p>\r\n" % (page_num, " | ".join(links))
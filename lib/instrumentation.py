@@ -0,0 +1,304 @@
+import contextlib
+import json
+import logging
+import os
+import platform
+import threading
+import time
+
+try:
+  import tracemalloc
+except (ImportError) as err:
+  tracemalloc = None
+
+try:
+  import resource
+except (ImportError) as err:
+  resource = None  # Not available on Windows.
+
+from lib import global_config
+
+
+# Whether measure() records anything. While False, stages cost
+# one function call, and reader()/writer() return files as-is.
+enabled = False
+
+_records = []  # Every StageRecord, in the order they started.
+_local = threading.local()  # Per-thread list of StageRecords being measured, outermost first.
+
+
+class StageRecord(object):
+  """Measurements of one instrumented call.
+
+  Byte counts include those of nested stages.
+  Memory peaks are in bytes (see get_memory_source()).
+  """
+
+  def __init__(self, name, depth):
+    object.__init__(self)
+    self.name = name
+    self.depth = depth
+    self.wall_seconds = None
+    self.cpu_seconds = None
+    self.snarks_in = None
+    self.snarks_out = None
+    self.bytes_read = 0
+    self.bytes_written = 0
+    self.peak_memory = None
+    self.failed = False
+
+  def set_snarks_in(self, count):
+    self.snarks_in = count
+
+  def set_snarks_out(self, count):
+    self.snarks_out = count
+
+  def to_dict(self):
+    """Returns a dict suitable for JSON."""
+    return {"name":self.name, "depth":self.depth,
+            "wall_seconds":self.wall_seconds, "cpu_seconds":self.cpu_seconds,
+            "snarks_in":self.snarks_in, "snarks_out":self.snarks_out,
+            "bytes_read":self.bytes_read, "bytes_written":self.bytes_written,
+            "peak_memory":self.peak_memory, "failed":self.failed}
+
+
+class _NullRecord(StageRecord):
+  """A StageRecord that discards everything, used while disabled."""
+
+  def set_snarks_in(self, count):
+    pass
+
+  def set_snarks_out(self, count):
+    pass
+
+_null_record = _NullRecord("", 0)
+
+
+class _CountingFile(object):
+  """A wrapper around a file-like object, counting bytes
+  read from and written to it in every active stage.
+  """
+
+  def __init__(self, f):
+    object.__init__(self)
+    self._file = f
+
+  def __getattr__(self, name):
+    return getattr(self._file, name)
+
+  def __iter__(self):
+    for line in self._file:
+      count_bytes(len(line), 0)
+      yield line
+
+  def read(self, *args):
+    data = self._file.read(*args)
+    count_bytes(len(data), 0)
+    return data
+
+  def readline(self, *args):
+    line = self._file.readline(*args)
+    count_bytes(len(line), 0)
+    return line
+
+  def readlines(self, *args):
+    lines = self._file.readlines(*args)
+    count_bytes(sum(len(line) for line in lines), 0)
+    return lines
+
+  def write(self, data):
+    self._file.write(data)
+    count_bytes(0, len(data))
+
+  def writelines(self, lines):
+    for line in lines:
+      self.write(line)
+
+
+def enable():
+  """Starts recording stages, discarding any previous records.
+
+  If tracemalloc is available, it will be started too,
+  which slows things down noticeably.
+  """
+  global enabled
+
+  del _records[:]
+  if (tracemalloc is not None and not tracemalloc.is_tracing()):
+    tracemalloc.start()
+  enabled = True
+
+def disable():
+  """Stops recording stages. Existing records are kept."""
+  global enabled
+
+  enabled = False
+  if (tracemalloc is not None and tracemalloc.is_tracing()):
+    tracemalloc.stop()
+
+def get_active_stages():
+  """Returns the current thread's stages being measured, outermost first.
+  Pass them to adopt_stages() in a worker thread.
+  """
+  return list(_get_active())
+
+def adopt_stages(stages):
+  """Nests the current thread's future stages inside another thread's.
+  Bytes counted in this thread will then be added to those too.
+  """
+  _local.active = list(stages)
+
+def _get_active():
+  if (not hasattr(_local, "active")): _local.active = []
+  return _local.active
+
+def get_records():
+  """Returns a list of StageRecords, in the order they started."""
+  return list(_records)
+
+def get_memory_source():
+  """Returns how peak memory is measured.
+
+  "tracemalloc": Peak bytes traced by Python during each stage.
+  "ru_maxrss": The process' peak resident size so far, at the
+               end of each stage (it never decreases).
+  None: Memory can't be measured.
+  """
+  if (tracemalloc is not None): return "tracemalloc"
+  if (resource is not None): return "ru_maxrss"
+  return None
+
+
+@contextlib.contextmanager
+def measure(stage_name, snarks_in=None):
+  """Records a stage's wall time, cpu time, bytes and memory.
+
+  While disabled, this yields a record that ignores counts.
+
+  :param stage_name: A name for the report, such as "parse_snarks".
+  :param snarks_in: Optional count of snarks the stage was given.
+  :return: A context manager yielding a StageRecord.
+  """
+  if (not enabled):
+    yield _null_record
+    return
+
+  active = _get_active()
+  record = StageRecord(stage_name, len(active))
+  record.snarks_in = snarks_in
+  _records.append(record)
+
+  _fold_memory_peak()
+  if (tracemalloc is not None and hasattr(tracemalloc, "reset_peak")):
+    tracemalloc.reset_peak()
+  active.append(record)
+
+  wall_start = time.time()
+  cpu_start = _cpu_seconds()
+  try:
+    yield record
+  except:
+    record.failed = True
+    raise
+  finally:
+    record.cpu_seconds = _cpu_seconds() - cpu_start
+    record.wall_seconds = time.time() - wall_start
+    _fold_memory_peak()
+    active.pop()
+
+def reader(f):
+  """Returns a file-like object that counts bytes read from f.
+  While disabled, f is returned as-is.
+  """
+  if (not enabled): return f
+  return _CountingFile(f)
+
+def writer(f):
+  """Returns a file-like object that counts bytes written to f.
+  While disabled, f is returned as-is.
+  """
+  if (not enabled): return f
+  return _CountingFile(f)
+
+def count_bytes(read_count, written_count):
+  """Adds byte counts to every active stage.
+  For reads and writes that don't go through reader()/writer().
+  """
+  for record in _get_active():
+    record.bytes_read += read_count
+    record.bytes_written += written_count
+
+def _cpu_seconds():
+  """Returns user+system cpu seconds used by this process."""
+  t = os.times()
+  return t[0] + t[1]
+
+def _fold_memory_peak():
+  """Raises each active stage's peak to the current peak.
+
+  Called before a nested stage resets tracemalloc's peak,
+  so outer stages still see it.
+  """
+  active = _get_active()
+  if (len(active) == 0): return
+
+  peak = None
+  if (tracemalloc is not None):
+    if (tracemalloc.is_tracing()):
+      peak = tracemalloc.get_traced_memory()[1]
+  elif (resource is not None):
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if (platform.system() != "Darwin"): peak *= 1024  # Linux reports KiB.
+
+  if (peak is None): return
+  for record in active:
+    record.peak_memory = max(record.peak_memory, peak)
+
+
+def write_report(path, extra_info=None):
+  """Writes recorded stages as JSON.
+
+  :param path: A file path.
+  :param extra_info: Optional dict of additional top-level info.
+  """
+  report = {"version":global_config.VERSION,
+            "python":platform.python_version(),
+            "platform":platform.platform(aliased=True, terse=True),
+            "date":time.strftime("%Y-%m-%d %H:%M:%S"),
+            "memory_source":get_memory_source(),
+            "stages":[r.to_dict() for r in _records]}
+  if (extra_info): report.update(extra_info)
+
+  with open(path, "w") as f:
+    f.write(json.dumps(report, indent=2, sort_keys=True))
+    f.write("\n")
+
+def log_summary():
+  """Logs a table of recorded stages, nested stages indented."""
+  memory_source = get_memory_source()
+  lines = []
+  lines.append("%-36s %9s %9s %9s %9s %10s %10s %10s" % ("Stage", "Wall (s)", "CPU (s)", "In", "Out", "Read", "Written", "Peak mem"))
+  for r in _records:
+    lines.append("%-36s %9s %9s %9s %9s %10s %10s %10s" % (("  "* r.depth) + r.name + (" (failed)" if (r.failed) else ""),
+                 _number_str(r.wall_seconds, "%.3f"), _number_str(r.cpu_seconds, "%.3f"),
+                 _number_str(r.snarks_in, "%d"), _number_str(r.snarks_out, "%d"),
+                 _bytes_str(r.bytes_read), _bytes_str(r.bytes_written), _bytes_str(r.peak_memory)))
+  if (memory_source == "ru_maxrss"):
+    lines.append("Peak mem is the process' peak resident size so far (tracemalloc is unavailable).")
+  elif (memory_source is None):
+    lines.append("Peak mem can't be measured on this platform.")
+
+  logging.info("Profile...\n%s" % "\n".join(lines))
+
+def _number_str(n, fmt):
+  """Returns a formatted number, or "-" for None."""
+  if (n is None): return "-"
+  return fmt % n
+
+def _bytes_str(n):
+  """Returns a short human-readable size."""
+  if (n is None): return "-"
+  if (n < 1024): return "%dB" % n
+  for unit in ["KiB", "MiB", "GiB"]:
+    n /= 1024.0
+    if (n < 1024 or unit == "GiB"): return "%.1f%s" % (n, unit)
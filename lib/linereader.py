@@ -0,0 +1,233 @@
+import contextlib
+import mmap
+import os
+import re
+import urllib
+import urllib2
+import urlparse
+
+from lib import compression
+from lib import instrumentation
+
+
+# Decompressed bytes to scan at a time, from compressed local files.
+decompressed_chunk_size = 4*1024*1024
+
+# Any newline style: "\r\n", "\r" or "\n".
+_newline_ptn = re.compile("\r\n?|\n")
+_newlines = ("", "\r\n", "\r", "\n")
+
+
+def get_local_path(src_path):
+  """Returns a local file path for a "file:" url, or None for other urls."""
+  p = urlparse.urlparse(src_path)
+  if (p.scheme != "file"): return None
+  return urllib.url2pathname("".join([p.netloc, p.path]))
+
+
+def iter_matched_lines(src, line_ptn, buffer_ptn=None, keep_alive_func=None):
+  """Yields (line, match) pairs for each line of a url.
+
+  Lines have their newline stripped, whether it was "\r\n",
+  "\r" or "\n". The match is from line_ptn.match(line), or
+  None.
+
+  Local "file:" urls are memory-mapped instead of read
+  line by line, if buffer_ptn is given. Then lines that
+  buffer_ptn finds with finditer() are never split out
+  and matched individually, and the whole file is never
+  copied into strings at once.
+
+  Urls ending in ".gz", ".bz2" or ".xz" are decompressed
+  as they're read (see lib.compression). Local ones are
+  scanned a few MB at a time with buffer_ptn, instead of
+  being memory-mapped.
+
+  buffer_ptn must be a MULTILINE equivalent of line_ptn,
+  starting with "^", unable to cross newlines, and
+  consuming the rest of the line. Its groups must be
+  numbered the same.
+
+  :param src: A url, or a urllib2.Request.
+  :param line_ptn: A compiled regex to match() against each line.
+  :param buffer_ptn: An optional compiled regex to finditer() over a whole file.
+  :param keep_alive_func: Optional function to get an abort boolean.
+  :return: A generator of (line string, match object or None) tuples.
+  :raises: urllib2.URLError (missing local files included)
+  """
+  local_path = None
+  if (buffer_ptn is not None and isinstance(src, basestring)):
+    local_path = get_local_path(src)
+
+  if (local_path is not None and compression.get_codec(local_path)):
+    return _iter_decompressed_lines(local_path, compression.get_codec(local_path), line_ptn, buffer_ptn, keep_alive_func)
+  elif (local_path is not None):
+    return iter_mapped_lines(local_path, line_ptn, buffer_ptn, keep_alive_func=keep_alive_func)
+  else:
+    return _iter_url_lines(src, line_ptn, keep_alive_func)
+
+
+def _iter_url_lines(src, line_ptn, keep_alive_func):
+  """Yields (line, match) pairs, reading one line at a time."""
+  url = (src if (isinstance(src, basestring)) else src.get_full_url())
+  codec = compression.get_codec(url)
+
+  f = instrumentation.reader(urllib2.urlopen(src))
+  if (codec): f = compression.DecompressedReader(f, codec)
+
+  with contextlib.closing(f):
+    while (keep_alive_func is None or keep_alive_func()):
+      try:
+        line = f.readline()
+      except (IOError) as err:
+        if (not codec or isinstance(err, urllib2.URLError)): raise
+        raise urllib2.URLError(err)  # Corrupt compressed data.
+      if (line == ''): break
+      line = re.sub("\r\n?", "\n", line)  # Local files are opened without universal newlines.
+      if (line.endswith("\n")): line = line[:-1]
+
+      for subline in line.split("\n"):
+        yield (subline, line_ptn.match(subline))
+
+def iter_mapped_lines(path, line_ptn, buffer_ptn, start=0, end=None, keep_alive_func=None):
+  """Yields (line, match) pairs from a memory-mapped local file.
+  See iter_matched_lines().
+
+  Text between buffer_ptn's matches is normally just a
+  newline. Any lines there (continuations, noise, lines
+  after a lone "\r", etc) are split out and matched
+  individually.
+
+  :param path: A local file path.
+  :param start: Offset of a line to begin at.
+  :param end: Offset of a line to stop before, or None for the end of the file.
+  :raises: urllib2.URLError
+  """
+  try:
+    f = open(path, "rb")
+  except (IOError, OSError) as err:
+    raise urllib2.URLError(err)
+
+  with f:
+    size = os.fstat(f.fileno()).st_size
+    if (size == 0): return
+    buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+  if (end is None or end > size): end = size
+
+  try:
+    for pair in _iter_buffer_lines(buf, start, end, line_ptn, buffer_ptn, keep_alive_func):
+      yield pair
+
+    if (keep_alive_func is None or keep_alive_func() is not False):
+      instrumentation.count_bytes(end - start, 0)
+  finally:
+    buf.close()
+
+def _iter_decompressed_lines(path, codec, line_ptn, buffer_ptn, keep_alive_func):
+  """Yields (line, match) pairs from a compressed local file.
+  See iter_matched_lines().
+
+  Decompressed text is gathered into chunks that end with
+  a newline, and each chunk is scanned like a mapped file.
+
+  :param path: A local file path.
+  :param codec: A codec name, from compression.get_codec().
+  :raises: urllib2.URLError
+  """
+  try:
+    f = compression.DecompressedReader(instrumentation.reader(open(path, "rb")), codec)
+  except (IOError, OSError) as err:
+    raise urllib2.URLError(err)
+
+  with contextlib.closing(f):
+    pending = ""  # Text after the last newline so far.
+    while (keep_alive_func is None or keep_alive_func() is not False):
+      try:
+        block = f.read(decompressed_chunk_size)
+      except (IOError) as err:
+        raise urllib2.URLError(err)
+
+      if (block == ""):
+        chunk, pending = pending, ""
+      else:
+        chunk = pending + block
+        cut = chunk.rfind("\n") + 1
+        if (cut == 0): cut = chunk.rfind("\r", 0, len(chunk)-1) + 1  # Maybe "\r" newlines.
+        chunk, pending = chunk[:cut], chunk[cut:]
+
+      if (chunk):
+        for pair in _iter_buffer_lines(chunk, 0, len(chunk), line_ptn, buffer_ptn, keep_alive_func):
+          yield pair
+
+      if (block == ""): break
+
+def _iter_buffer_lines(buf, start, end, line_ptn, buffer_ptn, keep_alive_func):
+  """Yields (line, match) pairs from a string or mmap.
+  See iter_mapped_lines().
+
+  :param start: Offset of a line to begin at.
+  :param end: Offset of a line to stop before.
+  """
+  pos = start
+  after_line = False  # Whether pos is right after a matched line.
+  for (n, m) in enumerate(buffer_ptn.finditer(buf, start, end)):
+    if (n % 1000 == 0 and keep_alive_func is not None and keep_alive_func() is False): return
+
+    gap = buf[pos:m.start()]
+    if (gap not in _newlines or (not after_line and gap != "")):
+      for pair in _iter_split_lines(gap, line_ptn, after_line):
+        yield pair
+
+    yield (m.group(0), m)
+    pos = m.end()
+    after_line = True
+
+  if (pos < end):
+    for pair in _iter_split_lines(buf[pos:end], line_ptn, after_line):
+      yield pair
+
+def find_chunk_offsets(path, buffer_ptn, count):
+  """Returns offsets that split a local file into roughly equal chunks.
+
+  Each offset, besides 0, is the start of a line that
+  buffer_ptn would find (see iter_matched_lines()), so
+  chunks only ever begin with such a line.
+
+  :param path: A local file path.
+  :param count: The desired number of chunks.
+  :return: A list of ascending chunk start offsets, then the file size.
+  :raises: urllib2.URLError
+  """
+  try:
+    f = open(path, "rb")
+  except (IOError, OSError) as err:
+    raise urllib2.URLError(err)
+
+  with f:
+    size = os.fstat(f.fileno()).st_size
+    if (size == 0): return [0, 0]
+    buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+  try:
+    result = [0]
+    for i in range(1, count):
+      m = buffer_ptn.search(buf, max(size * i // count, result[-1]+1))
+      if (m is None): break
+      result.append(m.start())
+    result.append(size)
+    return result
+  finally:
+    buf.close()
+
+def _iter_split_lines(text, line_ptn, after_line):
+  """Yields (line, match) pairs for lines in a chunk of text.
+
+  :param after_line: True if text begins with the previous line's newline.
+  """
+  lines = _newline_ptn.split(text)
+  if (after_line): lines.pop(0)
+  if (lines and lines[-1] == ""): lines.pop()  # Text ended with a newline.
+
+  for line in lines:
+    yield (line, line_ptn.match(line))
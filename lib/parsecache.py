@@ -0,0 +1,197 @@
+import hashlib
+import logging
+import os
+import urllib2
+import zlib
+
+try:
+  import cPickle as pickle
+except (ImportError) as err:
+  import pickle
+
+from lib import global_config
+from lib import instrumentation
+from lib import linereader
+
+
+# Whether parse_snarks() consults the cache. Off unless
+# enabled, since an unchanged fingerprint can't rule out
+# every change (e.g., a parser's own code).
+enabled = False
+
+# Subdir of the settings dir, for cached results.
+cache_dir_name = "parse_cache"
+
+# Total size of cached results, beyond which the least
+# recently used are evicted.
+max_cache_bytes = 100 * 1024 * 1024
+
+# Seconds to wait for an http HEAD request.
+http_timeout = 15
+
+# Suffix of cache entries.
+_entry_ext = ".snarks"
+
+
+def enable():
+  """Lets parse_snarks() load and save cached results."""
+  global enabled
+  enabled = True
+
+def disable():
+  """Makes parse_snarks() always call the parser."""
+  global enabled
+  enabled = False
+
+
+def get_cache_dir():
+  return os.path.join(global_config.get_settings_dir(), cache_dir_name)
+
+
+def get_fingerprint(src_path, headers=None):
+  """Returns a string that changes whenever a source does.
+
+  Local files are identified by mtime and size, and http
+  urls by the ETag and Last-Modified headers of a HEAD
+  request.
+
+  :param src_path: A url, or file.
+  :param headers: Optional dict of extra http request headers.
+  :return: A string, or None if the source can't be fingerprinted.
+  """
+  if (not src_path): return None
+
+  local_path = linereader.get_local_path(src_path)
+  if (local_path is not None):
+    try:
+      st = os.stat(local_path)
+      return "file:%r:%d" % (st.st_mtime, st.st_size)
+    except (OSError) as err:
+      return None
+
+  if (not src_path.lower().startswith(("http:", "https:"))): return None
+
+  try:
+    req = urllib2.Request(src_path, None, headers=(headers or {}))
+    req.get_method = lambda: "HEAD"
+    response = urllib2.urlopen(req, timeout=http_timeout)
+    try:
+      etag = response.info().getheader("ETag")
+      last_modified = response.info().getheader("Last-Modified")
+    finally:
+      response.close()
+    if (not etag and not last_modified): return None
+    return "http:%s:%s" % (etag, last_modified)
+
+  except (Exception) as err:
+    logging.debug("Could not fingerprint %s: %s" % (src_path, str(err)))
+
+  return None
+
+
+def get_key(parser_name, src_path, first_msg, parser_options, fingerprint):
+  """Returns a hex digest identifying one parser run's results."""
+  options = sorted(parser_options.items()) if (parser_options) else []
+  parts = [global_config.VERSION, parser_name, src_path, first_msg, options, fingerprint]
+  return hashlib.sha1(repr(parts)).hexdigest()
+
+
+def load(key):
+  """Returns cached snarks, or None.
+
+  A hit marks the entry as recently used.
+  """
+  entry_path = os.path.join(get_cache_dir(), key + _entry_ext)
+  if (not os.path.isfile(entry_path)): return None
+
+  try:
+    with open(entry_path, "rb") as f:
+      snarks = pickle.loads(zlib.decompress(instrumentation.reader(f).read()))
+    os.utime(entry_path, None)
+    return snarks
+
+  except (Exception) as err:
+    logging.error("Could not load cached snarks %s: %s" % (entry_path, str(err)))
+    _remove(entry_path)
+
+  return None
+
+
+def save(key, snarks):
+  """Caches snarks, then evicts old entries if the cache is too big.
+
+  :return: True if successful, False otherwise.
+  """
+  cache_dir = get_cache_dir()
+  entry_path = os.path.join(cache_dir, key + _entry_ext)
+  try:
+    data = zlib.compress(pickle.dumps(snarks, pickle.HIGHEST_PROTOCOL), 1)
+    if (len(data) > max_cache_bytes):
+      logging.info("Not caching snarks (%d bytes is over the limit)." % len(data))
+      return False
+
+    if (not os.path.isdir(cache_dir)): os.makedirs(cache_dir)
+
+    with open(entry_path +".tmp", "wb") as f:
+      instrumentation.writer(f).write(data)
+    if (os.path.exists(entry_path)): os.remove(entry_path)
+    os.rename(entry_path +".tmp", entry_path)
+
+    _evict(max_cache_bytes)
+    return True
+
+  except (Exception) as err:
+    logging.error("Could not cache snarks %s: %s" % (entry_path, str(err)))
+    _remove(entry_path +".tmp")
+
+  return False
+
+
+def purge():
+  """Removes every cached result.
+
+  :return: The number of entries removed.
+  """
+  return _evict(0)
+
+
+def _evict(size_limit):
+  """Removes least recently used entries until the rest fit in size_limit.
+
+  :return: The number of entries removed.
+  """
+  cache_dir = get_cache_dir()
+  if (not os.path.isdir(cache_dir)): return 0
+
+  entries = []
+  for filename in os.listdir(cache_dir):
+    if (not filename.endswith((_entry_ext, _entry_ext +".tmp"))): continue
+    entry_path = os.path.join(cache_dir, filename)
+    try:
+      st = os.stat(entry_path)
+      entries.append((st.st_mtime, st.st_size, entry_path))
+    except (OSError) as err:
+      pass
+  entries.sort()
+
+  total_size = sum(size for (mtime, size, entry_path) in entries)
+  removed = 0
+  for (mtime, size, entry_path) in entries:
+    if (total_size <= size_limit): break
+    if (_remove(entry_path)): removed += 1
+    total_size -= size
+
+  return removed
+
+
+def _remove(path):
+  """Deletes a file, logging any error.
+
+  :return: True if successful, False otherwise.
+  """
+  try:
+    if (os.path.exists(path)): os.remove(path)
+    return True
+  except (OSError) as err:
+    logging.error("Could not remove %s: %s" % (path, str(err)))
+  return False
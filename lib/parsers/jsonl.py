@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+import json
+import logging
+import re
+import sys
+import time
+import urllib2
+
+from lib import arginfo
+from lib import common
+from lib import global_config
+from lib import linereader
+
+
+# Namespace for options.
+ns = "jsonl."
+
+# Names of lib.subsystem modules that should be set up in advance.
+required_subsystems = []
+
+# ISO 8601 dates, as the jsonl exporter writes them.
+_date_ptn = re.compile("^([0-9]{4})-([0-9]{2})-([0-9]{2})[T ]([0-9]{2}):([0-9]{2}):([0-9]{2})(?:[.]([0-9]{1,6}))?$")
+
+
+def get_description():
+  return "Collects snarks from JSON lines, one object per snark."
+
+def get_arginfo():
+  args = []
+  return args
+
+def fetch_snarks(src_path, first_msg, options={}, keep_alive_func=None, sleep_func=None):
+  """Collects snarks from JSON lines, one object per snark.
+
+  This will restore EVERY attribute of saved snarks.
+  See iter_snarks().
+
+  :param src_path: A url, or file. Names ending in ".gz",
+                   ".bz2" or ".xz" are decompressed as they're read.
+  :param first_msg: If not None, ignore comments until this substring is found.
+  :param options: A dict of extra options specific to this parser.
+                  Not used.
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :return: A List of snark dicts.
+  :raises: ParserError
+  """
+  return list(iter_snarks(src_path, first_msg, options, keep_alive_func=keep_alive_func, sleep_func=sleep_func))
+
+def iter_snarks(src_path, first_msg, options={}, keep_alive_func=None, sleep_func=None):
+  """Yields snarks from JSON lines, as lines are read.
+
+  Each line is an object with at least "user", "msg" and
+  "date" (ISO 8601). A "time" in seconds becomes a
+  timedelta, and a "color" list becomes a tuple. Other
+  attributes are kept as they are (strings come back as
+  unicode). The "time" and "color" attributes may still
+  be clobbered later.
+
+  Blank lines are skipped, and lines that aren't objects,
+  or lack the required attributes, are logged and skipped.
+
+  :param src_path: A url, or file. Names ending in ".gz",
+                   ".bz2" or ".xz" are decompressed as they're read.
+  :param first_msg: If not None, ignore comments until this substring is found.
+  :param options: A dict of extra options specific to this parser.
+                  Not used.
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :return: A generator of snark dicts.
+  :raises: ParserError
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  if (not src_path): raise common.ParserError("The %s parser requires the general arg, \"src_path\", to be set." % re.sub(".*[.]", "", __name__))
+
+  snark_ptn = re.compile("[ \t]*([{].*)")
+
+  # The same, for finding whole lines in a memory-mapped local file.
+  buffer_ptn = re.compile("^[ \t]*([{][^\r\n]*)", re.MULTILINE)
+
+  decoder = json.JSONDecoder()
+  start_date = None
+  last_date_str, last_date = None, None  # Consecutive snarks often share a date.
+
+  try:
+    for (line, result) in linereader.iter_matched_lines(src_path, snark_ptn, buffer_ptn, keep_alive_func=keep_alive_func):
+      if (result is None):
+        if (line.strip()): logging.warning("Bad line: %s" % line)
+        continue
+
+      try:
+        snark = decoder.decode(result.group(1))
+        if (snark["date"] != last_date_str):
+          last_date, last_date_str = _parse_date(snark["date"]), snark["date"]
+        snark["date"] = last_date
+        if ("time" in snark and isinstance(snark["time"], (int, long, float))):
+          snark["time"] = timedelta(seconds=snark["time"])
+        if ("color" in snark and isinstance(snark["color"], list)):
+          snark["color"] = tuple(snark["color"])
+        if (not isinstance(snark["user"], basestring) or not isinstance(snark["msg"], basestring)):
+          raise ValueError("Non-string user or msg")
+      except (ValueError, KeyError, TypeError) as err:
+        logging.warning("Bad line: %s" % line)
+        continue
+
+      if (start_date is None):
+        if (first_msg and snark["msg"].find(first_msg) == -1):
+          # This snark was earlier than the expected first msg.
+          continue
+        start_date = snark["date"]
+
+      yield snark
+
+  except (urllib2.HTTPError) as err:
+    logging.error("Http status: %d" % err.code)
+    raise common.ParserError("Parser failed.")
+  except (urllib2.URLError) as err:
+    logging.error(str(err))
+    raise common.ParserError("Parser failed.")
+
+def _parse_date(s):
+  """Returns a datetime from an ISO 8601 string.
+
+  :raises: ValueError
+  """
+  m = _date_ptn.match(s)
+  if (m is None): raise ValueError("Invalid date: %s" % s)
+  year, month, day, hour, minute, second = [int(x) for x in m.group(1,2,3,4,5,6)]
+  microsecond = (int(m.group(7).ljust(6, "0")) if (m.group(7)) else 0)
+  return datetime(year, month, day, hour, minute, second, microsecond)
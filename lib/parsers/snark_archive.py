@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+import logging
+import re
+import struct
+import sys
+import time
+
+from lib import arginfo
+from lib import common
+from lib import compression
+from lib import global_config
+from lib import instrumentation
+from lib import linereader
+from lib import snarkarchive
+
+
+# Namespace for options.
+ns = "snark_archive."
+
+# Names of lib.subsystem modules that should be set up in advance.
+required_subsystems = []
+
+
+def get_description():
+  return "Collects snarks from a snark archive file."
+
+def get_arginfo():
+  args = []
+  args.append(arginfo.Arg(name="since_date", type=arginfo.DATETIME,
+              required=False, default=None, choices=None, multiple=False,
+              description="Date to skip earlier snarks.\nOnly the parts of the archive in range are read."))
+  args.append(arginfo.Arg(name="until_date", type=arginfo.DATETIME,
+              required=False, default=None, choices=None, multiple=False,
+              description="Date to skip later snarks.\nOnly the parts of the archive in range are read."))
+  args.append(arginfo.Arg(name="since_time", type=arginfo.TIMEDELTA,
+              required=False, default=None, choices=None, multiple=False,
+              description="Saved time to skip earlier snarks.\nOnly the parts of the archive in range are read."))
+  args.append(arginfo.Arg(name="until_time", type=arginfo.TIMEDELTA,
+              required=False, default=None, choices=None, multiple=False,
+              description="Saved time to skip later snarks.\nOnly the parts of the archive in range are read."))
+  return args
+
+def fetch_snarks(src_path, first_msg, options={}, keep_alive_func=None, sleep_func=None):
+  """Collects snarks from a snark archive file.
+
+  This will restore EVERY attribute of saved snarks.
+  The "time" and "color" attributes may still be
+  clobbered later, however.
+
+  The archive is memory-mapped, and its index is
+  consulted to read only the rows within the optional
+  date and time ranges.
+
+  :param src_path: A local file (because other urls aren't read as binary).
+                   Files ending in ".gz", ".bz2" or ".xz" are
+                   decompressed into memory first.
+  :param first_msg: If not None, ignore comments until this substring is found.
+  :param options: A dict of extra options specific to this parser.
+                  since_date (optional):
+                      Datetime to skip earlier snarks.
+                  until_date (optional):
+                      Datetime to skip later snarks.
+                  since_time (optional):
+                      Timedelta to skip snarks with an earlier
+                      saved "time" attribute.
+                  until_time (optional):
+                      Timedelta to skip snarks with a later
+                      saved "time" attribute.
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :return: A List of snark dicts.
+  :raises: ParserError
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  if (not src_path): raise common.ParserError("The %s parser requires the general arg, \"src_path\", to be set." % re.sub(".*[.]", "", __name__))
+
+  since_date = (options.get(ns+"since_date") or None)
+  until_date = (options.get(ns+"until_date") or None)
+  since_time = options.get(ns+"since_time")
+  until_time = options.get(ns+"until_time")
+
+  local_path = linereader.get_local_path(src_path)
+  if (local_path is None):
+    logging.error("This parser only supports \"file:\" urls.")
+    raise common.ParserError("Parser failed.")
+
+  start_date = None
+  snarks = []
+
+  try:
+    codec = compression.get_codec(local_path)
+    if (codec):
+      with open(local_path, "rb") as f:
+        with compression.DecompressedReader(instrumentation.reader(f), codec) as archive_file:
+          reader = snarkarchive.ArchiveReader(archive_file)
+    else:
+      reader = snarkarchive.ArchiveReader(local_path)
+
+    with reader:
+      archived_snarks = reader.read_snarks(since_date=since_date, until_date=until_date, since_time=since_time, until_time=until_time)
+  except (IOError, OSError) as err:
+    logging.error(str(err))
+    raise common.ParserError("Parser failed.")
+  except (KeyError, IndexError, ValueError, struct.error) as err:
+    # Sections were present, but their contents were not valid.
+    logging.error("Snark archive is corrupt (%s: %s)." % (type(err).__name__, str(err)))
+    raise common.ParserError("Parser failed.")
+
+  for snark in archived_snarks:
+    if (start_date is None):
+      if (first_msg and snark["msg"].find(first_msg) == -1):
+        # This snark was earlier than the expected first msg.
+        continue
+      start_date = snark["date"]
+
+    snarks.append(snark)
+
+  return snarks
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+import logging
+import re
+import sys
+import time
+
+from lib import arginfo
+from lib import common
+from lib import global_config
+from lib import linereader
+from lib import snarkstore
+
+
+# Namespace for options.
+ns = "sqlite_store."
+
+# Names of lib.subsystem modules that should be set up in advance.
+required_subsystems = []
+
+
+def get_description():
+  return "Collects snarks from an SQLite snark store, matching a query."
+
+def get_arginfo():
+  args = []
+  args.append(arginfo.Arg(name="show_id", type=arginfo.STRING,
+              required=False, default=None, choices=None, multiple=True,
+              description="Shows to collect snarks from.\nDefault is all shows."))
+  args.append(arginfo.Arg(name="users", type=arginfo.STRING,
+              required=False, default=None, choices=None, multiple=True,
+              description="Users to collect snarks from (case-insensitive).\nDefault is all users."))
+  args.append(arginfo.Arg(name="since_time", type=arginfo.TIMEDELTA,
+              required=False, default=None, choices=None, multiple=False,
+              description="In-movie time to skip earlier snarks."))
+  args.append(arginfo.Arg(name="until_time", type=arginfo.TIMEDELTA,
+              required=False, default=None, choices=None, multiple=False,
+              description="In-movie time to skip later snarks."))
+  args.append(arginfo.Arg(name="since_date", type=arginfo.DATETIME,
+              required=False, default=None, choices=None, multiple=False,
+              description="Date to skip earlier snarks."))
+  args.append(arginfo.Arg(name="until_date", type=arginfo.DATETIME,
+              required=False, default=None, choices=None, multiple=False,
+              description="Date to skip later snarks."))
+  return args
+
+def fetch_snarks(src_path, first_msg, options={}, keep_alive_func=None, sleep_func=None):
+  """Collects snarks from an SQLite snark store.
+
+  Only snarks matching every given option are read,
+  looked up through the store's indexes. This will
+  restore EVERY attribute of stored snarks. The "time"
+  and "color" attributes may still be clobbered later,
+  however.
+
+  :param src_path: A local database file, written by the sqlite_store exporter.
+  :param first_msg: If not None, ignore comments until this substring is found.
+  :param options: A dict of extra options specific to this parser.
+                  show_id (optional):
+                      A list of shows to collect snarks from.
+                  users (optional):
+                      A list of users to collect snarks from.
+                  since_time (optional):
+                      Timedelta in-movie time to skip earlier snarks.
+                  until_time (optional):
+                      Timedelta in-movie time to skip later snarks.
+                  since_date (optional):
+                      Datetime to skip earlier snarks.
+                  until_date (optional):
+                      Datetime to skip later snarks.
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :return: A List of snark dicts, ordered by show and then as exported.
+  :raises: ParserError
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  if (not src_path): raise common.ParserError("The %s parser requires the general arg, \"src_path\", to be set." % re.sub(".*[.]", "", __name__))
+
+  query_args = {}
+  for (name, query_name) in [("show_id","show_ids"), ("users","users"), ("since_time","since_time"),
+                             ("until_time","until_time"), ("since_date","since_date"), ("until_date","until_date")]:
+    query_args[query_name] = (options.get(ns+name) or None)
+  for query_name in ["show_ids", "users"]:
+    if (isinstance(query_args[query_name], basestring)):
+      query_args[query_name] = [query_args[query_name]]
+
+  local_path = linereader.get_local_path(src_path)
+  if (local_path is None):
+    logging.error("This parser only supports \"file:\" urls.")
+    raise common.ParserError("Parser failed.")
+
+  start_date = None
+  snarks = []
+
+  try:
+    stored_snarks = snarkstore.query_snarks(local_path, **query_args)
+  except (common.CompileSubsException) as err:
+    logging.error(str(err))
+    raise common.ParserError("Parser failed.")
+
+  for snark in stored_snarks:
+    if (start_date is None):
+      if (first_msg and snark["msg"].find(first_msg) == -1):
+        # This snark was earlier than the expected first msg.
+        continue
+      start_date = snark["date"]
+
+    snarks.append(snark)
+
+  return snarks
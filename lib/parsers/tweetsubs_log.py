@@ -1,99 +1,441 @@
-from datetime import datetime, timedelta
-import contextlib
-import logging
-import re
-import sys
-import time
-import urllib2
-
-from lib import arginfo
-from lib import common
-from lib import global_config
-
-
-# Namespace for options.
-ns = "tweetsubs_log."
-
-# Names of lib.subsystem modules that should be set up in advance.
-required_subsystems = []
-
-
-def get_description():
-  return "Collects snarks from a TweetSubs log.\nSee: https://github.com/Vhati/TweetSubs"
-
-def get_arginfo():
-  args = []
-  return args
-
-def fetch_snarks(src_path, first_msg, options={}, keep_alive_func=None, sleep_func=None):
-  """Collects snarks from a TweetSubs log.
-  See: https://github.com/Vhati/TweetSubs
-
-  :param src_path: A url, or file.
-  :param first_msg: If not None, ignore comments until this substring is found.
-  :param options: A dict of extra options specific to this parser.
-                  Not used.
-  :param keep_alive_func: Optional replacement to get an abort boolean.
-  :param sleep_func: Optional replacement to sleep N seconds.
-  :return: A List of snark dicts.
-  :raises: ParserError
-  """
-  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
-  if (sleep_func is None): sleep_func = global_config.nap
-
-  if (not src_path): raise common.ParserError("The %s parser requires the general arg, \"src_path\", to be set." % re.sub(".*[.]", "", __name__))
-
-  snark_ptn = re.compile("([0-9]{4})-([0-9]{2})-([0-9]{2}) ([0-9]{2}):([0-9]{2}):([0-9]{2}) INFO: Tweet (?:shown|expired) [(]lag ([0-9-]+)s[)]: ([^:]+): (.*)")
-  start_date = None
-  snarks = []
-  prev_line_was_snark = False
-
-  lines = []
-  try:
-    with contextlib.closing(urllib2.urlopen(src_path)) as snark_file:
-      while (keep_alive_func()):
-        line = snark_file.readline()
-        if (line == ''): break
-        line = re.sub("\r\n?", "\n", line)  # Local files are opened without universal newlines.
-        line = line[:-1]
-        lines.append(line)
-  except (urllib2.HTTPError) as err:
-    logging.error("Http status: %d" % err.code)
-    raise common.ParserError("Parser failed.")
-  except (urllib2.URLError) as err:
-    logging.error(str(err))
-    raise common.ParserError("Parser failed.")
-
-  for line in lines:
-    result = snark_ptn.match(line)
-    if (result is None):
-      # Lines without a logging datestamp must be part of a multiline snark.
-      if (len(snarks) > 0 and prev_line_was_snark is True and re.match("[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2} [^:]+: .*", line) is None):
-        snarks[-1]["msg"] += "\n"+ line
-        prev_line_was_snark = True
-      else:
-        prev_line_was_snark = False
-      continue
-
-    snark = {}
-    snark["user"] = "@%s" % result.group(8)
-    snark["msg"] =  result.group(9)
-
-    year, month, day = [int(result.group(i)) for i in [1,2,3]]
-    hour, minute, second = [int(result.group(i)) for i in [4,5,6]]
-    lag_seconds = int(result.group(7))
-
-    # Local time zone
-    snark["date"] = datetime(year, month, day, hour, minute, second)
-    snark["date"] = snark["date"] - timedelta(seconds=lag_seconds)
-
-    if (start_date is None):
-      if (first_msg and line.find(first_msg) == -1):
-        # This snark was earlier than the expected first msg.
-        continue
-      start_date = snark["date"]
-
-    snarks.append(snark)
-    prev_line_was_snark = True
-
-  return snarks
+from datetime import datetime, timedelta
+import hashlib
+import logging
+import multiprocessing
+import os
+import pickle
+import re
+import sys
+import time
+import urllib2
+
+from lib import arginfo
+from lib import common
+from lib import compression
+from lib import global_config
+from lib import instrumentation
+from lib import linereader
+
+
+# Namespace for options.
+ns = "tweetsubs_log."
+
+# Names of lib.subsystem modules that should be set up in advance.
+required_subsystems = []
+
+_snark_ptn = re.compile("([0-9]{4})-([0-9]{2})-([0-9]{2}) ([0-9]{2}):([0-9]{2}):([0-9]{2}) INFO: Tweet (?:shown|expired) [(]lag ([0-9-]+)s[)]: ([^:]+): (.*)")
+
+# The same, for finding whole lines in a memory-mapped local file.
+_buffer_ptn = re.compile("^([0-9]{4})-([0-9]{2})-([0-9]{2}) ([0-9]{2}):([0-9]{2}):([0-9]{2}) INFO: Tweet (?:shown|expired) [(]lag ([0-9-]+)s[)]: ([^:\r\n]+): ([^\r\n]*)", re.MULTILINE)
+
+# Any logging line, which would end a multiline snark.
+_log_line_ptn = re.compile("[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2} [^:]+: .*")
+
+
+# Don't split smaller logs across processes.
+min_chunk_bytes = 1024 * 1024
+
+# Subdir of the settings dir, for resume checkpoints.
+checkpoint_dir_name = "tweetsubs_log_checkpoints"
+
+# Seconds between checks for new lines, while following.
+follow_interval = 5
+
+# Default seconds without new lines, after which following stops.
+follow_idle_timeout = 300
+
+
+def get_description():
+  return "Collects snarks from a TweetSubs log.\nSee: https://github.com/Vhati/TweetSubs"
+
+def get_arginfo():
+  args = []
+  args.append(arginfo.Arg(name="workers", type=arginfo.INTEGER,
+              required=False, default=1, choices=None, multiple=False,
+              description="Processes to parse a large local log with.\n0 uses one per CPU."))
+  args.append(arginfo.Arg(name="resume", type=arginfo.BOOLEAN,
+              required=False, default=False, choices=None, multiple=False,
+              description="Remember where a local log was parsed up to,\nand only parse new lines next time."))
+  args.append(arginfo.Arg(name="follow", type=arginfo.BOOLEAN,
+              required=False, default=False, choices=None, multiple=False,
+              description="Keep watching a local log for new lines,\nuntil none arrive for follow_idle seconds."))
+  args.append(arginfo.Arg(name="follow_idle", type=arginfo.INTEGER,
+              required=False, default=follow_idle_timeout, choices=None, multiple=False,
+              description="Seconds without new lines, after which\nfollowing stops. Default: %d." % follow_idle_timeout))
+  return args
+
+def fetch_snarks(src_path, first_msg, options={}, keep_alive_func=None, sleep_func=None):
+  """Collects snarks from a TweetSubs log.
+  See: https://github.com/Vhati/TweetSubs
+
+  :param src_path: A url, or file.
+  :param first_msg: If not None, ignore comments until this substring is found.
+  :param options: A dict of extra options specific to this parser.
+                  workers (optional):
+                      Processes to parse a large local log with.
+                      0 uses one per CPU. Default: 1.
+                  resume (optional):
+                      Remember where a local log was parsed up to,
+                      and only parse new lines next time.
+                  follow (optional):
+                      Keep watching a local log for new lines,
+                      until none arrive for follow_idle seconds.
+                  follow_idle (optional):
+                      Seconds without new lines, after which
+                      following stops. Default: 300.
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :return: A List of snark dicts.
+  :raises: ParserError
+  """
+  return list(iter_snarks(src_path, first_msg, options, keep_alive_func=keep_alive_func, sleep_func=sleep_func))
+
+def iter_snarks(src_path, first_msg, options={}, keep_alive_func=None, sleep_func=None):
+  """Yields snarks from a TweetSubs log, as lines are read.
+  See: https://github.com/Vhati/TweetSubs
+
+  Each snark is held back until the next line proves
+  it has no more multiline continuations.
+
+  Large local logs can be split at snark lines and parsed
+  by several processes, with identical results.
+
+  With resume or follow, a local log's snarks are cached
+  in the settings dir, with a checkpoint after the last
+  complete one. Later calls parse only lines past that,
+  as long as the log has only been appended to.
+
+  Logs ending in ".gz", ".bz2" or ".xz" are decompressed
+  as they're read, by one process, without resume or follow.
+
+  :param src_path: A url, or file.
+  :param first_msg: If not None, ignore comments until this substring is found.
+  :param options: A dict of extra options specific to this parser.
+                  workers (optional):
+                      Processes to parse a large local log with.
+                      0 uses one per CPU. Default: 1.
+                  resume (optional):
+                      Remember where a local log was parsed up to,
+                      and only parse new lines next time.
+                  follow (optional):
+                      Keep watching a local log for new lines,
+                      until none arrive for follow_idle seconds.
+                  follow_idle (optional):
+                      Seconds without new lines, after which
+                      following stops. Default: 300.
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :return: A generator of snark dicts.
+  :raises: ParserError
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  if (not src_path): raise common.ParserError("The %s parser requires the general arg, \"src_path\", to be set." % re.sub(".*[.]", "", __name__))
+
+  workers = options.get(ns+"workers", 1)
+  if (workers is None): workers = 1
+  if (workers < 0): raise common.ParserError("The %s parser's \"workers\" option can't be negative." % re.sub(".*[.]", "", __name__))
+  if (workers == 0): workers = multiprocessing.cpu_count()
+  if (workers > 1 and multiprocessing.current_process().daemon):
+    workers = 1  # Pool processes, as in a batch, can't have children.
+
+  resume = bool(options.get(ns+"resume", False))
+  follow = bool(options.get(ns+"follow", False))
+  follow_idle = options.get(ns+"follow_idle", follow_idle_timeout)
+  if (follow_idle is None): follow_idle = follow_idle_timeout
+  if (follow_idle < 0): raise common.ParserError("The %s parser's \"follow_idle\" option can't be negative." % re.sub(".*[.]", "", __name__))
+
+  start_date = None
+
+  try:
+    local_path = linereader.get_local_path(src_path)
+    if (local_path is not None and compression.get_codec(local_path)):
+      if (resume or follow):
+        logging.warning("Compressed logs can't be resumed or followed. Reading it all.")
+      local_path = None  # Offsets within it would be meaningless.
+
+    if ((resume or follow) and local_path is not None):
+      for snark in _iter_tailed_snarks(local_path, first_msg, resume, follow, follow_idle, keep_alive_func, sleep_func):
+        yield snark
+      return
+
+    if (workers > 1 and local_path is not None):
+      snarks_and_lines = _iter_parallel_snarks(local_path, first_msg, workers, keep_alive_func)
+    else:
+      lines = linereader.iter_matched_lines(src_path, _snark_ptn, _buffer_ptn, keep_alive_func=keep_alive_func)
+      snarks_and_lines = _iter_line_snarks(lines)
+
+    for (snark, line) in snarks_and_lines:
+      if (start_date is None):
+        if (first_msg and line.find(first_msg) == -1):
+          # This snark was earlier than the expected first msg.
+          continue
+        start_date = snark["date"]
+
+      yield snark
+
+  except (urllib2.HTTPError) as err:
+    logging.error("Http status: %d" % err.code)
+    raise common.ParserError("Parser failed.")
+  except (urllib2.URLError) as err:
+    logging.error(str(err))
+    raise common.ParserError("Parser failed.")
+
+
+def _iter_line_snarks(lines):
+  """Yields (snark, line) tuples, gathering multiline continuations.
+
+  :param lines: An iterable of (line, match) tuples, from linereader.
+  """
+  pending_snark = None  # The latest snark, still collecting lines.
+  pending_line = None
+  prev_line_was_snark = False
+
+  for (line, result) in lines:
+    if (result is None):
+      # Lines without a logging datestamp must be part of a multiline snark.
+      if (pending_snark is not None and prev_line_was_snark is True and _log_line_ptn.match(line) is None):
+        pending_snark["msg"] += "\n"+ line
+        prev_line_was_snark = True
+      else:
+        prev_line_was_snark = False
+      continue
+
+    snark = {}
+    snark["user"] = "@%s" % result.group(8)
+    snark["msg"] =  result.group(9)
+
+    year, month, day, hour, minute, second, lag_seconds = [int(x) for x in result.group(1,2,3,4,5,6,7)]
+
+    # Local time zone
+    snark["date"] = datetime(year, month, day, hour, minute, second)
+    snark["date"] = snark["date"] - timedelta(seconds=lag_seconds)
+
+    if (pending_snark is not None): yield (pending_snark, pending_line)
+    pending_snark = snark
+    pending_line = line
+    prev_line_was_snark = True
+
+  if (pending_snark is not None): yield (pending_snark, pending_line)
+
+
+def _iter_parallel_snarks(path, first_msg, workers, keep_alive_func):
+  """Yields (snark, line) tuples, parsing chunks of a local log in a process pool.
+
+  Chunks begin at snark lines, which are never continuations,
+  so each chunk's snarks are complete.
+
+  Rather than sending every line back from the workers, the
+  line returned with each snark is first_msg for the first
+  snark whose line contained it, and "" otherwise.
+  """
+  chunk_count = min(workers * 4, os.path.getsize(path) // min_chunk_bytes)
+  offsets = linereader.find_chunk_offsets(path, _buffer_ptn, max(chunk_count, 1))
+  if (len(offsets) < 3):
+    # One chunk isn't worth a pool.
+    for pair in _iter_line_snarks(linereader.iter_mapped_lines(path, _snark_ptn, _buffer_ptn, keep_alive_func=keep_alive_func)):
+      yield pair
+    return
+
+  chunk_args = [(path, offsets[i], offsets[i+1], first_msg) for i in range(len(offsets)-1)]
+  pool = multiprocessing.Pool(min(workers, len(chunk_args)))
+  try:
+    for (snarks, first_msg_index) in pool.imap(_parse_chunk, chunk_args):
+      if (keep_alive_func() is False): break
+
+      for (i, snark) in enumerate(snarks):
+        yield (snark, (first_msg if (i == first_msg_index) else ""))
+    pool.close()
+  finally:
+    pool.terminate()
+    pool.join()
+  instrumentation.count_bytes(offsets[-1], 0)
+
+def _parse_chunk(args):
+  """Parses a chunk of a local log, in a worker process.
+
+  :param args: A (path, start offset, end offset, first_msg) tuple.
+  :return: A tuple: a list of snark dicts, and the index of the first
+           whose line contained first_msg (or None).
+  """
+  path, start, end, first_msg = args
+  snarks = []
+  first_msg_index = None
+  for (snark, line) in _iter_line_snarks(linereader.iter_mapped_lines(path, _snark_ptn, _buffer_ptn, start=start, end=end)):
+    if (first_msg and first_msg_index is None and line.find(first_msg) != -1):
+      first_msg_index = len(snarks)
+    snarks.append(snark)
+  return (snarks, first_msg_index)
+
+
+class _Checkpoint(object):
+  """Progress through an append-only local log.
+
+  Snarks before the offset are cached in a separate file,
+  appended to as the log grows.
+  """
+
+  def __init__(self, path, first_msg):
+    object.__init__(self)
+    self.path = os.path.abspath(path)
+    self.first_msg = first_msg
+    self.offset = 0           # Start of the first line not yet cached.
+    self.started = False      # Whether first_msg has been found.
+    self.head_digest = None   # Hash of the log's beginning, to notice replacements.
+    self.cache_bytes = 0      # Valid length of the cache file.
+
+  def get_state_path(self):
+    key = hashlib.sha1(self.path).hexdigest()[:16]
+    return os.path.join(global_config.get_settings_dir(), checkpoint_dir_name, "%s.state" % key)
+
+  def get_cache_path(self):
+    return re.sub("[.]state$", ".snarks", self.get_state_path())
+
+
+def _get_head_digest(path, offset):
+  """Returns a hash of a file's first few KB (before offset)."""
+  with open(path, "rb") as f:
+    return hashlib.sha1(f.read(min(offset, 4096))).hexdigest()
+
+def _load_checkpoint(path, first_msg):
+  """Returns a saved _Checkpoint and its cached snarks, if still valid.
+  Otherwise, a fresh _Checkpoint and an empty list.
+  """
+  checkpoint = _Checkpoint(path, first_msg)
+  state_path = checkpoint.get_state_path()
+  if (not os.path.isfile(state_path)): return (checkpoint, [])
+
+  try:
+    with open(state_path, "rb") as f:
+      saved = pickle.load(f)
+
+    if (saved.path != checkpoint.path or saved.first_msg != first_msg):
+      logging.info("Ignoring checkpoint (different log or first_msg).")
+    elif (os.path.getsize(path) < saved.offset or _get_head_digest(path, saved.offset) != saved.head_digest):
+      logging.info("Ignoring checkpoint (log was truncated or replaced).")
+    else:
+      snarks = []
+      with open(saved.get_cache_path(), "rb") as f:
+        while (f.tell() < saved.cache_bytes):
+          snarks.extend(pickle.load(f))
+      return (saved, snarks)
+
+  except (Exception) as err:
+    logging.error("Could not load checkpoint %s: %s" % (state_path, str(err)))
+
+  return (checkpoint, [])
+
+def _save_checkpoint(checkpoint, new_snarks):
+  """Appends snarks to a checkpoint's cache, then saves the checkpoint itself."""
+  state_path = checkpoint.get_state_path()
+  try:
+    if (not os.path.isdir(os.path.dirname(state_path))):
+      os.makedirs(os.path.dirname(state_path))
+
+    with open(checkpoint.get_cache_path(), ("r+b" if (checkpoint.cache_bytes > 0) else "wb")) as f:
+      f.seek(checkpoint.cache_bytes)
+      f.truncate()  # Forget anything added after the last save.
+      if (len(new_snarks) > 0):
+        pickle.dump(new_snarks, f, pickle.HIGHEST_PROTOCOL)
+      checkpoint.cache_bytes = f.tell()
+
+    checkpoint.head_digest = _get_head_digest(checkpoint.path, checkpoint.offset)
+    with open(state_path +".tmp", "wb") as f:
+      pickle.dump(checkpoint, f, pickle.HIGHEST_PROTOCOL)
+    if (os.path.exists(state_path)): os.remove(state_path)
+    os.rename(state_path +".tmp", state_path)
+    return True
+
+  except (Exception) as err:
+    logging.error("Could not save checkpoint %s: %s" % (state_path, str(err)))
+
+  return False
+
+def _iter_tailed_snarks(path, first_msg, resume, follow, follow_idle, keep_alive_func, sleep_func):
+  """Yields snarks from a local log, resuming from a checkpoint and/or following it.
+
+  Cached snarks come first. Then lines past the checkpoint
+  are parsed. The last snark, which might still grow more
+  continuation lines, is never cached. While following,
+  it's held back until a later snark arrives, or until the
+  log has gone follow_idle seconds without growing.
+  """
+  if (resume):
+    checkpoint, cached_snarks = _load_checkpoint(path, first_msg)
+    if (checkpoint.offset > 0):
+      logging.info("Resuming after %d cached snarks." % len(cached_snarks))
+  else:
+    checkpoint, cached_snarks = (_Checkpoint(path, first_msg), [])
+
+  for snark in cached_snarks:
+    yield snark
+  del cached_snarks
+
+  tail_snarks = []
+  idle_seconds = 0
+  last_size = None
+  while (True):
+    size = os.path.getsize(path)
+    if (size < checkpoint.offset):
+      logging.warning("The log shrank, so it can't be followed any further.")
+      break
+
+    if (size == last_size):
+      idle_seconds += follow_interval
+      if (idle_seconds >= follow_idle):
+        logging.info("No new lines for %d seconds. Stopped following the log." % idle_seconds)
+        break
+    else:
+      idle_seconds = 0
+    last_size = size
+
+    new_snarks, tail_snarks = _parse_tail(checkpoint, size, keep_alive_func)
+    # Cache them before yielding, while they're still as parsed.
+    # Streamed processing changes the same dicts in place.
+    if (resume): _save_checkpoint(checkpoint, new_snarks)
+    for snark in new_snarks:
+      yield snark
+
+    if (not follow or keep_alive_func() is False): break
+    sleep_func(follow_interval)
+    if (keep_alive_func() is False): break
+
+  for snark in tail_snarks:
+    yield snark
+
+def _parse_tail(checkpoint, end, keep_alive_func):
+  """Parses a log from a checkpoint's offset, and advances it.
+
+  The checkpoint moves to the last snark line whose offset
+  is known (usually the last snark), so that one will be
+  parsed again next time.
+
+  :return: A tuple of lists: snarks before the new offset, and snarks after.
+  """
+  offsets = []  # Per snark line, in order. Lines found between regex matches are None.
+  def note_offsets(lines):
+    for (line, result) in lines:
+      if (result is not None):
+        offsets.append(result.start() if (result.re is _buffer_ptn) else None)
+      yield (line, result)
+
+  lines = linereader.iter_mapped_lines(checkpoint.path, _snark_ptn, _buffer_ptn, start=checkpoint.offset, end=end, keep_alive_func=keep_alive_func)
+  new_snarks = []
+  tail_snarks = []
+  for (i, (snark, line)) in enumerate(_iter_line_snarks(note_offsets(lines))):
+    if (offsets[i] is not None):
+      # Everything before this snark's line is complete.
+      new_snarks.extend(tail_snarks)
+      del tail_snarks[:]
+      checkpoint.offset = offsets[i]
+
+    if (not checkpoint.started):
+      if (checkpoint.first_msg and line.find(checkpoint.first_msg) == -1):
+        # This snark was earlier than the expected first msg.
+        continue
+      checkpoint.started = True
+
+    tail_snarks.append(snark)
+
+  return (new_snarks, tail_snarks)
@@ -1,202 +1,317 @@
-from datetime import datetime, timedelta
-import contextlib
-import logging
-import re
-import sys
-import time
-import urllib2
-
-from lib import arginfo
-from lib import common
-from lib import global_config
-from lib.subsystems import tweepy_backend
-
-
-# Namespace for config options.
-ns = "twitter_mentions."
-
-# Names of lib.subsystem modules that should be set up in advance.
-required_subsystems = ["tweepy_backend"]
-
-
-def get_description():
-  return ("Collects snarks from your Twitter screen name and @mentions.\n"+
-          "This is much more reliable than a plain search, "+
-          "but it only works for your own account.\n"+
-          "On first use, it will prompt for authorization.")
-
-def get_arginfo():
-  args = []
-  args.append(arginfo.Arg(name="since_date", type=arginfo.DATETIME,
-              required=False, default=None, choices=None, multiple=False,
-              description="UTC date to limit dredging up old tweets."))
-  args.append(arginfo.Arg(name="until_date", type=arginfo.DATETIME,
-              required=False, default=None, choices=None, multiple=False,
-              description="UTC date to limit dredging up new tweets."))
-  return args
-
-def fetch_snarks(src_path, first_msg, options={}, keep_alive_func=None, sleep_func=None):
-  """Collects snarks from your Twitter screen name and @mentions.
-  This is much more reliable than a plain search, but it only
-  works for your own account.
-
-  This parser adds non-standard attributes to snarks:
-  "user_url" and "msg_url", links to the user's twitter
-  page and to the specific tweet. Exporters might
-  disregard this info.
-
-  :param src_path: Not used.
-  :param first_msg: If not None, ignore comments until this substring is found.
-  :param options: A dict of extra options specific to this parser.
-                  since_date (optional):
-                      UTC Datetime to limit dredging up old tweets.
-                  until_date (optional):
-                      UTC Datetime to limit dredging up new tweets.
-  :param keep_alive_func: Optional replacement to get an abort boolean.
-  :param sleep_func: Optional replacement to sleep N seconds.
-  :return: A List of snark dicts.
-  :raises: ParserError
-  """
-  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
-  if (sleep_func is None): sleep_func = global_config.nap
-
-  since_date = None
-  if (ns+"since_date" in options and options[ns+"since_date"]):
-    since_date = options[ns+"since_date"]
-
-  until_date = None
-  if (ns+"until_date" in options and options[ns+"until_date"]):
-    until_date = options[ns+"until_date"]
-
-  snarks = []
-
-  tweepy = tweepy_backend.get_tweepy()
-  tweepy_api = tweepy_backend.get_api()
-
-  try:
-    my_screen_name = tweepy_api.auth.get_username()
-
-    # List of pattern/replacement tuples to strip reply topic from comments.
-    reply_name_escaped = re.escape(my_screen_name)
-    reply_regexes = [(re.compile(" +@"+ reply_name_escaped +" +", re.IGNORECASE), " "),
-                     (re.compile(" *@"+ reply_name_escaped +" *", re.IGNORECASE), "")]
-
-    mention_args = {"count":200, "include_entities":"false", "include_rts":"false"}
-    mention_rate = {"reset":None, "limit":0, "remaining":0, "res_family":"statuses", "res_name":"/statuses/mentions_timeline"}
-    timeline_args = {"count":200, "include_entities":"false", "include_rts":"false"}
-    timeline_rate = {"reset":None, "limit":0, "remaining":0, "res_family":"statuses", "res_name":"/statuses/user_timeline"}
-
-    searches = []
-    searches.append(("Mentions", tweepy_api.mentions_timeline, mention_args, 800, mention_rate))
-    searches.append(("Timeline", tweepy_api.user_timeline, timeline_args, 3200, timeline_rate))
-
-    def update_rate_info():
-      # Sets new rate info values for the searches.
-      rate_status = tweepy_api.rate_limit_status()
-      for (search_type, tweepy_func, tweepy_func_args, search_cap, rate_info) in searches:
-        rate_info.update(rate_status["resources"][rate_info["res_family"]][rate_info["res_name"]])
-
-    update_rate_info()
-
-    for (search_type, tweepy_func, tweepy_func_args, search_cap, rate_info) in searches:
-      done = False
-      query_count = 0
-      results_count = 0
-      last_max_id = None
-
-      while (keep_alive_func() and done is False and results_count < search_cap and rate_info["remaining"] > 0):
-        results = tweepy_func(**tweepy_func_args)
-        rate_info["remaining"] -= 1
-        if (not results):
-          done = True
-          break
-        else:
-          query_count += 1
-          results_count += len(results)
-          logging.info("%s Query % 2d: % 3d results." % (search_type, query_count, len(results)))
-
-          last_status_id = None
-          for status in results:
-            if (last_max_id == status.id): continue
-            last_status_id = status.id
-
-            snark = {}
-            snark["user"] = "@%s" % common.asciify(status.author.screen_name)
-            snark["msg"] = status.text
-            for (reply_ptn, reply_rep) in reply_regexes:
-              snark["msg"] =  reply_ptn.sub(reply_rep, snark["msg"])
-            snark["msg"] = common.asciify(common.html_unescape(snark["msg"]))
-
-            snark["date"] = status.created_at
-
-            snark["user_url"] = "http://www.twitter.com/%s" % common.asciify(status.author.screen_name)
-            snark["msg_url"] = "http://twitter.com/#!/%s/status/%d" % (common.asciify(status.author.screen_name), status.id)
-
-            if (until_date and snark["date"] > until_date):
-              continue  # This snark is too recent.
-
-            if (since_date and snark["date"] < since_date):
-              done = True  # This snark is too early.
-              break
-
-            snarks.append(snark)
-
-            if (first_msg):
-              if (snark["msg"].find(first_msg) != -1):
-                done = True  # Found the first comment.
-                break
-
-          if (last_status_id is not None):
-            # Dig deeper into the past on the next loop.
-            tweepy_func_args["max_id"] = last_status_id
-            last_max_id = last_status_id
-          else:
-            # Must've only gotten the "max_id" tweet again.
-            done = True
-            break
-
-          if (rate_info["reset"] is not None and time.time() >= float(rate_info["reset"])):
-            update_rate_info()
-
-            reset_string = datetime.fromtimestamp(float(rate_info["reset"])).strftime("%Y-%m-%d %H:%M:%S")
-            logging.info("API limit for '%s' reset. Calls left: %d (Until %s)" % (rate_info["res_name"], rate_info["remaining"], reset_string))
-
-      if (done is False and rate_info["remaining"] <= 0):
-        logging.warning("Twitter API rate limit truncated results for '%s'." % rate_info["res_name"])
-        break  # No more searches.
-
-    update_rate_info()
-    logging.info("Twitter API calls left...")
-    for (search_type, tweepy_func, tweepy_func_args, search_cap, rate_info) in searches:
-      reset_string = datetime.fromtimestamp(float(rate_info["reset"])).strftime("%Y-%m-%d %H:%M:%S")
-      logging.info("'%s': %d (Until %s)." % (rate_info["res_name"], rate_info["remaining"], reset_string))
-    logging.info("Current Time: %s" % datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-
-  except (Exception) as err:
-    logging.exception("Parser failed.")
-    raise common.ParserError("Parser failed.")
-
-  snarks = sorted(snarks, key=lambda k: k["date"])
-
-  # Drop duplicates from multiple passes.
-  snarks = uniquify_list(snarks)
-
-  if (first_msg):
-    first_index = -1
-    for i in range(len(snarks)):
-      if (snarks[i]["msg"].find(first_msg) != -1):
-        # Finally reached the expected first msg.
-        first_index = i
-    if (first_index >= 0):
-      snarks = snarks[first_index:]
-    else:
-      logging.warning("first_msg string \"%s\" was not found." % first_msg)
-      snarks = []
-
-  return snarks
-
-
-def uniquify_list(seq):
-  seen = set()
-  seen_add = seen.add
-  return [x for x in seq if repr(x) not in seen and not seen_add( repr(x) )]
+from datetime import datetime, timedelta
+import contextlib
+import logging
+import Queue
+import re
+import sys
+import threading
+import time
+import urllib2
+
+import _strptime  # Imported before threads parse tweet dates (Python issue 7980).
+
+from lib import arginfo
+from lib import common
+from lib import global_config
+from lib import tweetcheckpoints
+from lib.subsystems import tweepy_backend
+
+
+# Namespace for config options.
+ns = "twitter_mentions."
+
+# Names of lib.subsystem modules that should be set up in advance.
+required_subsystems = ["tweepy_backend"]
+
+
+def get_description():
+  return ("Collects snarks from your Twitter screen name and @mentions.\n"+
+          "This is much more reliable than a plain search, "+
+          "but it only works for your own account.\n"+
+          "On first use, it will prompt for authorization.")
+
+def get_arginfo():
+  args = []
+  args.append(arginfo.Arg(name="since_date", type=arginfo.DATETIME,
+              required=False, default=None, choices=None, multiple=False,
+              description="UTC date to limit dredging up old tweets."))
+  args.append(arginfo.Arg(name="until_date", type=arginfo.DATETIME,
+              required=False, default=None, choices=None, multiple=False,
+              description="UTC date to limit dredging up new tweets."))
+  args.append(arginfo.Arg(name="full_refresh", type=arginfo.BOOLEAN,
+              required=False, default=False, choices=[True,False], multiple=False,
+              description="Ignore saved checkpoints and fetch every tweet again."))
+  return args
+
+def fetch_snarks(src_path, first_msg, options={}, keep_alive_func=None, sleep_func=None):
+  """Collects snarks from your Twitter screen name and @mentions.
+  This is much more reliable than a plain search, but it only
+  works for your own account.
+
+  This parser adds non-standard attributes to snarks:
+  "user_url" and "msg_url", links to the user's twitter
+  page and to the specific tweet. Exporters might
+  disregard this info.
+
+  Fetched tweets are saved as checkpoints (per account).
+  Later runs only ask Twitter for newer tweets, and merge
+  them with the saved ones, unless the saved ones don't
+  reach back to since_date.
+
+  :param src_path: Not used.
+  :param first_msg: If not None, ignore comments until this substring is found.
+  :param options: A dict of extra options specific to this parser.
+                  since_date (optional):
+                      UTC Datetime to limit dredging up old tweets.
+                  until_date (optional):
+                      UTC Datetime to limit dredging up new tweets.
+                  full_refresh (optional):
+                      Boolean to ignore saved checkpoints and fetch every tweet again.
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :return: A List of snark dicts.
+  :raises: ParserError
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  since_date = None
+  if (ns+"since_date" in options and options[ns+"since_date"]):
+    since_date = options[ns+"since_date"]
+
+  until_date = None
+  if (ns+"until_date" in options and options[ns+"until_date"]):
+    until_date = options[ns+"until_date"]
+
+  full_refresh = False
+  if (ns+"full_refresh" in options and options[ns+"full_refresh"]):
+    full_refresh = True
+
+  snarks = []
+
+  tweepy = tweepy_backend.get_tweepy()
+  tweepy_api = tweepy_backend.get_api()
+
+  try:
+    my_screen_name = tweepy_api.auth.get_username()
+
+    # List of pattern/replacement tuples to strip reply topic from comments.
+    reply_name_escaped = re.escape(my_screen_name)
+    reply_regexes = [(re.compile(" +@"+ reply_name_escaped +" +", re.IGNORECASE), " "),
+                     (re.compile(" *@"+ reply_name_escaped +" *", re.IGNORECASE), "")]
+
+    mention_args = {"count":200, "include_entities":"false", "include_rts":"false"}
+    mention_rate = {"reset":None, "limit":0, "remaining":0, "res_family":"statuses", "res_name":"/statuses/mentions_timeline"}
+    timeline_args = {"count":200, "include_entities":"false", "include_rts":"false"}
+    timeline_rate = {"reset":None, "limit":0, "remaining":0, "res_family":"statuses", "res_name":"/statuses/user_timeline"}
+
+    searches = []
+    searches.append(common.Bunch(search_type="Mentions", tweepy_func=tweepy_api.mentions_timeline, tweepy_func_args=mention_args, search_cap=800, rate_info=mention_rate,
+                                 checkpoint_key="twitter_mentions:mentions:%s" % my_screen_name.lower()))
+    searches.append(common.Bunch(search_type="Timeline", tweepy_func=tweepy_api.user_timeline, tweepy_func_args=timeline_args, search_cap=3200, rate_info=timeline_rate,
+                                 checkpoint_key="twitter_mentions:timeline:%s" % my_screen_name.lower()))
+
+    for search in searches:
+      search.checkpoint = None
+      if (full_refresh): continue
+      checkpoint = tweetcheckpoints.load(search.checkpoint_key)
+      if (checkpoint is not None and checkpoint.tweets and checkpoint.covers(since_date)):
+        search.checkpoint = checkpoint
+        # Ask for the newest saved tweet too. Once it comes back,
+        # the new tweets have all been fetched.
+        search.tweepy_func_args["since_id"] = checkpoint.get_max_id() - 1
+        logging.info("%s: Fetching tweets newer than %d saved ones." % (search.search_type, len(checkpoint.tweets)))
+
+    _update_rate_info(tweepy_api, [x.rate_info for x in searches])
+
+    # Each search pages through its own timeline in a thread, with
+    # its own rate limit, while this thread turns pages into snarks.
+    page_queue = Queue.Queue()
+    for search in searches:
+      search.fetched = []  # (id, snark) tuples, newest first.
+      search.walk_end = None
+      search.cut_short = False
+      search.stop_event = threading.Event()
+      search.exc_info = None
+      search.thread = threading.Thread(target=_page_through_search, args=(tweepy_api, search, since_date, page_queue, keep_alive_func), name="Twitter-%s" % search.search_type)
+      search.thread.daemon = True
+
+    try:
+      for search in searches:
+        search.thread.start()
+
+      searches_running = len(searches)
+      while (searches_running > 0):
+        try:
+          search, results = page_queue.get(True, 1)  # A timeout lets this thread notice Ctrl-C.
+        except (Queue.Empty) as err:
+          continue
+
+        if (results is None):
+          searches_running -= 1
+          continue
+        if (search.stop_event.is_set()): continue  # Fetched before the search was stopped.
+
+        for status in results:
+          snark = {}
+          snark["user"] = "@%s" % common.asciify(status.author.screen_name)
+          snark["msg"] = status.text
+          for (reply_ptn, reply_rep) in reply_regexes:
+            snark["msg"] =  reply_ptn.sub(reply_rep, snark["msg"])
+          snark["msg"] = common.asciify(common.html_unescape(snark["msg"]))
+
+          snark["date"] = status.created_at
+
+          snark["user_url"] = "http://www.twitter.com/%s" % common.asciify(status.author.screen_name)
+          snark["msg_url"] = "http://twitter.com/#!/%s/status/%d" % (common.asciify(status.author.screen_name), status.id)
+
+          if (since_date and snark["date"] < since_date):
+            search.walk_end = "since"
+            search.stop_event.set()  # This snark is too early.
+            break
+
+          search.fetched.append((status.id, snark))
+
+          if (first_msg and search.checkpoint is None):
+            if (snark["msg"].find(first_msg) != -1):
+              search.cut_short = True
+              search.stop_event.set()  # Found the first comment.
+              break
+
+    finally:
+      for search in searches:
+        search.stop_event.set()
+      for search in searches:
+        while (search.thread.isAlive()):
+          search.thread.join(1)
+
+    deduper = common.SnarkDeduper()
+    for search in searches:
+      if (search.exc_info is not None):
+        raise search.exc_info[0], search.exc_info[1], search.exc_info[2]
+
+      walk_end = (None if (search.cut_short) else search.walk_end)
+      checkpoint = tweetcheckpoints.merge(search.checkpoint_key, search.checkpoint, search.fetched, walk_end, since_date)
+      if (checkpoint is not None):
+        if (keep_alive_func()): tweetcheckpoints.save(checkpoint)
+        tweets = checkpoint.get_tweets()
+      else:
+        tweets = search.fetched
+
+      for (status_id, snark) in tweets:
+        if (until_date and snark["date"] > until_date):
+          continue  # This snark is too recent.
+        if (since_date and snark["date"] < since_date):
+          continue  # This snark is too early.
+        if (not deduper.add(snark, status_id)):
+          continue  # Another search found it, too.
+        snarks.append(snark)
+
+    _update_rate_info(tweepy_api, [x.rate_info for x in searches])
+    logging.info("Twitter API calls left...")
+    for search in searches:
+      rate_info = search.rate_info
+      reset_string = datetime.fromtimestamp(float(rate_info["reset"])).strftime("%Y-%m-%d %H:%M:%S")
+      logging.info("'%s': %d (Until %s)." % (rate_info["res_name"], rate_info["remaining"], reset_string))
+    logging.info("Current Time: %s" % datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+  except (Exception) as err:
+    logging.exception("Parser failed.")
+    raise common.ParserError("Parser failed.")
+
+  snarks = sorted(snarks, key=lambda k: k["date"])
+
+  if (first_msg):
+    first_index = -1
+    for i in range(len(snarks)):
+      if (snarks[i]["msg"].find(first_msg) != -1):
+        # Finally reached the expected first msg.
+        first_index = i
+    if (first_index >= 0):
+      snarks = snarks[first_index:]
+    else:
+      logging.warning("first_msg string \"%s\" was not found." % first_msg)
+      snarks = []
+
+  return snarks
+
+
+def _update_rate_info(tweepy_api, rate_infos):
+  """Sets new rate info values for searches."""
+  rate_status = tweepy_api.rate_limit_status()
+  for rate_info in rate_infos:
+    rate_info.update(rate_status["resources"][rate_info["res_family"]][rate_info["res_name"]])
+
+
+def _page_through_search(tweepy_api, search, since_date, page_queue, keep_alive_func):
+  """Fetches a search's pages of statuses, newest first.
+
+  Each page is queued as a (search, statuses) tuple, and the
+  next request goes out right away, while the page is still
+  being turned into snarks. A (search, None) tuple follows the
+  last page. Setting search.stop_event ends the search early.
+
+  If search.checkpoint is set, paging stops at its newest tweet.
+  How paging ended is noted in search.walk_end (see
+  tweetcheckpoints.merge()), and any exception is kept in
+  search.exc_info.
+  """
+  try:
+    done = False
+    query_count = 0
+    results_count = 0
+    last_max_id = None
+    rate_info = search.rate_info
+    known_max_id = (search.checkpoint.get_max_id() if (search.checkpoint is not None) else None)
+
+    while (keep_alive_func() and not search.stop_event.is_set() and results_count < search.search_cap and rate_info["remaining"] > 0):
+      results = search.tweepy_func(**search.tweepy_func_args)
+      rate_info["remaining"] -= 1
+      if (not results):
+        search.walk_end = "end"
+        done = True
+        break
+
+      query_count += 1
+      results_count += len(results)
+      logging.info("%s Query % 2d: % 3d results." % (search.search_type, query_count, len(results)))
+
+      statuses = [status for status in results if (status.id != last_max_id)]
+      if (not statuses):
+        # Must've only gotten the "max_id" tweet again.
+        search.walk_end = "end"
+        done = True
+        break
+
+      # Dig deeper into the past on the next loop.
+      last_max_id = search.tweepy_func_args["max_id"] = statuses[-1].id
+
+      page_queue.put((search, statuses))
+
+      if (known_max_id is not None and statuses[-1].id <= known_max_id):
+        search.walk_end = "end"  # Caught up with the checkpoint.
+        done = True
+        break
+
+      if (since_date and statuses[-1].created_at < since_date):
+        search.walk_end = "since"  # Older pages would be too early.
+        done = True
+        break
+
+      if (rate_info["reset"] is not None and time.time() >= float(rate_info["reset"])):
+        _update_rate_info(tweepy_api, [rate_info])
+
+        reset_string = datetime.fromtimestamp(float(rate_info["reset"])).strftime("%Y-%m-%d %H:%M:%S")
+        logging.info("API limit for '%s' reset. Calls left: %d (Until %s)" % (rate_info["res_name"], rate_info["remaining"], reset_string))
+
+    if (done is False and known_max_id is None and results_count >= search.search_cap):
+      search.walk_end = "end"  # As far back as Twitter goes.
+
+    if (done is False and not search.stop_event.is_set() and rate_info["remaining"] <= 0):
+      logging.warning("Twitter API rate limit truncated results for '%s'." % rate_info["res_name"])
+
+  except (Exception) as err:
+    search.exc_info = sys.exc_info()
+
+  finally:
+    page_queue.put((search, None))
@@ -0,0 +1,172 @@
+import glob
+import logging
+import multiprocessing
+import os
+import time
+import types
+
+from lib import common
+from lib import global_config
+from lib import instrumentation
+from lib import parsecache
+from lib import snarktable
+from lib import snarkutils
+
+
+def find_configs(patterns):
+  """Returns sorted config file paths from dirs and/or glob patterns.
+  A dir contributes every "*.py" file in it.
+  """
+  paths = set()
+  for pattern in patterns:
+    if (os.path.isdir(pattern)):
+      pattern = os.path.join(pattern, "*.py")
+    paths.update(p for p in glob.glob(pattern) if (os.path.isfile(p)))
+  return sorted(paths)
+
+
+def load_config(path):
+  """Executes a config file, without importing it as a module.
+
+  Unlike __import__("config"), nothing is added to
+  sys.modules, so several configs can be loaded in turn.
+
+  :return: A Bunch of the file's public, non-module globals.
+  :raises: CompileSubsException
+  """
+  namespace = {"__file__":path, "__name__":"config"}
+  try:
+    execfile(path, namespace)
+  except (Exception) as err:
+    raise common.CompileSubsException("Could not load config %s: %s" % (path, str(err)))
+
+  attribs = dict((k,v) for (k,v) in namespace.items() if (not k.startswith("_") and not isinstance(v, types.ModuleType)))
+  return common.Changeling(common.Bunch(**attribs))
+
+
+def run_pipeline(config, stream=False, columnar=False):
+  """Parses, processes and exports snarks for one config.
+
+  :param stream: True to pass snarks along one at a time, never holding them all.
+  :param columnar: True to store snarks compactly (ignored when streaming).
+  :return: A Bunch{parsed,exported} of snark counts (None when streaming).
+  :raises: CompileSubsException
+  """
+  counts = common.Bunch(parsed=None, exported=None)
+
+  if (stream):
+    # When profiling, parsing and processing get timed as part
+    # of exporting, since they only happen as snarks are pulled.
+    logging.info("Calling %s parser (streaming)..." % config.parser_name)
+    snarks = snarkutils.peek_snarks(snarkutils.iter_parsed_snarks(config))
+    if (snarks is None):
+      raise common.CompileSubsException("No messages were parsed.")
+
+    snarks = snarkutils.peek_snarks(snarkutils.iter_processed_snarks(config, snarks))
+    if (snarks is None):
+      raise common.CompileSubsException("After processing, no messages were left.")
+
+  else:
+    logging.info("Calling %s parser..." % config.parser_name)
+    if (columnar):
+      # Store snarks compactly, as they're parsed.
+      with instrumentation.measure("parse_snarks (columnar)") as stage:
+        snarks = snarktable.SnarkTable(snarkutils.iter_parsed_snarks(config))
+        stage.set_snarks_out(len(snarks))
+    else:
+      snarks = snarkutils.parse_snarks(config)
+    counts.parsed = len(snarks)
+    if (len(snarks) == 0):
+      raise common.CompileSubsException("No messages were parsed.")
+
+    snarkutils.process_snarks(config, snarks)
+    counts.exported = len(snarks)
+    if (len(snarks) == 0):
+      raise common.CompileSubsException("After processing, no messages were left.")
+
+  logging.info("Calling %s exporter..." % config.exporter_name)
+  snarkutils.export_snarks(config, snarks)
+
+  return counts
+
+
+def run_batch(config_paths, workers=1, stream=False, columnar=False):
+  """Runs the pipeline for many config files, in a process pool.
+
+  Each config gets a fresh process, so nothing lingers
+  between them. A failure is recorded, and the rest go on.
+
+  :param workers: Number of configs to run at once.
+  :return: A list of result dicts{path,ok,error,parsed,exported,wall_seconds,cpu_seconds}, in config_paths' order.
+  """
+  jobs = [(path, stream, columnar, parsecache.enabled) for path in config_paths]
+  results = []
+
+  pool = multiprocessing.Pool(processes=max(1, min(workers, len(jobs))), maxtasksperchild=1)
+  try:
+    for result in pool.imap(_run_job, jobs):
+      results.append(result)
+      if (result["ok"]):
+        logging.info("Finished %s (%d of %d)." % (result["path"], len(results), len(jobs)))
+      else:
+        logging.error("Failed %s (%d of %d): %s" % (result["path"], len(results), len(jobs), result["error"]))
+
+      if (global_config.keeping_alive() is False):
+        logging.warning("Batch was interrupted.")
+        break
+    pool.close()
+  finally:
+    pool.terminate()
+    pool.join()
+
+  return results
+
+
+def _run_job(args):
+  """Runs the pipeline for one config file, in a pool process.
+
+  Errors are caught, so a bad config only fails itself.
+
+  :param args: A tuple: (path, stream, columnar, use_cache).
+  :return: A result dict (see run_batch()).
+  """
+  path, stream, columnar, use_cache = args
+  if (use_cache):
+    parsecache.enable()
+  else:
+    parsecache.disable()
+
+  result = {"path":path, "ok":False, "error":None, "parsed":None, "exported":None}
+  wall_start = time.time()
+  cpu_start = sum(os.times()[:2])
+  try:
+    logging.info("Compiling %s..." % path)
+    config = load_config(path)
+    counts = run_pipeline(config, stream=stream, columnar=columnar)
+    result.update(ok=True, parsed=counts.parsed, exported=counts.exported)
+
+  except (common.CompileSubsException) as err:
+    result["error"] = str(err)
+
+  except (Exception) as err:
+    logging.exception(err)
+    result["error"] = "%s: %s" % (err.__class__.__name__, str(err))
+
+  result["wall_seconds"] = time.time() - wall_start
+  result["cpu_seconds"] = sum(os.times()[:2]) - cpu_start
+  return result
+
+
+def log_batch_summary(results):
+  """Logs a table of batch results, failures last."""
+  lines = []
+  lines.append("%-40s %-6s %9s %9s %9s %9s  %s" % ("Config", "Status", "Parsed", "Exported", "Wall (s)", "CPU (s)", "Error"))
+  for r in sorted(results, key=lambda x: not x["ok"]):
+    lines.append("%-40s %-6s %9s %9s %9.2f %9.2f  %s" % (r["path"], ("ok" if (r["ok"]) else "FAILED"),
+                 ("-" if (r["parsed"] is None) else r["parsed"]), ("-" if (r["exported"] is None) else r["exported"]),
+                 r["wall_seconds"], r["cpu_seconds"], (r["error"] or "")))
+
+  failures = len([r for r in results if (not r["ok"])])
+  lines.append("%d configs, %d failed." % (len(results), failures))
+
+  logging.info("Batch summary...\n%s" % "\n".join(lines))
@@ -0,0 +1,563 @@
+import bisect
+from datetime import datetime, timedelta
+import itertools
+import json
+import mmap
+import os
+import struct
+
+from lib import common
+
+
+# Snark archive format, version 1.
+#
+# All numbers are little-endian. Dates and times are integer
+# microseconds (dates since EPOCH). Anything a row lacks is
+# stored as MISSING (or code -1).
+#
+# Header:
+#   magic          8 bytes  "SNARKARC"
+#   version        uint16   Readers refuse versions they don't know.
+#   section_count  uint16
+#   block_size     uint32   Rows per block (see "index").
+#   snark_count    uint64
+# Then section_count entries:
+#   name           8 bytes  Padded with NULs.
+#   offset         uint64   From the start of the file.
+#   size           uint64   In bytes.
+#
+# Sections (unknown ones are ignored, so new ones can be added):
+#   "index"     Per block: first row (uint64), row count (uint32),
+#               then min date, max date, min time, max time (int64),
+#               for finding rows in a range without reading them.
+#   "dates"     int64 per row.
+#   "times"     int64 per row.
+#   "users"     int32 per row, codes into "userdict".
+#   "userdict"  A string table of unique users.
+#   "msgs"      A string table with one msg per row (the msg heap).
+#   "colors"    int32 per row, codes into "colrdict" (-2 for None).
+#   "colrdict"  uint32 count, then that many RGB triples of float64.
+#   "extras"    UTF-8 JSON list describing any other attributes:
+#                 [name, "strings", offset, size]
+#                     A string table in "xstrings" (offset is relative
+#                     to that section), when every value was a string.
+#                 [name, "values", [[row, kind, value], ...]]
+#                     Otherwise. Kinds: "s" (str, as latin-1 chars),
+#                     "u" (unicode), "v" (int/float/bool/None),
+#                     "d" (date), "t" (time).
+#   "xstrings"  String tables for "extras".
+#
+# A string table is a uint32 count, count kind bytes (0=missing,
+# 1=str, 2=unicode as UTF-8), count+1 uint64 offsets (relative
+# to the start of the text), then the text.
+
+magic = "SNARKARC"
+version = 1
+
+# Rows per block, for the index. Reading a date range
+# reads whole blocks.
+block_size = 4096
+
+EPOCH = datetime(1970, 1, 1)
+
+MISSING = -2**63
+
+# Attributes stored in columns of their own, and the types
+# those columns hold. Other values go in "extras".
+column_names = ["date", "time", "user", "msg", "color"]
+_column_types = {"date":datetime, "time":timedelta, "user":basestring, "msg":basestring, "color":tuple}
+
+# Sections every archive must have.
+required_sections = ["index", "dates", "times", "users", "userdict", "msgs", "colors", "colrdict", "extras", "xstrings"]
+
+# String table kinds, by type.
+_string_kinds = {type(None):0, str:1, unicode:2}
+
+# Placeholder for a row that lacks an attribute.
+_ABSENT = object()
+
+# Placeholder for a value a column can't hold.
+_UNSUITABLE = object()
+
+_header_struct = struct.Struct("<8sHHIQ")
+_section_struct = struct.Struct("<8sQQ")
+_block_struct = struct.Struct("<QIqqqq")
+
+
+def delta_us(delta):
+  """Returns the total microseconds in a timedelta, as an int."""
+  return ((delta.days*86400 + delta.seconds) * 1000000 + delta.microseconds)
+
+def us_delta(us):
+  """Returns a timedelta for a number of microseconds."""
+  return timedelta(0, us // 1000000, us % 1000000)
+
+
+def write_archive(dest_file, snarks):
+  """Writes snarks in the snark archive format.
+
+  EVERY attribute is saved. Attributes beyond the usual
+  columns must be strings, numbers, booleans, None,
+  datetimes or timedeltas.
+
+  The whole file is assembled in memory, a column at a
+  time, then written in order (no seeking), so dest_file
+  may be a compressing wrapper.
+
+  :param dest_file: A binary-mode file-like object to write into.
+  :param snarks: A list (or iterable) of snark dicts (or SnarkRows).
+  :raises: CompileSubsException
+  """
+  with common.gc_paused():
+    _write_archive(dest_file, snarks)
+
+def _write_archive(dest_file, snarks):
+  if (not isinstance(snarks, list)): snarks = list(snarks)
+  count = len(snarks)
+
+  extras = {}  # Name -> [(row, value), ...]
+  try:
+    dates = _encode_column(snarks, "date", (lambda d: delta_us(d - EPOCH) if (isinstance(d, datetime)) else None), MISSING, extras)
+    times = _encode_column(snarks, "time", (lambda t: delta_us(t) if (isinstance(t, timedelta)) else None), MISSING, extras)
+
+    users = []
+    def encode_user(user):
+      if (not isinstance(user, basestring)): return None
+      users.append(user)
+      return len(users) - 1
+    user_codes = _encode_column(snarks, "user", encode_user, -1, extras)
+
+    colors = []
+    def encode_color(color):
+      if (color is None): return -2
+      if (not isinstance(color, tuple) or len(color) != 3): return None
+      colors.append(color)
+      return len(colors) - 1
+    color_codes = _encode_column(snarks, "color", encode_color, -1, extras)
+  except (TypeError) as err:
+    raise common.CompileSubsException("A snark attribute can't be archived: %s" % str(err))
+
+  msgs = [snark.get("msg") for snark in snarks]
+  if (not set(map(type, msgs)) <= set([str, unicode])):
+    msgs = _encode_column(snarks, "msg", (lambda m: m if (isinstance(m, basestring)) else None), None, extras)
+
+  all_keys = set()
+  for snark in snarks:
+    all_keys.update(snark.keys())
+  for name in all_keys:
+    if (name in _column_types): continue
+    extras[name] = [(row, snark[name]) for (row, snark) in enumerate(snarks) if (name in snark)]
+
+  blocks = []
+  for first_row in range(0, count, block_size):
+    row_count = min(block_size, count - first_row)
+    block_dates = [x for x in dates[first_row:first_row+row_count] if (x != MISSING)] or [MISSING]
+    block_times = [x for x in times[first_row:first_row+row_count] if (x != MISSING)] or [MISSING]
+    blocks.append(_block_struct.pack(first_row, row_count, min(block_dates), max(block_dates), min(block_times), max(block_times)))
+
+  sections = []
+  sections.append(("index", "".join(blocks)))
+  sections.append(("dates", struct.pack("<%dq" % count, *dates)))
+  sections.append(("times", struct.pack("<%dq" % count, *times)))
+  sections.append(("users", struct.pack("<%di" % count, *user_codes)))
+  sections.append(("userdict", _pack_strings(users)))
+  sections.append(("msgs", _pack_strings(msgs)))
+  sections.append(("colors", struct.pack("<%di" % count, *color_codes)))
+  color_values = [c for color in colors for c in color]
+  sections.append(("colrdict", struct.pack("<I%dd" % len(color_values), len(colors), *color_values)))
+
+  extra_infos = []
+  extra_tables = []
+  extra_size = 0
+  for (name, entries) in sorted(extras.items()):
+    if (set(map(type, [value for (row, value) in entries])) <= set([str, unicode])):
+      values = [None] * count
+      for (row, value) in entries:
+        values[row] = value
+      table = _pack_strings(values)
+      extra_infos.append([name, "strings", extra_size, len(table)])
+      extra_tables.append(table)
+      extra_size += len(table)
+    else:
+      extra_infos.append([name, "values", [_encode_extra(row, name, value) for (row, value) in entries]])
+  sections.append(("extras", json.dumps(extra_infos, separators=(",",":"))))
+  sections.append(("xstrings", "".join(extra_tables)))
+
+  offset = _header_struct.size + _section_struct.size * len(sections)
+  dest_file.write(_header_struct.pack(magic, version, len(sections), block_size, count))
+  for (name, data) in sections:
+    dest_file.write(_section_struct.pack(name, offset, len(data)))
+    offset += len(data)
+  for (name, data) in sections:
+    dest_file.write(data)
+
+def _encode_column(snarks, name, encode_func, missing_code, extras):
+  """Returns a list of column values for one attribute.
+
+  :param encode_func: A function to call once per distinct value,
+                      returning what to store, or None if the
+                      column can't hold it.
+  :param missing_code: What to store for rows that lack the attribute.
+  :param extras: A dict to add (row, value) tuples to, for values
+                 the column couldn't hold.
+  :raises: TypeError (for unhashable values)
+  """
+  values = [snark.get(name, _ABSENT) for snark in snarks]
+  memo = {}
+  for value in set(values):
+    if (value is _ABSENT): continue
+    code = encode_func(value)
+    memo[value] = (_UNSUITABLE if (code is None) else code)
+  memo[_ABSENT] = missing_code
+  codes = [memo[value] for value in values]
+
+  if (_UNSUITABLE in memo.values()):
+    row = -1
+    try:
+      while (True):
+        row = codes.index(_UNSUITABLE, row+1)
+        extras.setdefault(name, []).append((row, values[row]))
+        codes[row] = missing_code
+    except (ValueError) as err:
+      pass  # No more rows.
+  return codes
+
+def _encode_extra(row, key, value):
+  if (isinstance(value, str)):
+    return [row, "s", value.decode("latin-1")]
+  elif (isinstance(value, unicode)):
+    return [row, "u", value]
+  elif (isinstance(value, datetime)):
+    return [row, "d", delta_us(value - EPOCH)]
+  elif (isinstance(value, timedelta)):
+    return [row, "t", delta_us(value)]
+  elif (value is None or isinstance(value, (bool, int, long, float))):
+    return [row, "v", value]
+  else:
+    raise common.CompileSubsException("Snark attribute \"%s\" can't be archived (type: %s)." % (key, type(value).__name__))
+
+def _decode_extra(kind, value):
+  if (kind == "s"): return value.encode("latin-1")
+  elif (kind == "d"): return EPOCH + us_delta(value)
+  elif (kind == "t"): return us_delta(value)
+  return value
+
+def _pack_strings(values):
+  """Returns a string table (see the format notes above).
+
+  :param values: A list of strings (None where missing).
+  """
+  value_types = map(type, values)
+  if (set(value_types) == set([str])):
+    kinds = "\x01" * len(values)  # All plain strings, the usual case.
+  else:
+    kinds = struct.pack("%dB" % len(values), *[_string_kinds.get(t, 1) for t in value_types])
+    values = [("" if (v is None) else v.encode("utf-8") if (t is unicode) else v) for (v, t) in zip(values, value_types)]
+
+  offsets = [0] * (len(values) + 1)
+  size = 0
+  for (i, value) in enumerate(values):
+    size += len(value)
+    offsets[i+1] = size
+
+  return "".join([struct.pack("<I", len(values)), kinds, struct.pack("<%dQ" % len(offsets), *offsets), "".join(values)])
+
+
+class ArchiveReader(object):
+  """Reads snarks from a snark archive, loading only the
+  rows and columns asked for.
+
+  A local file is memory-mapped, so rows outside a date
+  range aren't read at all. Any other source is read
+  into memory.
+  """
+
+  def __init__(self, src):
+    """Constructor.
+
+    :param src: A local file path, or a binary-mode file-like object.
+    :raises: IOError (if the file is not a valid archive)
+    """
+    object.__init__(self)
+    self._mmap = None
+    if (isinstance(src, basestring)):
+      with open(src, "rb") as f:
+        if (os.fstat(f.fileno()).st_size > 0):
+          self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+      self._buf = (self._mmap if (self._mmap is not None) else "")
+    else:
+      self._buf = src.read()
+
+    if (len(self._buf) < _header_struct.size):
+      self.close()
+      raise IOError("Not a snark archive (too short).")
+    file_magic, self.version, section_count, self.block_size, self.count = _header_struct.unpack_from(self._buf, 0)
+    if (file_magic != magic):
+      self.close()
+      raise IOError("Not a snark archive (bad magic).")
+    if (self.version > version):
+      self.close()
+      raise IOError("Snark archive version %d is newer than this reader (%d)." % (self.version, version))
+
+    if (_header_struct.size + section_count * _section_struct.size > len(self._buf)):
+      self.close()
+      raise IOError("Snark archive is truncated (section table).")
+    self._sections = {}
+    for i in range(section_count):
+      name, offset, size = _section_struct.unpack_from(self._buf, _header_struct.size + i * _section_struct.size)
+      if (offset + size > len(self._buf)):
+        self.close()
+        raise IOError("Snark archive is truncated (section: %s)." % name.rstrip("\0"))
+      self._sections[name.rstrip("\0")] = (offset, size)
+
+    missing_names = [name for name in required_sections if (name not in self._sections)]
+    if (missing_names):
+      self.close()
+      raise IOError("Snark archive lacks sections: %s" % ", ".join(missing_names))
+    for (name, item_size) in [("dates", 8), ("times", 8), ("users", 4), ("colors", 4)]:
+      if (self._sections[name][1] < self.count * item_size):
+        self.close()
+        raise IOError("Snark archive is truncated (section: %s)." % name)
+
+    self.blocks = []  # Tuples: (first row, row count, min date, max date, min time, max time).
+    offset, size = self._sections["index"]
+    for i in range(size // _block_struct.size):
+      self.blocks.append(_block_struct.unpack_from(self._buf, offset + i * _block_struct.size))
+
+    self._extras = None
+    self._users = None   # Decoded "userdict".
+    self._colors = None  # Decoded "colrdict".
+
+  def close(self):
+    if (self._mmap is not None):
+      self._mmap.close()
+      self._mmap = None
+    self._buf = ""
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  def get_extra_names(self):
+    """Returns a list of non-column attribute names in this archive."""
+    return sorted(self._get_extras().keys())
+
+  def _get_extras(self):
+    """Returns a dict of extra attribute names, and their info lists from "extras"."""
+    if (self._extras is None):
+      offset, size = self._sections["extras"]
+      self._extras = {}
+      for info in json.loads(self._buf[offset:offset+size]):
+        name = info[0]
+        try:
+          name = str(name)  # JSON made it unicode.
+        except (UnicodeEncodeError) as err:
+          pass
+        if (info[1] == "values"):
+          info.append([entry[0] for entry in info[2]])  # Rows, ascending, for bisecting.
+        self._extras[name] = info
+    return self._extras
+
+  def find_rows(self, since_date=None, until_date=None, since_time=None, until_time=None):
+    """Returns (first row, row count) ranges of blocks that
+    might hold dates and times in a range, according to the
+    index.
+
+    :param since_date: A datetime, or None.
+    :param until_date: A datetime, or None.
+    :param since_time: A timedelta, or None.
+    :param until_time: A timedelta, or None.
+    """
+    since_date_us = (delta_us(since_date - EPOCH) if (since_date is not None) else None)
+    until_date_us = (delta_us(until_date - EPOCH) if (until_date is not None) else None)
+    since_time_us = (delta_us(since_time) if (since_time is not None) else None)
+    until_time_us = (delta_us(until_time) if (until_time is not None) else None)
+
+    result = []
+    for (first_row, row_count, min_date, max_date, min_time, max_time) in self.blocks:
+      if (since_date is not None or until_date is not None):
+        if (max_date == MISSING): continue
+        if (since_date_us is not None and max_date < since_date_us): continue
+        if (until_date_us is not None and min_date > until_date_us): continue
+      if (since_time is not None or until_time is not None):
+        if (max_time == MISSING): continue
+        if (since_time_us is not None and max_time < since_time_us): continue
+        if (until_time_us is not None and min_time > until_time_us): continue
+
+      if (result and result[-1][0] + result[-1][1] == first_row):
+        result[-1] = (result[-1][0], result[-1][1] + row_count)  # Merge adjacent blocks.
+      else:
+        result.append((first_row, row_count))
+    return result
+
+  def read_column(self, name, first_row=0, row_count=None):
+    """Returns a list of one column's values, for a range of rows.
+    Rows that lack the attribute get None.
+
+    :param name: "date", "time", "user", "msg", or "color".
+    """
+    values, complete = self._read_column(name, first_row, row_count)
+    if (complete): return values
+    return [(None if (value is _ABSENT) else value) for value in values]
+
+  def _read_column(self, name, first_row=0, row_count=None):
+    """Returns a tuple: a list of one column's values, with _ABSENT
+    where rows lack it, and True if there were no such rows.
+    """
+    if (row_count is None): row_count = self.count - first_row
+    if (name == "date" or name == "time"):
+      offset, size = self._sections[name +"s"]
+      values = struct.unpack_from("<%dq" % row_count, self._buf, offset + first_row * 8)
+      unique_values = set(values)
+      unique_values.discard(MISSING)
+      if (name == "date"):
+        memo = dict((us, EPOCH + us_delta(us)) for us in unique_values)
+      else:
+        memo = dict((us, us_delta(us)) for us in unique_values)
+      memo[MISSING] = _ABSENT
+      return ([memo[us] for us in values], (MISSING not in values))
+
+    elif (name == "user"):
+      offset, size = self._sections["users"]
+      codes = struct.unpack_from("<%di" % row_count, self._buf, offset + first_row * 4)
+      if (self._users is None):
+        self._users = self._read_strings(self._sections["userdict"][0])[0] + [_ABSENT]  # Code -1.
+      users = self._users
+      return ([users[code] for code in codes], (-1 not in codes))
+
+    elif (name == "msg"):
+      return self._read_strings(self._sections["msgs"][0], first_row, row_count)
+
+    elif (name == "color"):
+      offset, size = self._sections["colors"]
+      codes = struct.unpack_from("<%di" % row_count, self._buf, offset + first_row * 4)
+      if (self._colors is None):
+        offset, size = self._sections["colrdict"]
+        color_count = struct.unpack_from("<I", self._buf, offset)[0]
+        values = struct.unpack_from("<%dd" % (color_count * 3), self._buf, offset + 4)
+        self._colors = [values[i:i+3] for i in range(0, len(values), 3)] + [None, _ABSENT]  # Codes -2 and -1.
+      colors = self._colors
+      return ([colors[code] for code in codes], (-1 not in codes))
+
+    raise common.CompileSubsException("Unknown snark archive column: %s" % name)
+
+  def _read_strings(self, offset, first_row=0, row_count=None):
+    """Returns a tuple: a list of strings from a string table, with
+    _ABSENT where missing, and True if none were missing.
+
+    :param offset: Where the table begins in the file.
+    :raises: IOError
+    """
+    total = struct.unpack_from("<I", self._buf, offset)[0]
+    if (row_count is None): row_count = total - first_row
+    kinds_offset = offset + 4
+    offsets_offset = kinds_offset + total
+    text_offset = offsets_offset + (total + 1) * 8
+    if (text_offset > len(self._buf) or first_row + row_count > total):
+      raise IOError("Snark archive has a truncated string table.")
+
+    kinds = struct.unpack_from("%dB" % row_count, self._buf, kinds_offset + first_row)
+    offsets = struct.unpack_from("<%dQ" % (row_count + 1), self._buf, offsets_offset + first_row * 8)
+    text = self._buf[text_offset + offsets[0]:text_offset + offsets[-1]]
+    if (offsets[0] != 0):
+      offsets = [x - offsets[0] for x in offsets]
+
+    if (kinds.count(1) == row_count):
+      # All plain strings, the usual case.
+      return ([text[a:b] for (a, b) in zip(offsets, offsets[1:])], True)
+
+    result = []
+    for i in xrange(row_count):
+      kind = kinds[i]
+      if (kind == 1):
+        result.append(text[offsets[i]:offsets[i+1]])
+      elif (kind == 2):
+        result.append(text[offsets[i]:offsets[i+1]].decode("utf-8"))
+      else:
+        result.append(_ABSENT)
+    return (result, (0 not in kinds))
+
+  def read_snarks(self, columns=None, since_date=None, until_date=None, since_time=None, until_time=None):
+    """Returns a list of snark dicts.
+
+    :param columns: A list of attribute names to load, or None for all.
+    :param since_date: Skip snarks dated before this (or None).
+    :param until_date: Skip snarks dated after this (or None).
+    :param since_time: Skip snarks with an earlier "time" (or None).
+    :param until_time: Skip snarks with a later "time" (or None).
+    """
+    if (columns is None): columns = column_names + self.get_extra_names()
+    ranges = {}  # Column name -> (since, until), for filtered columns.
+    if (since_date is not None or until_date is not None):
+      ranges["date"] = (since_date, until_date)
+    if (since_time is not None or until_time is not None):
+      ranges["time"] = (since_time, until_time)
+
+    with common.gc_paused():
+      snarks = []
+      for (first_row, row_count) in self.find_rows(since_date, until_date, since_time, until_time):
+        snarks.extend(self._read_rows(columns, first_row, row_count, ranges))
+      return snarks
+
+  def _read_rows(self, columns, first_row, row_count, ranges):
+    """Returns a list of snark dicts, from a range of rows (see read_snarks()).
+
+    :param ranges: A dict of column names, and (since, until) tuples to filter rows by.
+    """
+    names = []
+    value_lists = []
+    incomplete_names = set()
+    range_values = []  # Tuples: (values, since, until).
+    for name in column_names:
+      if (name not in columns and name not in ranges): continue
+      values, complete = self._read_column(name, first_row, row_count)
+      if (name in ranges):
+        range_values.append((values,) + ranges[name])
+      if (name in columns):
+        names.append(name)
+        value_lists.append(values)
+        if (not complete): incomplete_names.add(name)
+
+    sparse_infos = []
+    for name in columns:
+      info = self._get_extras().get(name)
+      if (info is None or name in column_names): continue
+      if (info[1] == "strings"):
+        values, complete = self._read_strings(self._sections["xstrings"][0] + info[2], first_row, row_count)
+        names.append(name)
+        value_lists.append(values)
+        if (not complete): incomplete_names.add(name)
+      else:
+        sparse_infos.append(info)
+
+    if (len(names) > 0):
+      rows = [dict(itertools.izip(names, values)) for values in itertools.izip(*value_lists)]
+    else:
+      rows = [{} for i in xrange(row_count)]
+
+    for (name, values) in zip(names, value_lists):
+      if (name not in incomplete_names): continue
+      i = -1
+      try:
+        while (True):
+          i = values.index(_ABSENT, i+1)
+          del rows[i][name]
+      except (ValueError) as err:
+        pass  # No more rows lack this.
+
+    for (name, info_type, entries, entry_rows) in sparse_infos:
+      start = bisect.bisect_left(entry_rows, first_row)
+      end = bisect.bisect_left(entry_rows, first_row + row_count)
+      for (row, kind, value) in entries[start:end]:
+        rows[row - first_row][name] = _decode_extra(kind, value)
+
+    while (range_values):
+      values, since, until = range_values.pop(0)
+      keeps = [(value is not _ABSENT and (since is None or value >= since) and (until is None or value <= until)) for value in values]
+      rows = list(itertools.compress(rows, keeps))
+      # Other ranges' values must stay in step with the rows.
+      range_values = [(list(itertools.compress(x, keeps)), x_since, x_until) for (x, x_since, x_until) in range_values]
+
+    return rows
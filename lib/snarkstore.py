@@ -0,0 +1,338 @@
+from datetime import datetime, timedelta
+import codecs
+import itertools
+import json
+import os
+import sqlite3
+
+from lib import common
+from lib import snarkarchive
+
+
+# Snark store schema, version 1 (kept in PRAGMA user_version).
+#
+# One row per snark, in a "snarks" table:
+#   show    TEXT     An id for the show the snark was exported from.
+#   seq     INTEGER  The snark's position in that show's export.
+#   date    INTEGER  Microseconds since EPOCH (NULL if absent).
+#   time    INTEGER  In-movie microseconds (NULL if absent).
+#   user    TEXT     (NULL if absent). Compared case-insensitively.
+#   msg     TEXT     (NULL if absent). Strs that aren't UTF-8 are
+#                    stored with U+FFFD for bad bytes, as are user and
+#                    the urls, and kept exactly in "extras".
+#   user_url, msg_url
+#           TEXT     (NULL if absent).
+#   color   TEXT     JSON: [r, g, b], or null (NULL if absent).
+#   extras  TEXT     JSON object for any other attributes (or values
+#                    the columns above can't hold), as
+#                    {name: [kind, value]}. Kinds: "s" (str, as
+#                    latin-1 chars), "u" (unicode), "v" (int/float/
+#                    bool/None), "d" (date), "t" (time).
+#
+# Indexes: (show, seq) as the primary key, (show, time), (date),
+# and (user, show).
+
+schema_version = 1
+
+EPOCH = snarkarchive.EPOCH
+
+# Rows to insert per executemany() call. Between calls, the
+# exporter checks whether it should give up.
+insert_batch_size = 20000
+
+# Page cache for bulk inserts, in KiB. Index pages stay in
+# memory rather than being reread as rows arrive.
+cache_kib = 64*1024
+
+# Placeholder for a snark that lacks an attribute.
+_ABSENT = object()
+
+# Attributes stored in columns of their own, and the types
+# those columns hold. Other values go in "extras".
+_column_types = {"date":datetime, "time":timedelta, "user":basestring, "msg":basestring,
+                 "user_url":basestring, "msg_url":basestring, "color":tuple}
+_column_names = frozenset(_column_types)
+
+# Columns holding strings.
+_text_names = ["user", "msg", "user_url", "msg_url"]
+
+_table_schema = ("CREATE TABLE IF NOT EXISTS snarks ("
+  " show TEXT NOT NULL, seq INTEGER NOT NULL,"
+  " date INTEGER, time INTEGER, user TEXT COLLATE NOCASE, msg TEXT, user_url TEXT, msg_url TEXT,"
+  " color TEXT, extras TEXT,"
+  " PRIMARY KEY (show, seq))")
+
+_index_schemas = {
+  "snarks_show_time":"CREATE INDEX IF NOT EXISTS snarks_show_time ON snarks (show, time)",
+  "snarks_date":"CREATE INDEX IF NOT EXISTS snarks_date ON snarks (date)",
+  "snarks_user":"CREATE INDEX IF NOT EXISTS snarks_user ON snarks (user, show)",
+  }
+
+
+def connect(db_path, create=False):
+  """Opens a snark store, in WAL mode, so reads can continue
+  while a show is being written.
+
+  :param db_path: A file path.
+  :param create: True to create the file and tables if needed.
+  :return: An sqlite3 Connection, in autocommit mode (transactions are explicit).
+  :raises: CompileSubsException
+  """
+  if (not create and not os.path.isfile(db_path)):
+    raise common.CompileSubsException("Snark store does not exist: %s" % db_path)
+
+  try:
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+      user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+      if (user_version not in (0, schema_version)):
+        raise common.CompileSubsException("Unsupported snark store version: %d" % user_version)
+
+      if (create):
+        conn.execute("PRAGMA journal_mode=WAL")
+        if (user_version == 0):
+          conn.execute("BEGIN IMMEDIATE")
+          conn.execute(_table_schema)
+          for statement in _index_schemas.values():
+            conn.execute(statement)
+          conn.execute("PRAGMA user_version=%d" % schema_version)
+          conn.execute("COMMIT")
+      elif (user_version == 0):
+        raise common.CompileSubsException("Not a snark store: %s" % db_path)
+
+      conn.execute("PRAGMA synchronous=NORMAL")  # Durable enough, with WAL.
+    except:
+      conn.close()
+      raise
+  except (sqlite3.Error) as err:
+    raise common.CompileSubsException("Could not open snark store %s: %s" % (db_path, str(err)))
+
+  return conn
+
+
+def _encode_extra(key, value):
+  if (isinstance(value, str)):
+    return ["s", value.decode("latin-1")]
+  elif (isinstance(value, unicode)):
+    return ["u", value]
+  elif (isinstance(value, datetime)):
+    return ["d", snarkarchive.delta_us(value - EPOCH)]
+  elif (isinstance(value, timedelta)):
+    return ["t", snarkarchive.delta_us(value)]
+  elif (value is None or isinstance(value, (bool, int, long, float))):
+    return ["v", value]
+  else:
+    raise common.CompileSubsException("Snark attribute \"%s\" can't be stored (type: %s)." % (key, type(value).__name__))
+
+def _decode_extra(kind, value):
+  if (kind == "s"): return value.encode("latin-1")
+  elif (kind == "d"): return EPOCH + snarkarchive.us_delta(value)
+  elif (kind == "t"): return snarkarchive.us_delta(value)
+  return value
+
+def _text(value):
+  """Returns a value to store in (or compare with) a TEXT column.
+  Python 2's sqlite3 refuses non-ASCII strs, so they're decoded
+  as UTF-8, with U+FFFD for bad bytes.
+  """
+  return (codecs.utf_8_decode(value, "replace", True)[0] if (type(value) is str) else value)
+
+
+def _iter_rows(show_id, snarks):
+  """Yields a tuple of column values per snark."""
+  color_cache = {None:"null"}
+
+  for (seq, snark) in enumerate(snarks):
+    extras = None
+
+    date = snark.get("date")
+    if (isinstance(date, datetime)):
+      date = snarkarchive.delta_us(date - EPOCH)
+    elif ("date" in snark):
+      extras = {"date":_encode_extra("date", date)}
+      date = None
+
+    time = snark.get("time")
+    if (isinstance(time, timedelta)):
+      time = snarkarchive.delta_us(time)
+    elif ("time" in snark):
+      if (extras is None): extras = {}
+      extras["time"] = _encode_extra("time", time)
+      time = None
+
+    texts = [snark.get(name) for name in _text_names]
+    for (i, text) in enumerate(texts):
+      if (type(text) is unicode or text is None and _text_names[i] not in snark):
+        continue
+      elif (isinstance(text, str)):
+        try:
+          texts[i] = codecs.utf_8_decode(text, "strict", True)[0]
+        except (UnicodeDecodeError) as err:
+          # Keep a searchable column value, and the exact str as an extra.
+          texts[i] = codecs.utf_8_decode(text, "replace", True)[0]
+          if (extras is None): extras = {}
+          extras[_text_names[i]] = _encode_extra(_text_names[i], text)
+      else:
+        if (extras is None): extras = {}
+        extras[_text_names[i]] = _encode_extra(_text_names[i], text)
+        texts[i] = None
+
+    color = snark.get("color", _ABSENT)
+    if (color is _ABSENT):
+      color = None
+    elif (color is None or (isinstance(color, tuple) and len(color) == 3)):
+      if (color not in color_cache): color_cache[color] = json.dumps(color)
+      color = color_cache[color]
+    else:
+      if (extras is None): extras = {}
+      extras["color"] = _encode_extra("color", color)
+      color = None
+
+    if (len(snark) > len(_column_types) or extras is not None or not _column_names.issuperset(snark)):
+      for key in snark:
+        if (key in _column_types): continue
+        if (extras is None): extras = {}
+        extras[key] = _encode_extra(key, snark[key])
+
+    if (extras is not None): extras = json.dumps(extras, separators=(",",":"))
+
+    yield (show_id, seq, date, time, texts[0], texts[1], texts[2], texts[3], color, extras)
+
+
+def store_snarks(db_path, show_id, snarks, keep_alive_func=None):
+  """Writes a show's snarks to a snark store, in one transaction.
+
+  Any snarks previously stored for the same show are replaced.
+  EVERY attribute is saved. Attributes beyond the usual
+  columns must be strings, numbers, booleans, None,
+  datetimes or timedeltas. UTF-8 strs in the user, msg and
+  url columns come back as unicode. Other strs come back as
+  they were.
+
+  :param db_path: A file path (created if it doesn't exist).
+  :param show_id: A string identifying the show.
+  :param snarks: A list (or iterable) of snark dicts (or SnarkRows).
+  :param keep_alive_func: Optional function to get an abort boolean, checked between batches.
+  :return: True if stored, or False if aborted (nothing is changed).
+  :raises: CompileSubsException
+  """
+  conn = connect(db_path, create=True)
+  try:
+    conn.execute("PRAGMA cache_size=%d" % -cache_kib)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+      conn.execute("DELETE FROM snarks WHERE show = ?", (_text(show_id),))
+
+      # Into an empty table, it's faster to index everything
+      # afterward than to update the indexes row by row.
+      was_empty = (conn.execute("SELECT 1 FROM snarks LIMIT 1").fetchone() is None)
+      if (was_empty):
+        for index_name in _index_schemas:
+          conn.execute("DROP INDEX IF EXISTS %s" % index_name)
+
+      with common.gc_paused():
+        rows = _iter_rows(_text(show_id), snarks)
+        while (True):
+          batch = list(itertools.islice(rows, insert_batch_size))
+          if (not batch): break
+          conn.executemany("INSERT INTO snarks (show, seq, date, time, user, msg, user_url, msg_url, color, extras) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+
+          if (keep_alive_func is not None and keep_alive_func() is False):
+            conn.execute("ROLLBACK")
+            return False
+
+      if (was_empty):
+        for statement in _index_schemas.values():
+          conn.execute(statement)
+        # Helps the query planner pick indexes. Later exports
+        # skip this, since it reads the whole table.
+        conn.execute("ANALYZE snarks")
+      conn.execute("COMMIT")
+    except:
+      try:
+        conn.execute("ROLLBACK")
+      except (sqlite3.Error) as err:
+        pass  # Already rolled back.
+      raise
+  except (sqlite3.Error) as err:
+    raise common.CompileSubsException("Could not store snarks in %s: %s" % (db_path, str(err)))
+  finally:
+    conn.close()
+
+  return True
+
+
+def query_snarks(db_path, show_ids=None, since_time=None, until_time=None, users=None, since_date=None, until_date=None):
+  """Reads snarks from a snark store that match every given filter.
+
+  Filters narrow the search through the indexes, so only
+  matching rows are read.
+
+  :param db_path: A file path.
+  :param show_ids: A list of show ids, or None for all shows.
+  :param since_time: Timedelta in-movie time to skip earlier snarks.
+  :param until_time: Timedelta in-movie time to skip later snarks.
+  :param users: A list of users (case-insensitive), or None for all users.
+  :param since_date: Datetime to skip earlier snarks.
+  :param until_date: Datetime to skip later snarks.
+  :return: A list of snark dicts, ordered by show and then as exported.
+  :raises: CompileSubsException
+  """
+  clauses = []
+  params = []
+  if (show_ids):
+    clauses.append("show IN (%s)" % ", ".join(["?"] * len(show_ids)))
+    params.extend([_text(x) for x in show_ids])
+  if (users):
+    clauses.append("user IN (%s)" % ", ".join(["?"] * len(users)))
+    params.extend([_text(x) for x in users])
+  for (column, op, value) in [("time", ">=", since_time), ("time", "<=", until_time)]:
+    if (value is not None):
+      clauses.append("%s %s ?" % (column, op))
+      params.append(snarkarchive.delta_us(value))
+  for (column, op, value) in [("date", ">=", since_date), ("date", "<=", until_date)]:
+    if (value is not None):
+      clauses.append("%s %s ?" % (column, op))
+      params.append(snarkarchive.delta_us(value - EPOCH))
+
+  sql = "SELECT date, time, user, msg, user_url, msg_url, color, extras FROM snarks"
+  if (clauses): sql += " WHERE "+ " AND ".join(clauses)
+  sql += " ORDER BY show, seq"
+
+  conn = connect(db_path)
+  try:
+    with common.gc_paused():
+      return _read_rows(conn.execute(sql, params))
+  except (sqlite3.Error) as err:
+    raise common.CompileSubsException("Could not read snarks from %s: %s" % (db_path, str(err)))
+  finally:
+    conn.close()
+
+def _read_rows(cursor):
+  color_cache = {"null":None}
+  key_cache = {}  # JSON's unicode names -> str, where possible.
+  snarks = []
+
+  for (date, time, user, msg, user_url, msg_url, color, extras) in cursor:
+    snark = {}
+    if (date is not None): snark["date"] = EPOCH + snarkarchive.us_delta(date)
+    if (time is not None): snark["time"] = snarkarchive.us_delta(time)
+    if (user is not None): snark["user"] = user
+    if (msg is not None): snark["msg"] = msg
+    if (user_url is not None): snark["user_url"] = user_url
+    if (msg_url is not None): snark["msg_url"] = msg_url
+    if (color is not None):
+      if (color not in color_cache):
+        color_cache[color] = tuple(json.loads(color))
+      snark["color"] = color_cache[color]
+    if (extras is not None):
+      for (key, (kind, value)) in json.loads(extras).iteritems():
+        if (key not in key_cache):
+          try:
+            key_cache[key] = str(key)  # JSON made it unicode.
+          except (UnicodeEncodeError) as err:
+            key_cache[key] = key
+        snark[key_cache[key]] = _decode_extra(kind, value)
+    snarks.append(snark)
+
+  return snarks
@@ -0,0 +1,429 @@
+import array
+from datetime import datetime, timedelta
+
+from lib import common
+
+
+# Reference point for storing dates as integer seconds.
+EPOCH = datetime(1970, 1, 1)
+
+# Column value for a row that lacks that attribute.
+# (The smallest value of a 32bit "l" array, the narrowest platform.)
+MISSING = -2**31
+
+
+class _Nothing(object):
+  """Placeholder for a row that lacks an attribute.
+  It remains a singleton when copied or pickled.
+  """
+  def __reduce__(self):
+    return "_NOTHING"
+
+  def __repr__(self):
+    return "_NOTHING"
+
+_NOTHING = _Nothing()
+
+
+class SnarkTable(object):
+  """A memory-efficient, column-oriented list of snarks.
+
+  Common attributes are stored in compact arrays, instead of
+  a dict per snark:
+    "date": Integer seconds since EPOCH.
+    "time", "_globally fudged time": Integer seconds.
+    "user", "color": Codes into a dictionary of unique values.
+    "msg": Strings, with duplicates shared.
+    "_ignored": Bytes (-1/0/1).
+  Any other attribute (such as "user_url" or "msg_url") gets
+  a sparse column of its own.
+
+  Values that a compact column can't hold exactly (e.g., a
+  date with microseconds) are quietly kept in a sparse column
+  instead, so nothing is lost.
+
+  Indexing or iterating yields SnarkRow views that act like
+  the snark dicts parsers and exporters are used to. A view
+  refers to a position in the table, so reordering the table
+  (as with "snarks[:] = sorted(snarks, ...)") re-points any
+  views held from before.
+  """
+
+  def __init__(self, snarks=None):
+    """Constructor.
+
+    :param snarks: An optional iterable of snark dicts (or SnarkRows) to append.
+    """
+    object.__init__(self)
+    self._length = 0
+    self._dates = array.array("l")
+    self._times = array.array("l")
+    self._global_times = array.array("l")
+    self._user_codes = array.array("l")
+    self._users = []
+    self._user_lookup = {}
+    self._color_codes = array.array("l")
+    self._colors = []
+    self._color_lookup = {}
+    self._ignored = array.array("b")
+    self._msgs = []
+    self._string_pool = {}
+    self._extra_columns = {}
+
+    if (snarks is not None):
+      for snark in snarks:
+        self.append(snark)
+
+  def __len__(self):
+    return self._length
+
+  def __iter__(self):
+    for i in xrange(self._length):
+      yield SnarkRow(self, i)
+
+  def __getitem__(self, index):
+    if (isinstance(index, slice)):
+      return self._take(range(*index.indices(self._length)))
+
+    return SnarkRow(self, self._check_index(index))
+
+  def __setitem__(self, index, value):
+    if (isinstance(index, slice)):
+      indices = range(*index.indices(self._length))
+      if (len(indices) != self._length):
+        raise NotImplementedError("%s only supports replacing all rows via slices." % self.__class__.__name__)
+      self._replace_all(value)
+    else:
+      index = self._check_index(index)
+      snark = dict(value)
+      for key in SnarkRow(self, index).keys():
+        self._del_value(index, key)
+      for (key, v) in snark.items():
+        self._set_value(index, key, v)
+
+  def __delitem__(self, index):
+    if (isinstance(index, slice)):
+      doomed = set(range(*index.indices(self._length)))
+    else:
+      doomed = set([self._check_index(index)])
+    self._assign_from(self._take([i for i in xrange(self._length) if (i not in doomed)]))
+
+  def __repr__(self):
+    return "<%s: %d snarks>" % (self.__class__.__name__, self._length)
+
+  def append(self, snark):
+    """Adds a snark dict (or a SnarkRow) to the end."""
+    self._dates.append(MISSING)
+    self._times.append(MISSING)
+    self._global_times.append(MISSING)
+    self._user_codes.append(MISSING)
+    self._color_codes.append(MISSING)
+    self._ignored.append(-1)
+    self._msgs.append(_NOTHING)
+    for column in self._extra_columns.values():
+      column.append(_NOTHING)
+    self._length += 1
+
+    index = self._length - 1
+    for key in snark.keys():
+      self._set_value(index, key, snark[key])
+
+  def extend(self, snarks):
+    """Adds snark dicts (or SnarkRows) to the end."""
+    for snark in snarks:
+      self.append(snark)
+
+  def to_dicts(self):
+    """Returns a list of ordinary snark dicts."""
+    return [row.copy() for row in self]
+
+  def get_seconds(self, key):
+    """Returns a compact column of integer seconds, for bulk math.
+
+    :param key: "date" (seconds since EPOCH), "time", or "_globally fudged time".
+    :return: An array, or None if any row lacks a compact value.
+    """
+    column = self._seconds_column(key)
+    if (key in self._extra_columns or MISSING in column): return None
+    return column
+
+  def set_seconds(self, key, seconds):
+    """Sets every row's value in a column of integer seconds.
+
+    :param key: "date" (seconds since EPOCH), "time", or "_globally fudged time".
+    :param seconds: A sequence of ints, one per row.
+    """
+    column = self._seconds_column(key)
+    if (len(seconds) != self._length):
+      raise ValueError("Expected %d values for %s, got %d." % (self._length, key, len(seconds)))
+    values = array.array("l", seconds)
+    if (MISSING in values):
+      raise ValueError("Value out of range for %s." % key)
+    column[:] = values
+    self._extra_columns.pop(key, None)
+
+  def get_codes(self, key):
+    """Returns a compact column of dictionary codes, for bulk comparisons.
+
+    :param key: "user" or "color".
+    :return: A tuple: an array of codes, and a dict of values to codes. Or None if any row lacks a compact value.
+    """
+    if (key == "user"):
+      column, lookup = self._user_codes, self._user_lookup
+    elif (key == "color"):
+      column, lookup = self._color_codes, self._color_lookup
+    else:
+      raise KeyError(key)
+    if (key in self._extra_columns or MISSING in column): return None
+    return (column, lookup)
+
+  def _seconds_column(self, key):
+    """Returns the array behind a column of integer seconds, or raises KeyError."""
+    if (key == "date"): return self._dates
+    elif (key == "time"): return self._times
+    elif (key == "_globally fudged time"): return self._global_times
+    raise KeyError(key)
+
+  def _check_index(self, index):
+    """Returns a non-negative row index, or raises IndexError."""
+    if (index < 0): index += self._length
+    if (index < 0 or index >= self._length):
+      raise IndexError("%s index out of range." % self.__class__.__name__)
+    return index
+
+  def _replace_all(self, snarks):
+    """Replaces every row, typically with a reordered or filtered list of this table's own rows."""
+    snarks = list(snarks)
+    if (all(isinstance(x, SnarkRow) and x._table is self for x in snarks)):
+      self._assign_from(self._take([x._index for x in snarks]))
+    else:
+      self._assign_from(SnarkTable(snarks))
+
+  def _take(self, indices):
+    """Returns a new table with copies of the given rows, in that order."""
+    result = SnarkTable()
+    result._length = len(indices)
+    result._dates = array.array("l", [self._dates[i] for i in indices])
+    result._times = array.array("l", [self._times[i] for i in indices])
+    result._global_times = array.array("l", [self._global_times[i] for i in indices])
+    result._user_codes = array.array("l", [self._user_codes[i] for i in indices])
+    result._users = self._users[:]
+    result._user_lookup = self._user_lookup.copy()
+    result._color_codes = array.array("l", [self._color_codes[i] for i in indices])
+    result._colors = self._colors[:]
+    result._color_lookup = self._color_lookup.copy()
+    result._ignored = array.array("b", [self._ignored[i] for i in indices])
+    result._msgs = [self._msgs[i] for i in indices]
+    result._string_pool = self._string_pool  # Only ever grows, so it can be shared.
+    for (key, column) in self._extra_columns.items():
+      result._extra_columns[key] = [column[i] for i in indices]
+    return result
+
+  def _assign_from(self, other):
+    """Adopts another table's columns as this one's."""
+    self.__dict__.update(other.__dict__)
+
+  def _pooled(self, value):
+    """Returns a shared copy of an equal string, if one was seen before."""
+    if (isinstance(value, basestring)):
+      return self._string_pool.setdefault(value, value)
+    return value
+
+  def _encode(self, value, values, lookup):
+    """Returns a dictionary code for a hashable value, adding it if new."""
+    code = lookup.get(value, None)
+    if (code is None):
+      code = len(values)
+      values.append(value)
+      lookup[value] = code
+    return code
+
+  def _get_value(self, index, key):
+    """Returns a row's value, or raises KeyError."""
+    n = MISSING
+    if (key == "date"):
+      n = self._dates[index]
+      if (n != MISSING): return EPOCH + timedelta(seconds=n)
+    elif (key == "time"):
+      n = self._times[index]
+      if (n != MISSING): return timedelta(seconds=n)
+    elif (key == "_globally fudged time"):
+      n = self._global_times[index]
+      if (n != MISSING): return timedelta(seconds=n)
+    elif (key == "user"):
+      n = self._user_codes[index]
+      if (n != MISSING): return self._users[n]
+    elif (key == "color"):
+      n = self._color_codes[index]
+      if (n != MISSING): return self._colors[n]
+    elif (key == "_ignored"):
+      n = self._ignored[index]
+      if (n != -1): return (n == 1)
+    elif (key == "msg"):
+      n = self._msgs[index]
+      if (n is not _NOTHING): return n
+
+    column = self._extra_columns.get(key, None)
+    if (column is not None and column[index] is not _NOTHING):
+      return column[index]
+    raise KeyError(key)
+
+  def _set_value(self, index, key, value):
+    """Sets a row's value, in a compact column if possible."""
+    stored = False
+    if (key == "date"):
+      seconds = None
+      if (isinstance(value, datetime) and value.tzinfo is None and value.microsecond == 0):
+        delta = value - EPOCH
+        seconds = delta.days*24*3600 + delta.seconds
+      if (seconds is not None and abs(seconds) < -MISSING):
+        self._dates[index] = seconds
+        stored = True
+      else:
+        self._dates[index] = MISSING
+    elif (key in ["time", "_globally fudged time"]):
+      column = (self._times if (key == "time") else self._global_times)
+      if (isinstance(value, timedelta) and value.microseconds == 0 and abs(common.delta_seconds(value)) < -MISSING):
+        column[index] = common.delta_seconds(value)
+        stored = True
+      else:
+        column[index] = MISSING
+    elif (key == "user"):
+      if (isinstance(value, basestring)):
+        self._user_codes[index] = self._encode(value, self._users, self._user_lookup)
+        stored = True
+      else:
+        self._user_codes[index] = MISSING
+    elif (key == "color"):
+      if (value is None or isinstance(value, tuple)):
+        self._color_codes[index] = self._encode(value, self._colors, self._color_lookup)
+        stored = True
+      else:
+        self._color_codes[index] = MISSING
+    elif (key == "_ignored"):
+      if (value is True or value is False):
+        self._ignored[index] = (1 if (value) else 0)
+        stored = True
+      else:
+        self._ignored[index] = -1
+    elif (key == "msg"):
+      self._msgs[index] = self._pooled(value)
+      stored = True
+
+    if (stored):
+      column = self._extra_columns.get(key, None)
+      if (column is not None): column[index] = _NOTHING
+    else:
+      if (key not in self._extra_columns):
+        self._extra_columns[key] = [_NOTHING] * self._length
+      self._extra_columns[key][index] = self._pooled(value)
+
+  def _del_value(self, index, key):
+    """Removes a row's value, or raises KeyError."""
+    self._get_value(index, key)  # Raise KeyError if absent.
+
+    if (key == "date"): self._dates[index] = MISSING
+    elif (key == "time"): self._times[index] = MISSING
+    elif (key == "_globally fudged time"): self._global_times[index] = MISSING
+    elif (key == "user"): self._user_codes[index] = MISSING
+    elif (key == "color"): self._color_codes[index] = MISSING
+    elif (key == "_ignored"): self._ignored[index] = -1
+    elif (key == "msg"): self._msgs[index] = _NOTHING
+
+    column = self._extra_columns.get(key, None)
+    if (column is not None): column[index] = _NOTHING
+
+  def _row_keys(self, index):
+    """Returns a list of attribute names present in a row."""
+    result = []
+    for (key, present) in [("user", self._user_codes[index] != MISSING),
+                           ("msg", self._msgs[index] is not _NOTHING),
+                           ("date", self._dates[index] != MISSING),
+                           ("time", self._times[index] != MISSING),
+                           ("_globally fudged time", self._global_times[index] != MISSING),
+                           ("color", self._color_codes[index] != MISSING),
+                           ("_ignored", self._ignored[index] != -1)]:
+      if (present): result.append(key)
+    for (key, column) in self._extra_columns.items():
+      if (column[index] is not _NOTHING and key not in result):
+        result.append(key)
+    return result
+
+
+class SnarkRow(object):
+  """A dict-like view of one row in a SnarkTable."""
+  __slots__ = ["_table", "_index"]
+
+  def __init__(self, table, index):
+    object.__init__(self)
+    self._table = table
+    self._index = index
+
+  def __getitem__(self, key):
+    return self._table._get_value(self._index, key)
+
+  def __setitem__(self, key, value):
+    self._table._set_value(self._index, key, value)
+
+  def __delitem__(self, key):
+    self._table._del_value(self._index, key)
+
+  def __contains__(self, key):
+    try:
+      self._table._get_value(self._index, key)
+      return True
+    except (KeyError) as err:
+      return False
+
+  has_key = __contains__
+
+  def __iter__(self):
+    return iter(self.keys())
+
+  def __len__(self):
+    return len(self.keys())
+
+  def __eq__(self, other):
+    if (isinstance(other, (SnarkRow, dict))):
+      return (self.copy() == dict(other))
+    return NotImplemented
+
+  def __ne__(self, other):
+    result = self.__eq__(other)
+    if (result is NotImplemented): return result
+    return (not result)
+
+  def __repr__(self):
+    return repr(self.copy())
+
+  def get(self, key, default=None):
+    try:
+      return self._table._get_value(self._index, key)
+    except (KeyError) as err:
+      return default
+
+  def pop(self, key, *default):
+    try:
+      value = self._table._get_value(self._index, key)
+    except (KeyError) as err:
+      if (default): return default[0]
+      raise
+    self._table._del_value(self._index, key)
+    return value
+
+  def keys(self):
+    return self._table._row_keys(self._index)
+
+  def values(self):
+    return [self[k] for k in self.keys()]
+
+  def items(self):
+    return [(k, self[k]) for k in self.keys()]
+
+  def update(self, other):
+    for (k, v) in dict(other).items():
+      self[k] = v
+
+  def copy(self):
+    """Returns an ordinary dict with this row's attributes."""
+    return dict(self.items())
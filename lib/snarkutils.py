@@ -1,493 +1,1065 @@
-import contextlib
-from datetime import datetime, timedelta
-import pkgutil
-import random
-import re
-import shutil
-import string
-import StringIO
-
-from lib import common
-from lib import global_config
-
-
-random.seed()
-
-
-color_library = [{"use":True, "hex":"FFFFFF", "name":"white"},
-                 {"use":True, "hex":"808080", "name":"boynton-gray"},
-                 {"use":True, "hex":"BBBBBB", "name":"gray"},
-                 {"use":True, "hex":"CC8080", "name":"softened-pink"},
-                 {"use":True, "hex":"DDBBBB", "name":"pale-softened-pink"},
-                 {"use":True, "hex":"803E75", "name":"kelly-strong-purple"},
-                 {"use":True, "hex":"73579A", "name":"lighter-strong-violet"},
-                 {"use":True, "hex":"9579BC", "name":"lighterer-strong-violet"},
-                 {"use":True, "hex":"A589CC", "name":"lightererer-strong-violet"},
-                 {"use":True, "hex":"CC00CC", "name":"softened-magenta"},
-                 {"use":True, "hex":"00538A", "name":"kelly-strong-blue"},
-                 {"use":True, "hex":"408080", "name":"blue-green"},
-                 {"use":True, "hex":"A6BDD7", "name":"kelly-very-light-blue"},
-                 {"use":True, "hex":"795335", "name":"lighter-yellowish-brown"},
-                 {"use":True, "hex":"997355", "name":"lighterer-yellowish-brown"},
-                 {"use":True, "hex":"CC8000", "name":"softened-orange"},
-                 {"use":True, "hex":"CEA262", "name":"kelly-grayish-yellow"},
-                 {"use":True, "hex":"DEBC4A", "name":"lighter-goldenrod"},
-                 {"use":True, "hex":"FECC5A", "name":"softened-yellow"},
-                 {"use":True, "hex":"FFB300", "name":"kelly-vivid-yellow"},
-                 {"use":True, "hex":"00CC00", "name":"softened-green"},
-                 {"use":True, "hex":"007D34", "name":"kelly-vivid-green"},
-                 {"use":True, "hex":"409565", "name":"kelly-pale-green"},
-                 {"use":True, "hex":"77BB88", "name":"light-green"},
-                 {"use":True, "hex":"C0C060", "name":"olive"},
-                 {"use":True, "hex":"DEDE66", "name":"yellow"}]
-
-
-def config_remove_user_fudge(config, user, bookmark_delta):
-  """Removes per-user fudges at a specific time from a config object.
-
-  :param config: A config to modify.
-  :param user: The user to fudge.
-  :param bookmark_delta: The first timedelta of the pair in config.py.
-  """
-  fudge_list = config.fudge_users[user]
-  fudge_list[:] = [x for x in fudge_list if x[0] != bookmark_delta]
-
-def config_add_user_fudge(config, user, fudge_tuple):
-  """Adds a per-user fudge to a config object.
-  Any existing fudge at that time will be removed.
-  Streaks of identical fudge amounts will be
-  consolidated.
-
-  :param config: A config to modify.
-  :param user: The user to fudge.
-  :param fudge_tuple: (bookmark, amount) timedeltas as in config.py.
-  """
-  fudge_list = None
-  if (user not in config.fudge_users):
-    config.fudge_users[user] = []
-  fudge_list = config.fudge_users[user]
-
-  # Remove any existing fudge at that time.
-  fudge_list[:] = [x for x in fudge_list if x[0] != fudge_tuple[0]]
-  fudge_list.append(fudge_tuple)
-  fudge_list[:] = sorted(fudge_list, key=lambda k: k[0])
-
-  # Consolidate streaks of identical fudge amounts.
-  for i in range(len(fudge_list)-1, 0, -1):
-    if (fudge_list[i][1] == fudge_list[i-1][1]):
-      del fudge_list[i]
-
-
-def config_repr(config):
-  """Returns a pretty repr string of a config."""
-  config_template = None
-  config_strings = {}
-
-  with open("./share/config_template.txt", "r") as f:
-    config_template = f.read()
-
-  # Strings. (repr() is safe for int, boolean and None)
-  for x in ["parser_name", "exporter_name", "src_path", "dest_path", "first_msg", "color_enabled"]:
-    config_strings[x] = repr(getattr(config, x))
-
-  # String lists.
-  for x in ["ignore_users", "ignore_regexes"]:
-    config_strings[x] = repr(getattr(config, x))
-
-  # Timedeltas.
-  for x in ["fudge_time", "end_time", "show_time"]:
-    config_strings[x] = delta_repr(getattr(config, x))
-
-  results = ["fudge_users = {}"]
-  for user in config.fudge_users:
-    fudge_strs = []
-    for fudge_tuple in config.fudge_users[user]:
-      fudge_strs.append("(%s)" % ", ".join(delta_repr(x) for x in fudge_tuple))
-    if (len(fudge_strs) == 0): continue
-    results.append("fudge_users[\"%s\"] = [%s]" % (user, (",\n" + (" "*(19+len(user)))).join(fudge_strs)))
-  config_strings["fudge_users_block"] = "\n".join(results)
-
-  results = ["parser_options = {}"]
-  for k in sorted(config.parser_options.keys()):
-    option_value = config.parser_options[k]
-    if (isinstance(option_value, timedelta)):
-      results.append("parser_options[%s] = %s" % (repr(k), delta_repr(option_value)))
-    elif (isinstance(option_value, datetime)):
-      results.append("parser_options[%s] = %s" % (repr(k), datetime_repr(option_value)))
-    else:
-      results.append("parser_options[%s] = %s" % (repr(k), repr(option_value)))
-  config_strings["parser_options_block"] = "\n".join(results)
-
-  results = ["exporter_options = {}"]
-  for k in sorted(config.exporter_options.keys()):
-    option_value = config.exporter_options[k]
-    if (isinstance(option_value, timedelta)):
-      results.append("exporter_options[%s] = %s" % (repr(k), delta_repr(option_value)))
-    elif (isinstance(option_value, datetime)):
-      results.append("exporter_options[%s] = %s" % (repr(k), datetime_repr(option_value)))
-    else:
-      results.append("exporter_options[%s] = %s" % (repr(k), repr(option_value)))
-  config_strings["exporter_options_block"] = "\n".join(results)
-
-  return string.Template(config_template).substitute(config_strings)
-
-def delta_repr(delta):
-  """Returns a pretty repr string of a timedelta.
-  If delta is None, repr(None) will be returned.
-  """
-  if (delta is None): return repr(None)
-
-  minutes, seconds = divmod(common.delta_seconds(delta), 60)
-
-  return "timedelta(minutes=%d, seconds=%d)" % (minutes, seconds)
-
-def datetime_repr(dt):
-  """Returns a pretty repr string of a datetime."""
-  return "datetime(%d, %d, %d, %d, %d)" % (dt.year, dt.month, dt.day, dt.hour, dt.minute)
-
-
-def get_parser(parser_name):
-  """Returns a parser by name."""
-  parsers_pkg = __import__("lib.parsers", globals(), locals(), [parser_name])
-  parser_mod = getattr(parsers_pkg, parser_name)
-  return parser_mod
-
-def get_exporter(exporter_name):
-  """Returns an exporter by name."""
-  exporters_pkg = __import__("lib.exporters", globals(), locals(), [exporter_name])
-  exporter_mod = getattr(exporters_pkg, exporter_name)
-  return exporter_mod
-
-def get_subsystem(subsystem_name):
-  """Returns a subsystem by name."""
-  subsystems_pkg = __import__("lib.subsystems", globals(), locals(), [subsystem_name])
-  subsystem_mod = getattr(subsystems_pkg, subsystem_name)
-  return subsystem_mod
-
-def init_subsystems(subsystem_names, keep_alive_func=None, sleep_func=None):
-  """Calls init() on each in a list of subsystems.
-
-  :param keep_alive_func: Optional replacement to get an abort boolean.
-  :param sleep_func: Optional replacement to sleep N seconds.
-  :raises: CompileSubsException, afterward, if any failed.
-  """
-  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
-  if (sleep_func is None): sleep_func = global_config.nap
-
-  failures = []
-  for s in subsystem_names:
-    if (keep_alive_func() is False): break
-    ready = False
-    try:
-      ready = get_subsystem(s).init(keep_alive_func=keep_alive_func, sleep_func=sleep_func)
-    except (Exception) as err:
-      logging.exception("Subsystem import or init failed.")
-    if (ready is False):
-      failures.append(s)
-
-  if (len(failures) > 0):
-    raise common.CompileSubsException("Failed to initialize required subsystems: %s." % (", ".join(failures)))
-
-
-def parse_snarks(config, keep_alive_func=None, sleep_func=None):
-  """Returns a list of snark dicts{user,msg,date} from a parser.
-  More keys might be present, depending on the parser.
-  These snarks do NOT have a "time" key.
-
-  If the parser requires any subsystems, they will be init'd.
-
-  :param keep_alive_func: Optional replacement to get an abort boolean.
-  :param sleep_func: Optional replacement to sleep N seconds.
-  :raises: ParserError, CompileSubsException
-  """
-  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
-  if (sleep_func is None): sleep_func = global_config.nap
-
-  parser_mod = get_parser(config.parser_name)
-  init_subsystems(parser_mod.required_subsystems, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
-
-  if (keep_alive_func() is False):
-    raise common.ParserError("Parsing was interrupted.")
-
-  snarks = parser_mod.fetch_snarks(config.src_path, config.first_msg, config.parser_options, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
-
-  return snarks
-
-
-def gui_preprocess_snarks(config, snarks):
-  """Performs initial processing of recently parsed snarks.
-
-  No early/late pruning takes place. The result will be
-  suitable for gui_fudge_users().
-
-  A "_globally fudged time" key will be added, representing
-  an in-movie offset from the first snark's "date", plus
-  any global fudging, but NOT user fudging. A "time" key
-  is also added with a similar value, but that may be
-  subject to user fudging later.
-
-  A boolean "_ignored" key will be added: True for any
-  snark that's from an ignored user or whose msg includes an
-  ignored regex, False otherwise.
-
-  No "color" is added.
-
-  This will modify the snarks list in-place.
-  """
-  # Sort the msgs by their real-world date.
-  snarks[:] = sorted(snarks, key=lambda k: k["date"])
-
-  # Add in-movie time info to them.
-  for snark in snarks:
-    snark["_globally fudged time"] = snark["date"] - snarks[0]["date"] + config.fudge_time
-    snark["time"] = snark["date"] - snarks[0]["date"] + config.fudge_time
-
-  # Sort the msgs by their in-movie time.
-  snarks[:] = sorted(snarks, key=lambda k: k["time"])
-
-  # Ignore users and regexes.
-  for snark in snarks:
-    if (snark["user"] in config.ignore_users):
-      snark["_ignored"] = True
-    else:
-      snark["_ignored"] = False
-
-      for ptn in config.ignore_regexes:
-        if (re.search(ptn, snark["msg"])):
-          snark["_ignored"] = True
-          break
-
-
-def gui_fudge_users(config, snarks):
-  """Sets snarks' "time", including global and user fudging.
-
-  If the "_globally fudged time" key is present,
-  some math will be bypassed. Otherwise, it will
-  be created using the offset since the first
-  snark's "date" and the config's global fudge.
-
-  That value will then be added to the config's
-  per-user fudges to set "time".
-
-  This will modify the snarks list in-place.
-  """
-  # Sort the msgs by their real-world date (to obtain the first snark).
-  snarks[:] = sorted(snarks, key=lambda k: k["date"])
-
-  for snark in snarks:
-    # Revert each snark's time to its globally fudged time.
-    if ("_globally fudged time" not in snark):
-      snark["_globally fudged time"] = snark["date"] - snarks[0]["date"] + config.fudge_time
-    snark["time"] = snark["_globally fudged time"]
-
-    # Search backward through a user's delays for one in the recent past.
-    if (snark["user"] in config.fudge_users):
-      for (bookmark, fudge_value) in reversed(config.fudge_users[snark["user"]]):
-        if (snark["time"] >= bookmark):
-          snark["time"] += fudge_value
-          break
-
-  # Sort the msgs by their in-movie time.
-  snarks[:] = sorted(snarks, key=lambda k: k["time"])
-
-
-def gui_postprocess_snarks(config, snarks):
-  """Performs remaining processing of snarks.
-  Any snark that's early or late will be removed.
-  Any snark with an "_ignored" key that's True
-  will be removed.
-
-  The result will be suitable for export_snarks().
-
-  If enabled in config, a "color" key is added,
-  an RGB float tuple (0.0-1.0), assigned randomly.
-
-  This will modify the snarks list in-place.
-  """
-  # Omit ignored snarks.
-  snarks[:] = [s for s in snarks if (not ("_ignored" in s and s["_ignored"]))]
-
-  # Omit snarks that got shifted into negative times.
-  snarks[:] = [x for x in snarks if (abs(x["time"]) == x["time"])]
-
-  # Omit snarks beyond the end time, if set.
-  if (config.end_time is not None):
-    snarks[:] = [x for x in snarks if (x["time"] <= config.end_time)]
-
-  # Sort the msgs by their in-movie time.
-  snarks[:] = sorted(snarks, key=lambda k: k["time"])
-
-  # Assign unique colors, and paint each snark.
-  if (config.color_enabled == "random"):
-    unique_users = set(x["user"] for x in snarks)
-    unique_colors = get_random_colors(len(unique_users))
-    #write_palette_preview("./preview.html", unique_colors)
-
-    color_users = dict(zip(unique_users, unique_colors))
-    for snark in snarks:
-      snark["color"] = color_users[snark["user"]]
-  elif (config.color_enabled == "no"):
-    for snark in snarks:
-      if ("color" in snark): del snark["color"]
-
-
-def process_snarks(config, snarks):
-  """Adds info to, and fudges, a list of recently parsed snarks.
-  Any snark that's early, late, or from an ignored user or regex
-  will be removed. The result will be suitable for export_snarks().
-
-  A "time" key will be added, representing an in-movie offset
-  from the first snark's "date", plus any global fudging,
-  plus any user fudging.
-
-  If enabled in config, "color" is added, an RGB float tuple
-  (0.0-1.0), assigned randomly.
-
-  This will modify the snarks list in-place.
-  """
-  # Sort the msgs by their real-world date.
-  snarks[:] = sorted(snarks, key=lambda k: k["date"])
-
-  # Add in-movie time info to them.
-  for snark in snarks:
-    snark["time"] = snark["date"] - snarks[0]["date"] + config.fudge_time
-
-    # Search backward through a user's delays for one in the recent past.
-    if (snark["user"] in config.fudge_users):
-      for (bookmark, fudge_value) in reversed(config.fudge_users[snark["user"]]):
-        if (snark["time"] >= bookmark):
-          snark["time"] += fudge_value
-          break
-
-  # Ignore users and regexes.
-  for snark in snarks:
-    if (snark["user"] in config.ignore_users):
-      snark["_ignored"] = True
-    else:
-      snark["_ignored"] = False
-
-      for ptn in config.ignore_regexes:
-        if (re.search(ptn, snark["msg"])):
-          snark["_ignored"] = True
-          break
-
-  # Omit ignored snarks.
-  snarks[:] = [s for s in snarks if (not ("_ignored" in s and s["_ignored"]))]
-
-  # Omit snarks that got shifted into negative times.
-  snarks[:] = [x for x in snarks if (abs(x["time"]) == x["time"])]
-
-  # Omit snarks beyond the end time, if set.
-  if (config.end_time is not None):
-    snarks[:] = [x for x in snarks if (x["time"] <= config.end_time)]
-
-  # Sort the msgs by their in-movie time.
-  snarks[:] = sorted(snarks, key=lambda k: k["time"])
-
-  # Assign unique colors, and paint each snark.
-  if (config.color_enabled == "random"):
-    unique_users = set(x["user"] for x in snarks)
-    unique_colors = get_random_colors(len(unique_users))
-    #write_palette_preview("./preview.html", unique_colors)
-
-    color_users = dict(zip(unique_users, unique_colors))
-    for snark in snarks:
-      snark["color"] = color_users[snark["user"]]
-  elif (config.color_enabled == "no"):
-    for snark in snarks:
-      if ("color" in snark): del snark["color"]
-
-
-def export_snarks(config, snarks, keep_alive_func=None, sleep_func=None):
-  """Sends a list of processed snark dicts to an exporter.
-  The snarks must, at minimum, contain {user,msg,time}.
-
-  Whatever the exporter writes to its dest_file arg will
-  be buffered. Afterward, if the exporter's uses_dest_file
-  attribute is True, that buffer will be written to
-  an actual file.
-
-  If the exporter requires any subsystems, they will be init'd.
-
-  :raises: ExporterError, CompileSubsException
-  """
-  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
-  if (sleep_func is None): sleep_func = global_config.nap
-
-  exporter_mod = get_exporter(config.exporter_name)
-  init_subsystems(exporter_mod.required_subsystems, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
-
-  if (keep_alive_func() is False):
-    raise common.ExporterError("Exporting was interrupted.")
-
-  with contextlib.closing(StringIO.StringIO()) as buf:
-    exporter_mod.write_snarks(buf, snarks, config.show_time, config.exporter_options, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
-    buf.seek(0)
-
-    if (keep_alive_func() is False):
-      raise common.ExporterError("Exporting was interrupted.")
-
-    if (config.dest_path and exporter_mod.uses_dest_file):
-      with open(config.dest_path, "wb") as dest_file:
-        shutil.copyfileobj(buf, dest_file)
-
-
-def list_parsers():
-  """Returns a list of parser module names."""
-  import lib.parsers
-  result = [name for (module_loader, name, ispkg)
-            in pkgutil.iter_modules(path=lib.parsers.__path__)
-            if (not ispkg and name != "example_stub")]
-  return result
-
-def list_exporters():
-  """Returns a list of exporter module names."""
-  import lib.exporters
-  result = [name for (module_loader, name, ispkg)
-            in pkgutil.iter_modules(path=lib.exporters.__path__)
-            if (not ispkg and name != "example_stub")]
-  return result
-
-
-def set_color_library(new_library):
-  """Replaces the current color library."""
-  global color_library
-  color_library = new_library
-
-def get_color_library():
-  """Returns a copy of the current color library."""
-  global color_library
-  return color_library[:]
-
-def get_random_colors(count):
-  """Gets a list of arbitrary colors.
-   I had a fancy HSV randomizer with the colorsys module,
-   but it was hit and miss. So now there's a prefab list.
-     http://jsfiddle.net/k8NC2/1/
-     http://stackoverflow.com/questions/470690/how-to-automatically-generate-n-distinct-colors
-
-  :param count: The number of colors needed (too many, and you'll get white).
-  :return: A list of RGB float tuples (0.0-1.0).
-  """
-  colors = [x for x in get_color_library() if (x["use"])]
-  random.shuffle(colors)
-  colors *= (count // len(colors)) + 1
-
-  result = [common.hex_to_rgb(x["hex"]) for x in colors[:count]]
-
-  return result
-
-
-def write_palette_preview(path, unique_colors):
-  """Dumps colors to a sanity-preserving html file for eyeballing.
-  A relic from debugging random palettes.
-
-  :param path: A file path to write to.
-  :param unique_colors: A list of RGB float tuples.
-  """
-  out_file = open(path, 'w')
-  out_file.write("<html><body>\n");
-  for color in unique_colors:
-    out_file.write("<font color=\"#%s\"><b>#########</b></font><br />\n" % (common.rgb_to_hex(color)));
-  out_file.write("</body></html>");
-  out_file.close()
+import bisect
+import contextlib
+from datetime import datetime, timedelta
+import heapq
+import itertools
+import logging
+import operator
+import pkgutil
+import random
+import re
+import string
+import StringIO
+import threading
+
+from lib import common
+from lib import compression
+from lib import global_config
+from lib import instrumentation
+from lib import parsecache
+from lib import vectorized
+
+
+random.seed()
+
+# Bytes to buffer between writes to an exporter's dest file.
+dest_buffer_size = 1024*1024
+
+
+color_library = [{"use":True, "hex":"FFFFFF", "name":"white"},
+                 {"use":True, "hex":"808080", "name":"boynton-gray"},
+                 {"use":True, "hex":"BBBBBB", "name":"gray"},
+                 {"use":True, "hex":"CC8080", "name":"softened-pink"},
+                 {"use":True, "hex":"DDBBBB", "name":"pale-softened-pink"},
+                 {"use":True, "hex":"803E75", "name":"kelly-strong-purple"},
+                 {"use":True, "hex":"73579A", "name":"lighter-strong-violet"},
+                 {"use":True, "hex":"9579BC", "name":"lighterer-strong-violet"},
+                 {"use":True, "hex":"A589CC", "name":"lightererer-strong-violet"},
+                 {"use":True, "hex":"CC00CC", "name":"softened-magenta"},
+                 {"use":True, "hex":"00538A", "name":"kelly-strong-blue"},
+                 {"use":True, "hex":"408080", "name":"blue-green"},
+                 {"use":True, "hex":"A6BDD7", "name":"kelly-very-light-blue"},
+                 {"use":True, "hex":"795335", "name":"lighter-yellowish-brown"},
+                 {"use":True, "hex":"997355", "name":"lighterer-yellowish-brown"},
+                 {"use":True, "hex":"CC8000", "name":"softened-orange"},
+                 {"use":True, "hex":"CEA262", "name":"kelly-grayish-yellow"},
+                 {"use":True, "hex":"DEBC4A", "name":"lighter-goldenrod"},
+                 {"use":True, "hex":"FECC5A", "name":"softened-yellow"},
+                 {"use":True, "hex":"FFB300", "name":"kelly-vivid-yellow"},
+                 {"use":True, "hex":"00CC00", "name":"softened-green"},
+                 {"use":True, "hex":"007D34", "name":"kelly-vivid-green"},
+                 {"use":True, "hex":"409565", "name":"kelly-pale-green"},
+                 {"use":True, "hex":"77BB88", "name":"light-green"},
+                 {"use":True, "hex":"C0C060", "name":"olive"},
+                 {"use":True, "hex":"DEDE66", "name":"yellow"}]
+
+
+def config_remove_user_fudge(config, user, bookmark_delta):
+  """Removes per-user fudges at a specific time from a config object.
+
+  :param config: A config to modify.
+  :param user: The user to fudge.
+  :param bookmark_delta: The first timedelta of the pair in config.py.
+  """
+  fudge_list = config.fudge_users[user]
+  fudge_list[:] = [x for x in fudge_list if x[0] != bookmark_delta]
+  invalidate_fudge_index(config)
+
+def config_add_user_fudge(config, user, fudge_tuple):
+  """Adds a per-user fudge to a config object.
+  Any existing fudge at that time will be removed.
+  Streaks of identical fudge amounts will be
+  consolidated.
+
+  :param config: A config to modify.
+  :param user: The user to fudge.
+  :param fudge_tuple: (bookmark, amount) timedeltas as in config.py.
+  """
+  fudge_list = None
+  if (user not in config.fudge_users):
+    config.fudge_users[user] = []
+  fudge_list = config.fudge_users[user]
+
+  # Remove any existing fudge at that time.
+  fudge_list[:] = [x for x in fudge_list if x[0] != fudge_tuple[0]]
+  fudge_list.append(fudge_tuple)
+  fudge_list[:] = sorted(fudge_list, key=lambda k: k[0])
+
+  # Consolidate streaks of identical fudge amounts.
+  for i in range(len(fudge_list)-1, 0, -1):
+    if (fudge_list[i][1] == fudge_list[i-1][1]):
+      del fudge_list[i]
+
+  invalidate_fudge_index(config)
+
+
+class FudgeIndex(object):
+  """Per-user fudge lookups, compiled from a config's fudge_users.
+
+  Each user's bookmarks are sorted, so finding the fudge
+  in effect at a given time is a binary search. Results
+  match a backward search through the original list for
+  the latest bookmark that has passed, even if that list
+  wasn't sorted.
+  """
+
+  def __init__(self, fudge_users):
+    """Constructor.
+
+    :param fudge_users: A dict of user strings to lists of (bookmark, amount) timedelta tuples.
+    """
+    object.__init__(self)
+    self._fudge_users = fudge_users
+    self._entries = {}
+
+    for (user, fudge_list) in fudge_users.items():
+      if (not fudge_list): continue
+
+      # For each sorted bookmark, note the amount from the latest
+      # list position among it and all earlier bookmarks.
+      bookmarks = []
+      amounts = []
+      best_position = -1
+      best_amount = None
+      for (position, (bookmark, fudge_value)) in sorted(enumerate(fudge_list), key=lambda x: x[1][0]):
+        if (position > best_position):
+          best_position, best_amount = position, fudge_value
+        bookmarks.append(bookmark)
+        amounts.append(best_amount)
+      self._entries[user] = (bookmarks, amounts)
+
+  def is_current(self, config):
+    """Returns True if this index was built from the config's fudge_users dict."""
+    return (self._fudge_users is config.fudge_users)
+
+  def get_fudge(self, user, global_time, default=None):
+    """Returns the fudge amount in effect for a user at a globally fudged time.
+
+    :param user: A user string.
+    :param global_time: A timedelta, before user fudging.
+    :param default: A value to return if no bookmark has passed.
+    """
+    entry = self._entries.get(user, None)
+    if (entry is None): return default
+
+    i = bisect.bisect_right(entry[0], global_time) - 1
+    if (i < 0): return default
+    return entry[1][i]
+
+  def get_entries(self, user):
+    """Returns a user's sorted bookmarks and the amount in effect after each.
+
+    :return: A tuple of two lists of timedeltas, or None if the user has no fudges.
+    """
+    return self._entries.get(user, None)
+
+  def get_users(self):
+    """Returns a list of users with fudges."""
+    return self._entries.keys()
+
+
+def get_fudge_index(config):
+  """Returns a FudgeIndex for a config, reusing the one built last time if possible.
+
+  Modifying fudge_users lists in-place, except via
+  config_add_user_fudge() or config_remove_user_fudge(),
+  requires a call to invalidate_fudge_index() afterward.
+  Replacing the fudge_users dict entirely does not.
+  """
+  fudge_index = getattr(config, "_fudge_index", None)
+  if (fudge_index is None or not fudge_index.is_current(config)):
+    fudge_index = FudgeIndex(config.fudge_users)
+    config._fudge_index = fudge_index
+  return fudge_index
+
+def invalidate_fudge_index(config):
+  """Discards a config's cached FudgeIndex, so the next lookup rebuilds it."""
+  config._fudge_index = None
+
+
+class FilterEngine(object):
+  """Decides which snarks to ignore, compiled from a config's
+  ignore_users and ignore_regexes.
+
+  Users are checked with a set. Patterns without regex
+  syntax are escaped and joined into one alternation, as
+  are the regexes that can be safely combined (no inline
+  flags or backreferences), so each msg is scanned once
+  or twice rather than once per pattern. Any others are
+  searched individually.
+  """
+
+  # Characters that make a pattern more than a plain substring.
+  _REGEX_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+  def __init__(self, ignore_users, ignore_regexes):
+    """Constructor.
+
+    :param ignore_users: A list of user strings.
+    :param ignore_regexes: A list of regex strings, to search for in msgs.
+    :raises: re.error, if a regex is invalid.
+    """
+    object.__init__(self)
+    self._ignore_users = list(ignore_users)
+    self._ignore_regexes = list(ignore_regexes)
+    self._user_set = set(ignore_users)
+    self._compiled = [(ptn, re.compile(ptn)) for ptn in ignore_regexes]
+
+    literals = []
+    combinable = []
+    self._separate_regexes = []
+    for (ptn, compiled_ptn) in self._compiled:
+      if (self._is_literal(ptn)):
+        literals.append(re.escape(ptn))
+      elif (self._is_combinable(ptn)):
+        combinable.append(ptn)
+      else:
+        self._separate_regexes.append(compiled_ptn)
+
+    self._combined_regexes = [re.compile("|".join(x)) for x in [literals, combinable] if (x)]
+    self._msg_regexes = self._combined_regexes + self._separate_regexes
+
+  def _is_literal(self, ptn):
+    """Returns True if a pattern only matches itself."""
+    return self._REGEX_CHARS.isdisjoint(ptn)
+
+  def _is_combinable(self, ptn):
+    """Returns True if a regex means the same thing as one branch of a larger alternation."""
+    # Inline flags apply to an entire pattern, and group numbers would shift.
+    if (re.search(r"\(\?[iLmsuxP]", ptn)): return False
+    if (re.search(r"\\[1-9]", ptn)): return False
+    return True
+
+  def is_current(self, config):
+    """Returns True if this engine was built from the config's current ignore lists."""
+    return (self._ignore_users == list(config.ignore_users) and self._ignore_regexes == list(config.ignore_regexes))
+
+  def is_ignored(self, snark):
+    """Returns True if a snark is from an ignored user or its msg matches an ignored regex."""
+    if (snark["user"] in self._user_set): return True
+
+    msg = snark["msg"]
+    for compiled_ptn in self._msg_regexes:
+      if (compiled_ptn.search(msg)): return True
+    return False
+
+  def flag(self, snark):
+    """Sets a snark's "_ignored" key.
+
+    :return: The new value of "_ignored".
+    """
+    snark["_ignored"] = self.is_ignored(snark)
+    return snark["_ignored"]
+
+  def explain(self, snark):
+    """Returns the first rule, in config order, that ignores a snark.
+
+    :return: A ("user", user) or ("regex", pattern) tuple, or None.
+    """
+    if (snark["user"] in self._user_set):
+      return ("user", snark["user"])
+    for (ptn, compiled_ptn) in self._compiled:
+      if (compiled_ptn.search(snark["msg"])):
+        return ("regex", ptn)
+    return None
+
+
+def get_filter_engine(config):
+  """Returns a FilterEngine for a config, reusing the one built last time if possible.
+
+  :raises: re.error, if a regex is invalid.
+  """
+  filter_engine = getattr(config, "_filter_engine", None)
+  if (filter_engine is None or not filter_engine.is_current(config)):
+    filter_engine = FilterEngine(config.ignore_users, config.ignore_regexes)
+    config._filter_engine = filter_engine
+  return filter_engine
+
+
+def config_repr(config):
+  """Returns a pretty repr string of a config."""
+  config_template = None
+  config_strings = {}
+
+  with open("./share/config_template.txt", "r") as f:
+    config_template = f.read()
+
+  # Strings. (repr() is safe for int, boolean and None)
+  for x in ["parser_name", "exporter_name", "src_path", "dest_path", "first_msg", "color_enabled"]:
+    config_strings[x] = repr(getattr(config, x))
+
+  # String lists.
+  for x in ["ignore_users", "ignore_regexes"]:
+    config_strings[x] = repr(getattr(config, x))
+
+  # Timedeltas.
+  for x in ["fudge_time", "end_time", "show_time"]:
+    config_strings[x] = delta_repr(getattr(config, x))
+
+  results = ["fudge_users = {}"]
+  for user in config.fudge_users:
+    fudge_strs = []
+    for fudge_tuple in config.fudge_users[user]:
+      fudge_strs.append("(%s)" % ", ".join(delta_repr(x) for x in fudge_tuple))
+    if (len(fudge_strs) == 0): continue
+    results.append("fudge_users[\"%s\"] = [%s]" % (user, (",\n" + (" "*(19+len(user)))).join(fudge_strs)))
+  config_strings["fudge_users_block"] = "\n".join(results)
+
+  results = ["parser_options = {}"]
+  for k in sorted(config.parser_options.keys()):
+    results.append("parser_options[%s] = %s" % (repr(k), option_repr(config.parser_options[k])))
+  config_strings["parser_options_block"] = "\n".join(results)
+
+  results = ["exporter_options = {}"]
+  for k in sorted(config.exporter_options.keys()):
+    results.append("exporter_options[%s] = %s" % (repr(k), option_repr(config.exporter_options[k])))
+  config_strings["exporter_options_block"] = "\n".join(results)
+
+  results = ["export_targets = []"]
+  for target in (getattr(config, "export_targets", None) or []):
+    target_strs = []
+    for k in [x for x in ["exporter_name", "dest_path"] if (x in target)]:
+      target_strs.append("%s:%s" % (repr(k), repr(target.get(k))))
+    if (target.get("exporter_options") is not None):
+      option_strs = ["%s:%s" % (repr(k), option_repr(v)) for (k,v) in sorted(target["exporter_options"].items())]
+      target_strs.append("%s:{%s}" % (repr("exporter_options"), ", ".join(option_strs)))
+    results.append("export_targets.append({%s})" % ", ".join(target_strs))
+  config_strings["export_targets_block"] = "\n".join(results)
+
+  return string.Template(config_template).substitute(config_strings)
+
+def delta_repr(delta):
+  """Returns a pretty repr string of a timedelta.
+  If delta is None, repr(None) will be returned.
+  """
+  if (delta is None): return repr(None)
+
+  minutes, seconds = divmod(common.delta_seconds(delta), 60)
+
+  return "timedelta(minutes=%d, seconds=%d)" % (minutes, seconds)
+
+def option_repr(value):
+  """Returns a pretty repr string of a parser/exporter option value."""
+  if (isinstance(value, timedelta)):
+    return delta_repr(value)
+  elif (isinstance(value, datetime)):
+    return datetime_repr(value)
+  else:
+    return repr(value)
+
+def datetime_repr(dt):
+  """Returns a pretty repr string of a datetime."""
+  return "datetime(%d, %d, %d, %d, %d)" % (dt.year, dt.month, dt.day, dt.hour, dt.minute)
+
+
+def get_parser(parser_name):
+  """Returns a parser by name."""
+  parsers_pkg = __import__("lib.parsers", globals(), locals(), [parser_name])
+  parser_mod = getattr(parsers_pkg, parser_name)
+  return parser_mod
+
+def get_exporter(exporter_name):
+  """Returns an exporter by name."""
+  exporters_pkg = __import__("lib.exporters", globals(), locals(), [exporter_name])
+  exporter_mod = getattr(exporters_pkg, exporter_name)
+  return exporter_mod
+
+def get_subsystem(subsystem_name):
+  """Returns a subsystem by name."""
+  subsystems_pkg = __import__("lib.subsystems", globals(), locals(), [subsystem_name])
+  subsystem_mod = getattr(subsystems_pkg, subsystem_name)
+  return subsystem_mod
+
+def init_subsystems(subsystem_names, keep_alive_func=None, sleep_func=None):
+  """Calls init() on each in a list of subsystems.
+
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :raises: CompileSubsException, afterward, if any failed.
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  failures = []
+  for s in subsystem_names:
+    if (keep_alive_func() is False): break
+    ready = False
+    try:
+      with instrumentation.measure("init_subsystems (%s)" % s):
+        ready = get_subsystem(s).init(keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+    except (Exception) as err:
+      logging.exception("Subsystem import or init failed.")
+    if (ready is False):
+      failures.append(s)
+
+  if (len(failures) > 0):
+    raise common.CompileSubsException("Failed to initialize required subsystems: %s." % (", ".join(failures)))
+
+
+def parse_snarks(config, keep_alive_func=None, sleep_func=None):
+  """Returns a list of snark dicts{user,msg,date} from a parser.
+  More keys might be present, depending on the parser.
+  These snarks do NOT have a "time" key.
+
+  If the parser requires any subsystems, they will be init'd.
+
+  If lib.parsecache is enabled, results are cached, and
+  reused while the source, first_msg and parser options
+  are unchanged.
+
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :raises: ParserError, CompileSubsException
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  with instrumentation.measure("parse_snarks") as stage:
+    parser_mod = get_parser(config.parser_name)
+
+    cache_key = None
+    if (parsecache.enabled):
+      fingerprint = parsecache.get_fingerprint(config.src_path, getattr(parser_mod, "request_headers", None))
+      if (fingerprint is not None):
+        cache_key = parsecache.get_key(config.parser_name, config.src_path, config.first_msg, config.parser_options, fingerprint)
+        with instrumentation.measure("parsecache.load") as cache_stage:
+          snarks = parsecache.load(cache_key)
+          if (snarks is not None): cache_stage.set_snarks_out(len(snarks))
+        if (snarks is not None):
+          logging.info("Using %d cached snarks." % len(snarks))
+          stage.set_snarks_out(len(snarks))
+          return snarks
+
+    init_subsystems(parser_mod.required_subsystems, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+
+    if (keep_alive_func() is False):
+      raise common.ParserError("Parsing was interrupted.")
+
+    with instrumentation.measure("%s.fetch_snarks" % config.parser_name) as fetch_stage:
+      snarks = parser_mod.fetch_snarks(config.src_path, config.first_msg, config.parser_options, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+      fetch_stage.set_snarks_out(len(snarks))
+    stage.set_snarks_out(len(snarks))
+
+    # An interrupted parser may have returned only some snarks.
+    if (cache_key is not None and keep_alive_func() is not False):
+      parsecache.save(cache_key, snarks)
+
+  return snarks
+
+
+def iter_parsed_snarks(config, keep_alive_func=None, sleep_func=None):
+  """Returns an iterator of snark dicts{user,msg,date} from a parser.
+  This is the streaming counterpart to parse_snarks().
+
+  Parsers that offer an iter_snarks() function will yield
+  snarks as they're read. Others will be iterated after
+  fetch_snarks() has collected them all.
+
+  If the parser requires any subsystems, they will be init'd
+  immediately, but parsing errors might only be raised during
+  iteration.
+
+  :param keep_alive_func: Optional replacement to get an abort boolean.
+  :param sleep_func: Optional replacement to sleep N seconds.
+  :raises: ParserError, CompileSubsException
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  parser_mod = get_parser(config.parser_name)
+  init_subsystems(parser_mod.required_subsystems, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+
+  if (keep_alive_func() is False):
+    raise common.ParserError("Parsing was interrupted.")
+
+  if (hasattr(parser_mod, "iter_snarks")):
+    snarks = parser_mod.iter_snarks(config.src_path, config.first_msg, config.parser_options, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+  else:
+    snarks = parser_mod.fetch_snarks(config.src_path, config.first_msg, config.parser_options, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+
+  return iter(snarks)
+
+
+def peek_snarks(snarks):
+  """Checks whether an iterable of snarks is empty, without losing any.
+
+  :param snarks: An iterable of snark dicts (a one-pass iterator is fine).
+  :return: An equivalent iterator, or None if there were no snarks.
+  """
+  snarks = iter(snarks)
+  try:
+    first_snark = snarks.next()
+  except (StopIteration) as err:
+    return None
+  return itertools.chain([first_snark], snarks)
+
+
+def gui_preprocess_snarks(config, snarks):
+  """Performs initial processing of recently parsed snarks.
+
+  No early/late pruning takes place. The result will be
+  suitable for gui_fudge_users().
+
+  A "_globally fudged time" key will be added, representing
+  an in-movie offset from the first snark's "date", plus
+  any global fudging, but NOT user fudging. A "time" key
+  is also added with a similar value, but that may be
+  subject to user fudging later.
+
+  A boolean "_ignored" key will be added: True for any
+  snark that's from an ignored user or whose msg includes an
+  ignored regex, False otherwise.
+
+  No "color" is added.
+
+  This will modify the snarks list in-place.
+  """
+  if (vectorized.is_worthwhile(snarks)):
+    vectorized.gui_preprocess_snarks(config, snarks, get_filter_engine(config).flag)
+    return
+
+  # Sort the msgs by their real-world date.
+  _sort_snarks(snarks, "date")
+
+  # Add in-movie time info to them.
+  # These ascend with dates, so the msgs are already sorted by in-movie time.
+  for snark in snarks:
+    snark["_globally fudged time"] = snark["date"] - snarks[0]["date"] + config.fudge_time
+    snark["time"] = snark["date"] - snarks[0]["date"] + config.fudge_time
+
+  # Ignore users and regexes.
+  filter_engine = get_filter_engine(config)
+  for snark in snarks:
+    filter_engine.flag(snark)
+
+
+def gui_fudge_users(config, snarks):
+  """Sets snarks' "time", including global and user fudging.
+
+  If the "_globally fudged time" key is present,
+  some math will be bypassed. Otherwise, it will
+  be created using the offset since the first
+  snark's "date" and the config's global fudge.
+
+  That value will then be added to the config's
+  per-user fudges to set "time".
+
+  This will modify the snarks list in-place.
+  """
+  if (vectorized.is_worthwhile(snarks)):
+    vectorized.gui_fudge_users(config, snarks, get_fudge_index(config))
+    return
+
+  # Sort the msgs by their real-world date (to obtain the first snark).
+  _sort_snarks(snarks, "date")
+
+  fudge_index = get_fudge_index(config)
+  zero = timedelta(0)
+  fudge_runs = {}
+  for snark in snarks:
+    # Revert each snark's time to its globally fudged time.
+    if ("_globally fudged time" not in snark):
+      snark["_globally fudged time"] = snark["date"] - snarks[0]["date"] + config.fudge_time
+    snark["time"] = snark["_globally fudged time"]
+
+    # Find the user's delay from the recent past.
+    fudge_value = fudge_index.get_fudge(snark["user"], snark["time"], zero)
+    snark["time"] += fudge_value
+    fudge_runs.setdefault(fudge_value, []).append(snark)
+
+  # Sort the msgs by their in-movie time.
+  if (all(_is_sorted(run, "time") for run in fudge_runs.values())):
+    snarks[:] = _merge_fudge_runs(fudge_runs)
+  else:
+    # Some globally fudged times weren't in date order.
+    snarks[:] = sorted(snarks, key=operator.itemgetter("time"))
+
+
+def gui_postprocess_snarks(config, snarks):
+  """Performs remaining processing of snarks.
+  Any snark that's early or late will be removed.
+  Any snark with an "_ignored" key that's True
+  will be removed.
+
+  The result will be suitable for export_snarks().
+
+  If enabled in config, a "color" key is added,
+  an RGB float tuple (0.0-1.0), assigned randomly.
+
+  This will modify the snarks list in-place.
+  """
+  # In a single pass, omit ignored snarks, snarks that got shifted
+  # into negative times, and snarks beyond the end time, if set.
+  zero = timedelta(0)
+  snarks[:] = [x for x in snarks if (not ("_ignored" in x and x["_ignored"]) and x["time"] >= zero and
+                                     (config.end_time is None or x["time"] <= config.end_time))]
+
+  # Sort the msgs by their in-movie time.
+  _sort_snarks(snarks, "time")
+
+  # Assign unique colors, and paint each snark.
+  _paint_snarks(config, snarks)
+
+
+def process_snarks(config, snarks):
+  """Adds info to, and fudges, a list of recently parsed snarks.
+  Any snark that's early, late, or from an ignored user or regex
+  will be removed. The result will be suitable for export_snarks().
+
+  A "time" key will be added, representing an in-movie offset
+  from the first snark's "date", plus any global fudging,
+  plus any user fudging.
+
+  If enabled in config, "color" is added, an RGB float tuple
+  (0.0-1.0), assigned randomly.
+
+  This will modify the snarks list in-place.
+
+  Large lists are handled by the vectorized module, if NumPy
+  is available, with identical results.
+  """
+  with instrumentation.measure("process_snarks", snarks_in=len(snarks)) as stage:
+    _process_snarks(config, snarks)
+    stage.set_snarks_out(len(snarks))
+
+def _process_snarks(config, snarks):
+  """Does the work of process_snarks()."""
+  if (vectorized.is_worthwhile(snarks)):
+    vectorized.process_snarks(config, snarks, get_filter_engine(config).flag, get_fudge_index(config))
+
+    # Assign unique colors, and paint each snark.
+    _paint_snarks(config, snarks)
+    return
+
+  # Sort the msgs by their real-world date.
+  _sort_snarks(snarks, "date")
+
+  # In a single pass, add in-movie time info to them and omit unwanted ones.
+  fudge_index = get_fudge_index(config)
+  filter_engine = get_filter_engine(config)
+  first_date = (snarks[0]["date"] if (len(snarks) > 0) else None)
+  zero = timedelta(0)
+  fudge_runs = {}
+  for snark in snarks:
+    snark["time"] = snark["date"] - first_date + config.fudge_time
+
+    # Find the user's delay from the recent past.
+    fudge_value = fudge_index.get_fudge(snark["user"], snark["time"], zero)
+    snark["time"] += fudge_value
+
+    # Omit ignored users and regexes.
+    if (filter_engine.flag(snark)): continue
+
+    # Omit snarks that got shifted into negative times.
+    if (snark["time"] < zero): continue
+
+    # Omit snarks beyond the end time, if set.
+    if (config.end_time is not None and snark["time"] > config.end_time): continue
+
+    # Survivors that share a fudge amount remain in order by in-movie time.
+    fudge_runs.setdefault(fudge_value, []).append(snark)
+
+  # Sort the msgs by their in-movie time.
+  snarks[:] = _merge_fudge_runs(fudge_runs)
+
+  # Assign unique colors, and paint each snark.
+  _paint_snarks(config, snarks)
+
+
+def _is_sorted(snarks, key):
+  """Returns True if snarks are in ascending order by a key."""
+  values = map(operator.itemgetter(key), snarks)
+  return all(itertools.imap(operator.le, values, itertools.islice(values, 1, None)))
+
+def _sort_snarks(snarks, key):
+  """Stably sorts snarks in-place by a key, unless they're already in order."""
+  if (not _is_sorted(snarks, key)):
+    snarks[:] = sorted(snarks, key=operator.itemgetter(key))
+
+def _merge_fudge_runs(fudge_runs):
+  """Returns date-ordered snarks, stably sorted by "time".
+
+  Snarks sharing a fudge amount were shifted equally, so
+  each such run is already sorted. Runs with larger fudges
+  are laid end to end first (among equal times, those had
+  earlier dates), and a stable sort of that merges the
+  runs, since timsort finds and merges natural runs.
+
+  :param fudge_runs: A dict of fudge amounts to lists of snarks, in date order.
+  :return: A list.
+  """
+  if (len(fudge_runs) == 0): return []
+  if (len(fudge_runs) == 1): return fudge_runs.values()[0]
+
+  merged = []
+  for fudge_value in sorted(fudge_runs.keys(), reverse=True):
+    merged.extend(fudge_runs[fudge_value])
+  return sorted(merged, key=operator.itemgetter("time"))
+
+def _paint_snarks(config, snarks):
+  """Assigns unique colors to users and paints their snarks, if enabled in config."""
+  if (config.color_enabled == "random"):
+    unique_users = set(x["user"] for x in snarks)
+    unique_colors = get_random_colors(len(unique_users))
+    #write_palette_preview("./preview.html", unique_colors)
+
+    color_users = dict(zip(unique_users, unique_colors))
+    for snark in snarks:
+      snark["color"] = color_users[snark["user"]]
+  elif (config.color_enabled == "no"):
+    for snark in snarks:
+      if ("color" in snark): del snark["color"]
+
+
+def iter_processed_snarks(config, snarks, reorder_window=timedelta(minutes=5)):
+  """Adds info to, and fudges, a stream of recently parsed snarks.
+  This is the streaming counterpart to process_snarks(), built
+  as a chain of generator stages, so only a small window of
+  snarks is held in memory at once.
+
+  The result is identical to process_snarks(), with two caveats.
+  Snarks are expected to arrive roughly in order of their
+  real-world "date" (as in a log), within reorder_window of
+  each other. And random colors are assigned as each new user
+  appears, rather than all at once.
+
+  Unlike process_snarks(), the snarks are not modified
+  in-place. A new iterator is returned.
+
+  :param config: A config object.
+  :param snarks: An iterable of parsed snark dicts.
+  :param reorder_window: Timedelta of how far out of order snarks' dates may arrive.
+  :return: An iterator of processed snark dicts.
+  :raises: CompileSubsException, during iteration, if a snark was too far out of order.
+  """
+  snarks = _stream_by_date(snarks, reorder_window)
+  snarks = _stream_timed_survivors(config, snarks)
+  snarks = _stream_by_time(config, snarks)
+  snarks = _stream_colors(config, snarks)
+  return snarks
+
+def _stream_by_date(snarks, reorder_window):
+  """Yields snarks sorted by "date", from a nearly sorted stream.
+  Ties retain their original order.
+  """
+  heap = []
+  latest_date = None
+  released_date = None
+
+  for (n, snark) in enumerate(snarks):
+    if (released_date is not None and snark["date"] < released_date):
+      raise common.CompileSubsException("A snark's date arrived too far out of order for streaming (%s, after %s). Try again without streaming." % (snark["date"], released_date))
+
+    heapq.heappush(heap, (snark["date"], n, snark))
+    if (latest_date is None or snark["date"] > latest_date):
+      latest_date = snark["date"]
+
+    # Anything older than the window can't be preceded by future arrivals.
+    while (heap and heap[0][0] <= latest_date - reorder_window):
+      released_date = heap[0][0]
+      yield heapq.heappop(heap)[2]
+
+  while (heap):
+    yield heapq.heappop(heap)[2]
+
+def _stream_timed_survivors(config, snarks):
+  """Sets "time" on date-sorted snarks and omits unwanted ones.
+  Yields (globally fudged time, snark) tuples.
+  """
+  fudge_floor = _min_user_fudge(config)
+  fudge_index = get_fudge_index(config)
+  filter_engine = get_filter_engine(config)
+  first_date = None
+
+  for snark in snarks:
+    if (first_date is None): first_date = snark["date"]
+    global_time = snark["date"] - first_date + config.fudge_time
+    snark["time"] = global_time
+
+    # Find the user's delay from the recent past.
+    fudge_value = fudge_index.get_fudge(snark["user"], global_time)
+    if (fudge_value is not None):
+      snark["time"] += fudge_value
+
+    # Every later snark will be beyond the end time, too.
+    if (config.end_time is not None and global_time + fudge_floor > config.end_time):
+      break
+
+    # Ignore users and regexes.
+    if (filter_engine.flag(snark)): continue
+
+    # Omit snarks that got shifted into negative times.
+    if (abs(snark["time"]) != snark["time"]): continue
+
+    # Omit snarks beyond the end time, if set.
+    if (config.end_time is not None and snark["time"] > config.end_time): continue
+
+    yield (global_time, snark)
+
+def _stream_by_time(config, timed_snarks):
+  """Yields snarks sorted by "time", from (globally fudged time, snark) tuples.
+  Globally fudged times must be ascending. Ties retain their original order.
+  """
+  fudge_floor = _min_user_fudge(config)
+  heap = []
+
+  for (n, (global_time, snark)) in enumerate(timed_snarks):
+    heapq.heappush(heap, (snark["time"], n, snark))
+
+    # No later snark can be fudged earlier than this.
+    while (heap and heap[0][0] <= global_time + fudge_floor):
+      yield heapq.heappop(heap)[2]
+
+  while (heap):
+    yield heapq.heappop(heap)[2]
+
+def _stream_colors(config, snarks):
+  """Yields snarks, painted as each new user appears, if enabled in config."""
+  if (config.color_enabled == "random"):
+    unique_colors = get_random_colors(len([x for x in get_color_library() if (x["use"])]))
+    color_users = {}
+
+    for snark in snarks:
+      if (snark["user"] not in color_users):
+        color_users[snark["user"]] = unique_colors[len(color_users) % len(unique_colors)]
+      snark["color"] = color_users[snark["user"]]
+      yield snark
+
+  elif (config.color_enabled == "no"):
+    for snark in snarks:
+      if ("color" in snark): del snark["color"]
+      yield snark
+
+  else:
+    for snark in snarks:
+      yield snark
+
+def _min_user_fudge(config):
+  """Returns the most negative per-user fudge amount, or a zero timedelta."""
+  result = timedelta(0)
+  for fudge_list in config.fudge_users.values():
+    for (bookmark, fudge_value) in fudge_list:
+      result = min(result, fudge_value)
+  return result
+
+
+def export_snarks(config, snarks, keep_alive_func=None, sleep_func=None):
+  """Sends a list of processed snark dicts to an exporter.
+  The snarks must, at minimum, contain {user,msg,time}.
+
+  If the exporter's uses_dest_file attribute is True, it
+  writes into a temp file beside dest_path, which replaces
+  dest_path only if the exporter finishes. If interrupted,
+  or if it fails, the temp file is discarded and any
+  earlier dest file is left as it was. If dest_path ends
+  in ".gz", ".bz2" or ".xz", the output is compressed as
+  it's written (see lib.compression). Exporters also get
+  dest_path among their options, as "dest_path".
+
+  If snarks is a one-pass iterator, as from
+  iter_processed_snarks(), and the exporter's streams_snarks
+  attribute is True, the exporter will get that iterator.
+  Other exporters will get a list.
+
+  If config has export_targets, those exporters get the
+  same snarks (as a list), each in its own thread, so slow
+  uploads won't hold up local files. A failed target won't
+  stop the others. See get_export_targets().
+
+  If the exporter requires any subsystems, they will be init'd.
+
+  :raises: ExporterError, CompileSubsException
+  """
+  if (keep_alive_func is None): keep_alive_func = global_config.keeping_alive
+  if (sleep_func is None): sleep_func = global_config.nap
+
+  snarks_in = (len(snarks) if (iter(snarks) is not snarks) else None)
+  with instrumentation.measure("export_snarks", snarks_in=snarks_in):
+    targets = get_export_targets(config)
+    exporter_mods = [get_exporter(target.exporter_name) for target in targets]
+    for exporter_mod in exporter_mods:
+      init_subsystems(exporter_mod.required_subsystems, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+
+    if (keep_alive_func() is False):
+      raise common.ExporterError("Exporting was interrupted.")
+
+    if (len(targets) == 1):
+      _export_target(targets[0], exporter_mods[0], snarks, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+    else:
+      if (iter(snarks) is snarks):
+        snarks = list(snarks)  # Every target needs its own pass.
+      _export_targets_concurrently(targets, exporter_mods, snarks, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+
+
+def get_export_targets(config):
+  """Returns a list of Bunches{exporter_name,dest_path,exporter_options,show_time}.
+
+  The first is config's own exporter. Then one for each
+  dict in config.export_targets (if any), which must have
+  an "exporter_name", and may have "dest_path" and
+  "exporter_options" (overriding config's for that
+  target only).
+
+  :raises: ExporterError
+  """
+  targets = []
+  targets.append(common.Bunch(exporter_name=config.exporter_name, dest_path=config.dest_path,
+                              exporter_options=config.exporter_options, show_time=config.show_time))
+
+  for target in (getattr(config, "export_targets", None) or []):
+    if (not target.get("exporter_name")):
+      raise common.ExporterError("Every export target requires an \"exporter_name\".")
+
+    exporter_options = dict(config.exporter_options)
+    exporter_options.update(target.get("exporter_options") or {})
+    targets.append(common.Bunch(exporter_name=target["exporter_name"], dest_path=target.get("dest_path"),
+                                exporter_options=exporter_options, show_time=config.show_time))
+
+  return targets
+
+
+def _export_targets_concurrently(targets, exporter_mods, snarks, keep_alive_func, sleep_func):
+  """Exports to several targets at once, in separate threads.
+
+  :raises: ExporterError, if any target failed (after all have finished).
+  """
+  outer_stages = instrumentation.get_active_stages()
+  errors = [None] * len(targets)
+
+  def export_target(i):
+    instrumentation.adopt_stages(outer_stages)
+    try:
+      _export_target(targets[i], exporter_mods[i], snarks, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+    except (common.CompileSubsException) as err:
+      errors[i] = err
+    except (Exception) as err:
+      logging.exception(err)
+      errors[i] = err
+
+  threads = []
+  for i in range(len(targets)):
+    t = threading.Thread(target=export_target, args=(i,), name="Exporter-%d-%s" % (i, targets[i].exporter_name))
+    t.daemon = True
+    threads.append(t)
+    t.start()
+
+  for t in threads:
+    while (t.isAlive()):
+      t.join(1)  # A timeout lets the main thread notice Ctrl-C.
+
+  failed_names = []
+  for (target, err) in zip(targets, errors):
+    if (err is None):
+      logging.info("The %s exporter finished." % target.exporter_name)
+    else:
+      logging.error("The %s exporter failed: %s" % (target.exporter_name, str(err)))
+      failed_names.append(target.exporter_name)
+
+  if (len(failed_names) > 0):
+    raise common.ExporterError("Exporters failed: %s" % ", ".join(failed_names))
+
+
+def _export_target(target, exporter_mod, snarks, keep_alive_func, sleep_func):
+  """Writes snarks with one exporter (see export_snarks()).
+
+  :param target: A config, or a Bunch from get_export_targets().
+  :raises: ExporterError, CompileSubsException
+  """
+  if (iter(snarks) is snarks and not getattr(exporter_mod, "streams_snarks", False)):
+    snarks = list(snarks)  # This exporter needs the whole list.
+
+  if (not (target.dest_path and exporter_mod.uses_dest_file)):
+    # The exporter sends its output elsewhere, or nowhere.
+    with contextlib.closing(StringIO.StringIO()) as buf:
+      _write_snarks(target, exporter_mod, buf, snarks, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+
+    if (keep_alive_func() is False):
+      raise common.ExporterError("Exporting was interrupted.")
+    return
+
+  # Write into a temp file beside the destination, which replaces
+  # it only if the exporter finishes without being interrupted.
+  try:
+    with common.atomic_write(target.dest_path, buffer_size=dest_buffer_size) as dest_file:
+      codec = compression.get_codec(target.dest_path)
+      if (codec):
+        with compression.CompressedWriter(dest_file, codec) as compressed_file:
+          _write_snarks(target, exporter_mod, compressed_file, snarks, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+      else:
+        _write_snarks(target, exporter_mod, dest_file, snarks, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+
+      if (keep_alive_func() is False):
+        raise common.ExporterError("Exporting was interrupted.")
+
+  except (IOError, OSError) as err:
+    raise common.ExporterError("Could not write %s: %s" % (target.dest_path, str(err)))
+
+
+def _write_snarks(target, exporter_mod, dest_file, snarks, keep_alive_func, sleep_func):
+  """Calls an exporter's write_snarks(), counting bytes written, if instrumented."""
+  snarks_in = (len(snarks) if (iter(snarks) is not snarks) else None)
+  options = dict(target.exporter_options)
+  options["dest_path"] = target.dest_path  # For exporters that write files beside it.
+  with instrumentation.measure("%s.write_snarks" % target.exporter_name, snarks_in=snarks_in):
+    exporter_mod.write_snarks(instrumentation.writer(dest_file), snarks, target.show_time, options, keep_alive_func=keep_alive_func, sleep_func=sleep_func)
+
+
+def list_parsers():
+  """Returns a list of parser module names."""
+  import lib.parsers
+  result = [name for (module_loader, name, ispkg)
+            in pkgutil.iter_modules(path=lib.parsers.__path__)
+            if (not ispkg and name != "example_stub")]
+  return result
+
+def list_exporters():
+  """Returns a list of exporter module names."""
+  import lib.exporters
+  result = [name for (module_loader, name, ispkg)
+            in pkgutil.iter_modules(path=lib.exporters.__path__)
+            if (not ispkg and name != "example_stub")]
+  return result
+
+
+def set_color_library(new_library):
+  """Replaces the current color library."""
+  global color_library
+  color_library = new_library
+
+def get_color_library():
+  """Returns a copy of the current color library."""
+  global color_library
+  return color_library[:]
+
+def get_random_colors(count):
+  """Gets a list of arbitrary colors.
+   I had a fancy HSV randomizer with the colorsys module,
+   but it was hit and miss. So now there's a prefab list.
+     http://jsfiddle.net/k8NC2/1/
+     http://stackoverflow.com/questions/470690/how-to-automatically-generate-n-distinct-colors
+
+  :param count: The number of colors needed (too many, and you'll get white).
+  :return: A list of RGB float tuples (0.0-1.0).
+  """
+  colors = [x for x in get_color_library() if (x["use"])]
+  random.shuffle(colors)
+  colors *= (count // len(colors)) + 1
+
+  result = [common.hex_to_rgb(x["hex"]) for x in colors[:count]]
+
+  return result
+
+
+def write_palette_preview(path, unique_colors):
+  """Dumps colors to a sanity-preserving html file for eyeballing.
+  A relic from debugging random palettes.
+
+  :param path: A file path to write to.
+  :param unique_colors: A list of RGB float tuples.
+  """
+  out_file = open(path, 'w')
+  out_file.write("<html><body>\n");
+  for color in unique_colors:
+    out_file.write("<font color=\"#%s\"><b>#########</b></font><br />\n" % (common.rgb_to_hex(color)));
+  out_file.write("</body></html>");
+  out_file.close()
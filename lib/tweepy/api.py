@@ -8,6 +8,7 @@ import mimetypes
 from tweepy.binder import bind_api
 from tweepy.error import TweepError
 from tweepy.parsers import ModelParser
+from tweepy.pool import ConnectionPool
 from tweepy.utils import list_to_csv
 
 
@@ -18,7 +19,7 @@ class API(object):
             host='api.twitter.com', search_host='search.twitter.com',
              cache=None, secure=True, api_root='/1.1', search_root='',
             retry_count=0, retry_delay=0, retry_errors=None, timeout=60,
-            parser=None, compression=False):
+            parser=None, compression=False, pool=None):
         self.auth = auth_handler
         self.host = host
         self.search_host = search_host
@@ -32,6 +33,7 @@ class API(object):
         self.retry_errors = retry_errors
         self.timeout = timeout
         self.parser = parser or ModelParser()
+        self.pool = pool or ConnectionPool(timeout=timeout)
 
     """ statuses/home_timeline """
     home_timeline = bind_api(
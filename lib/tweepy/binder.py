@@ -3,6 +3,7 @@
 # See LICENSE for details.
 
 import httplib
+import socket
 import urllib
 import time
 import re
@@ -127,14 +128,9 @@ def bind_api(**config):
 
             # Continue attempting request until successful
             # or maximum number of retries is reached.
+            pool = self.api.pool
             retries_performed = 0
             while retries_performed < self.retry_count + 1:
-                # Open connection
-                if self.api.secure:
-                    conn = httplib.HTTPSConnection(self.host, timeout=self.api.timeout)
-                else:
-                    conn = httplib.HTTPConnection(self.host, timeout=self.api.timeout)
-
                 # Apply authentication
                 if self.api.auth:
                     self.api.auth.apply_auth(
@@ -146,12 +142,23 @@ def bind_api(**config):
                 if self.api.compression:
                     self.headers['Accept-encoding'] = 'gzip'
 
-                # Execute request
-                try:
-                    conn.request(self.method, url, headers=self.headers, body=self.post_data)
-                    resp = conn.getresponse()
-                except Exception, e:
-                    raise TweepError('Failed to send request: %s' % e)
+                # Execute request, on a kept-alive connection if possible.
+                while True:
+                    conn, reused = pool.get(self.api.secure, self.host)
+                    sent = False
+                    try:
+                        conn.request(self.method, url, headers=self.headers, body=self.post_data)
+                        sent = True
+                        resp = conn.getresponse()
+                        break
+                    except Exception, e:
+                        pool.discard(conn)
+                        # The server may have closed an idle connection. Try another,
+                        # unless it may have already acted on a non-idempotent request.
+                        if reused and isinstance(e, (httplib.HTTPException, socket.error)) and not isinstance(e, socket.timeout):
+                            if not sent or self.method in ('GET', 'HEAD'):
+                                continue
+                        raise TweepError('Failed to send request: %s' % e)
 
                 # Exit request loop if non-retry error code
                 if self.retry_errors:
@@ -159,21 +166,38 @@ def bind_api(**config):
                 else:
                     if resp.status == 200: break
 
+                # Keep the last response, if there are no retries left
+                if retries_performed == self.retry_count: break
+
+                # Finish the response, so the connection can be reused
+                try:
+                    resp.read()
+                    pool.release(conn, self.api.secure, self.host, resp)
+                except Exception:
+                    pool.discard(conn)
+
                 # Sleep before retrying request again
                 time.sleep(self.retry_delay)
                 retries_performed += 1
 
-            # If an error was returned, throw an exception
+            # Read the response, then return the connection to the pool
             self.api.last_response = resp
+            try:
+                body = resp.read()
+            except Exception, e:
+                pool.discard(conn)
+                raise TweepError('Failed to read response: %s' % e)
+            pool.release(conn, self.api.secure, self.host, resp)
+
+            # If an error was returned, throw an exception
             if resp.status != 200:
                 try:
-                    error_msg = self.api.parser.parse_error(resp.read())
+                    error_msg = self.api.parser.parse_error(body)
                 except Exception:
                     error_msg = "Twitter error response: status code = %s" % resp.status
                 raise TweepError(error_msg, resp)
 
             # Parse the response payload
-            body = resp.read()
             if resp.getheader('Content-Encoding', '') == 'gzip':
                 try:
                     zipper = gzip.GzipFile(fileobj=StringIO(body))
@@ -182,8 +206,6 @@ def bind_api(**config):
                     raise TweepError('Failed to decompress data: %s' % e)
             result = self.api.parser.parse(self, body)
 
-            conn.close()
-
             # Store result into cache if one is available.
             if self.use_cache and self.api.cache and self.method == 'GET' and result:
                 self.api.cache.store(url, result)
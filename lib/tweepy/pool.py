@@ -0,0 +1,94 @@
+# Tweepy
+# Copyright 2009-2010 Joshua Roesslein
+# See LICENSE for details.
+
+import httplib
+import threading
+import time
+
+
+class ConnectionPool(object):
+    """
+    Keeps idle HTTP(S) connections open per host, so requests
+    can skip the TCP and TLS handshakes of a new connection.
+
+    A connection is only used by one caller at a time: get()
+    checks it out, and release() returns it once its response
+    has been read. Safe to share between threads.
+    """
+
+    def __init__(self, timeout=60, max_idle=4, max_idle_seconds=30, ssl_context=None):
+        """
+        timeout: Socket timeout for new connections, in seconds.
+        max_idle: Connections to keep per host (0 disables reuse).
+        max_idle_seconds: Idle connections older than this are
+            closed rather than reused, since servers drop them.
+        ssl_context: Optional ssl.SSLContext for https connections.
+        """
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_idle_seconds = max_idle_seconds
+        self.ssl_context = ssl_context
+        self._idle = {}  # (secure, host) -> [(conn, released_time), ...], oldest first
+        self._lock = threading.Lock()
+
+    def get(self, secure, host):
+        """
+        Returns a (connection, reused) tuple. Reused connections
+        may turn out to have been closed by the server.
+        """
+        now = time.time()
+        conn = None
+        with self._lock:
+            idle = self._idle.get((secure, host), [])
+            # Oldest first, so everything before the first
+            # fresh connection is stale.
+            fresh_index = 0
+            while fresh_index < len(idle) and now - idle[fresh_index][1] >= self.max_idle_seconds:
+                fresh_index += 1
+            stale = [c for (c, t) in idle[:fresh_index]]
+            del idle[:fresh_index]
+            if idle:
+                conn = idle.pop()[0]
+
+        for c in stale:
+            c.close()
+        if conn is not None:
+            return conn, True
+        return self._new_connection(secure, host), False
+
+    def _new_connection(self, secure, host):
+        if not secure:
+            return httplib.HTTPConnection(host, timeout=self.timeout)
+        if self.ssl_context is not None:
+            return httplib.HTTPSConnection(host, timeout=self.timeout, context=self.ssl_context)
+        return httplib.HTTPSConnection(host, timeout=self.timeout)
+
+    def release(self, conn, secure, host, resp=None):
+        """
+        Returns a connection to the pool, once its response
+        (if any) has been read. It's closed instead if the
+        server won't keep it alive, or enough are idle.
+        """
+        if (resp is not None and not resp.isclosed()) or conn.sock is None:
+            conn.close()
+            return
+        with self._lock:
+            idle = self._idle.setdefault((secure, host), [])
+            if len(idle) < self.max_idle:
+                idle.append((conn, time.time()))
+                return
+        conn.close()
+
+    def discard(self, conn):
+        """Closes a connection that can't be reused."""
+        conn.close()
+
+    def close_all(self):
+        """Closes every idle connection."""
+        with self._lock:
+            idle_lists = self._idle.values()
+            self._idle = {}
+        for idle in idle_lists:
+            for (conn, released_time) in idle:
+                conn.close()
@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta
+import hashlib
+import logging
+import os
+import zlib
+
+try:
+  import cPickle as pickle
+except (ImportError) as err:
+  import pickle
+
+from lib import global_config
+
+
+# Subdir of the settings dir, for checkpoints.
+checkpoint_dir_name = "twitter_checkpoints"
+
+# Version of the pickled checkpoint dicts. Others are ignored.
+format_version = 1
+
+# Tweets to keep per checkpoint. Older ones are dropped.
+max_tweets = 20000
+
+# Suffix of checkpoint files.
+_entry_ext = ".tweets"
+
+
+class Checkpoint(object):
+  """The tweets a Twitter parser has already fetched for an
+  account or query, so later runs can ask for newer ones.
+
+  Every tweet from complete_since up to the highest id is
+  present (older ones may be missing).
+  """
+
+  def __init__(self, key, tweets, complete_since):
+    """Constructor.
+
+    :param key: A string naming the account/query.
+    :param tweets: A dict of tweet ids to snark dicts.
+    :param complete_since: UTC Datetime, or None if tweets reach back to the start.
+    """
+    object.__init__(self)
+    self.key = key
+    self.tweets = tweets
+    self.complete_since = complete_since
+
+  def get_max_id(self):
+    """Returns the highest tweet id, or None."""
+    return (max(self.tweets) if (self.tweets) else None)
+
+  def covers(self, since_date):
+    """Returns True if every tweet since a date is present."""
+    if (self.complete_since is None): return True
+    return (since_date is not None and since_date >= self.complete_since)
+
+  def get_tweets(self):
+    """Returns a list of (tweet id, snark) tuples, newest first."""
+    return [(x, self.tweets[x]) for x in sorted(self.tweets, reverse=True)]
+
+
+def get_checkpoint_dir():
+  return os.path.join(global_config.get_settings_dir(), checkpoint_dir_name)
+
+def _get_entry_path(key):
+  if (isinstance(key, unicode)): key = key.encode("utf-8")
+  return os.path.join(get_checkpoint_dir(), hashlib.sha1(key).hexdigest() + _entry_ext)
+
+
+def load(key):
+  """Returns a saved Checkpoint, or None."""
+  entry_path = _get_entry_path(key)
+  if (not os.path.isfile(entry_path)): return None
+
+  try:
+    with open(entry_path, "rb") as f:
+      entry = pickle.loads(zlib.decompress(f.read()))
+    if (entry.get("version") != format_version or entry.get("key") != key):
+      return None
+    return Checkpoint(key, entry["tweets"], entry["complete_since"])
+
+  except (Exception) as err:
+    logging.error("Could not load Twitter checkpoint %s: %s" % (entry_path, str(err)))
+
+  return None
+
+
+def save(checkpoint):
+  """Saves a Checkpoint, replacing any with the same key.
+
+  :return: True if successful, False otherwise.
+  """
+  checkpoint_dir = get_checkpoint_dir()
+  entry_path = _get_entry_path(checkpoint.key)
+  try:
+    entry = {"version":format_version, "key":checkpoint.key,
+             "complete_since":checkpoint.complete_since, "tweets":checkpoint.tweets}
+    data = zlib.compress(pickle.dumps(entry, pickle.HIGHEST_PROTOCOL), 1)
+
+    if (not os.path.isdir(checkpoint_dir)): os.makedirs(checkpoint_dir)
+
+    with open(entry_path +".tmp", "wb") as f:
+      f.write(data)
+    if (os.path.exists(entry_path)): os.remove(entry_path)
+    os.rename(entry_path +".tmp", entry_path)
+    return True
+
+  except (Exception) as err:
+    logging.error("Could not save Twitter checkpoint %s: %s" % (entry_path, str(err)))
+    try:
+      if (os.path.exists(entry_path +".tmp")): os.remove(entry_path +".tmp")
+    except (OSError) as err:
+      pass
+
+  return False
+
+
+def merge(key, checkpoint, fetched, walk_end, since_date):
+  """Combines newly fetched tweets with a checkpoint's.
+
+  :param key: A string naming the account/query.
+  :param checkpoint: The Checkpoint the fetching started from, or None.
+  :param fetched: A list of (tweet id, snark) tuples, newest first.
+  :param walk_end: How fetching ended: "end" if it reached the
+                   checkpoint's tweets (or the oldest available),
+                   "since" if it reached since_date, or None if
+                   it was cut short.
+  :param since_date: UTC Datetime older tweets were skipped from, or None.
+  :return: A new Checkpoint, or None if nothing was fetched.
+  """
+  tweets = {}
+  if (checkpoint is not None): tweets.update(checkpoint.tweets)
+  tweets.update(fetched)
+  if (not tweets): return None
+
+  if (walk_end == "end"):
+    complete_since = (checkpoint.complete_since if (checkpoint is not None) else None)
+  elif (walk_end == "since"):
+    complete_since = since_date
+  elif (fetched):
+    # Tweets past the gap are kept, but not trusted. Unfetched
+    # ones may share the oldest fetched one's second.
+    complete_since = fetched[-1][1]["date"] + timedelta(seconds=1)
+  else:
+    return checkpoint
+
+  # Runs needing older tweets than this one would refetch anyway.
+  if (since_date is not None):
+    if (complete_since is None or complete_since < since_date):
+      complete_since = since_date
+    tweets = dict((k, v) for (k, v) in tweets.iteritems() if (v["date"] >= since_date))
+  if (len(tweets) > max_tweets):
+    tweets = dict((k, tweets[k]) for k in sorted(tweets, reverse=True)[:max_tweets])
+    # Dropped tweets may share the oldest kept one's second.
+    complete_since = min(v["date"] for v in tweets.itervalues()) + timedelta(seconds=1)
+
+  return Checkpoint(key, tweets, complete_since)
@@ -0,0 +1,203 @@
+from datetime import datetime, timedelta
+import itertools
+import operator
+
+try:
+  import numpy
+except (ImportError) as err:
+  numpy = None
+
+from lib import snarktable
+
+
+# Set this False to always use snarkutils' pure-Python code.
+enabled = True
+
+# Below this many snark dicts, array setup costs more than it
+# saves (see bench/bench_process.py). Even above it, lists of
+# dicts only break even, since reading and storing their times
+# dominates.
+min_snarks = 100000
+
+# Likewise for SnarkTables, whose compact columns are read and
+# stored in bulk, so they gain from much smaller sizes.
+min_table_snarks = 2000
+
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def is_available():
+  """Returns True if NumPy was importable, False otherwise."""
+  return (numpy is not None)
+
+def is_worthwhile(snarks):
+  """Returns True if a snarks list (or SnarkTable) should be processed with NumPy."""
+  if (not enabled or numpy is None): return False
+  threshold = (min_table_snarks if (isinstance(snarks, snarktable.SnarkTable)) else min_snarks)
+  return (len(snarks) >= threshold)
+
+
+def delta_us(delta):
+  """Returns the total microseconds in a timedelta, as an int."""
+  return ((delta.days*24*3600 + delta.seconds) * 1000000 + delta.microseconds)
+
+
+def process_snarks(config, snarks, is_ignored, fudge_index):
+  """Does the work of snarkutils.process_snarks(), except coloring.
+  Global offsets, per-user fudges, pruning, and sorting are all
+  computed on int64 microsecond arrays.
+
+  :param config: A config object.
+  :param snarks: A list of recently parsed snark dicts (or a SnarkTable), modified in-place.
+  :param is_ignored: A function that takes a snark and returns a boolean.
+  :param fudge_index: A snarkutils.FudgeIndex for the config.
+  """
+  global_times, global_deltas = _global_times(config, snarks)
+  times, time_deltas = _fudged_times(fudge_index, snarks, global_times, global_deltas)
+  _store_times(snarks, "time", times, time_deltas)
+
+  keep = ~numpy.fromiter(itertools.imap(is_ignored, snarks), dtype=numpy.bool_, count=len(snarks))
+  keep &= (times >= 0)
+  if (config.end_time is not None):
+    keep &= (times <= delta_us(config.end_time))
+
+  # Globally fudged times ascend with dates, so sort by those first.
+  date_order = numpy.argsort(global_times, kind="mergesort")
+  kept_order = date_order[keep[date_order]]
+  final_order = kept_order[numpy.argsort(times[kept_order], kind="mergesort")]
+  snarks[:] = map(snarks.__getitem__, final_order.tolist())
+
+def gui_preprocess_snarks(config, snarks, is_ignored):
+  """Does the work of snarkutils.gui_preprocess_snarks().
+
+  :param config: A config object.
+  :param snarks: A list of recently parsed snark dicts (or a SnarkTable), modified in-place.
+  :param is_ignored: A function that takes a snark and returns a boolean.
+  """
+  global_times, global_deltas = _global_times(config, snarks)
+  if (global_deltas is None): global_deltas = _timedelta_list(global_times)
+  _store_times(snarks, "_globally fudged time", global_times, global_deltas)
+  _store_times(snarks, "time", global_times, global_deltas)
+
+  # Globally fudged times ascend with dates, so date order is time order.
+  date_order = numpy.argsort(global_times, kind="mergesort")
+  snarks[:] = map(snarks.__getitem__, date_order.tolist())
+
+  for snark in snarks:
+    is_ignored(snark)
+
+def gui_fudge_users(config, snarks, fudge_index):
+  """Does the work of snarkutils.gui_fudge_users().
+
+  :param config: A config object.
+  :param snarks: A list of snark dicts (or a SnarkTable), modified in-place.
+  :param fudge_index: A snarkutils.FudgeIndex for the config.
+  """
+  date_times, date_deltas = _global_times(config, snarks)
+  date_order = numpy.argsort(date_times, kind="mergesort")
+
+  # Prefer any existing globally fudged times.
+  seconds = (snarks.get_seconds("_globally fudged time") if (isinstance(snarks, snarktable.SnarkTable)) else None)
+  if (seconds is not None):
+    global_times = numpy.asarray(seconds).astype(numpy.int64) * 1000000
+    global_deltas = None
+  else:
+    if (date_deltas is None): date_deltas = _timedelta_list(date_times)
+    global_deltas = []
+    for (snark, t) in itertools.izip(snarks, date_deltas):
+      if ("_globally fudged time" not in snark):
+        snark["_globally fudged time"] = t
+      global_deltas.append(snark["_globally fudged time"])
+    global_times = _us_array(global_deltas)
+
+  times, time_deltas = _fudged_times(fudge_index, snarks, global_times, global_deltas)
+  _store_times(snarks, "time", times, time_deltas)
+
+  final_order = date_order[numpy.argsort(times[date_order], kind="mergesort")]
+  snarks[:] = map(snarks.__getitem__, final_order.tolist())
+
+
+def _global_times(config, snarks):
+  """Returns each snark's offset from the earliest "date", plus the global fudge.
+
+  :return: A tuple: an int64 array of microseconds, and a list of equal timedeltas (or None, for a SnarkTable whose dates are all compact).
+  """
+  if (isinstance(snarks, snarktable.SnarkTable)):
+    seconds = snarks.get_seconds("date")
+    if (seconds is not None):
+      seconds = numpy.asarray(seconds).astype(numpy.int64)
+      return ((seconds - seconds.min()) * 1000000 + delta_us(config.fudge_time), None)
+
+  # Object arrays do datetime math in C, far faster than datetime64 conversion.
+  dates = map(operator.itemgetter("date"), snarks)
+  deltas = ((numpy.array(dates, dtype=object) - min(dates)) + config.fudge_time).tolist()
+  return (_us_array(deltas), deltas)
+
+def _fudged_times(fudge_index, snarks, global_times, global_deltas):
+  """Returns each snark's globally fudged time, plus any per-user fudge.
+
+  :param fudge_index: A snarkutils.FudgeIndex.
+  :param global_times: An int64 array of globally fudged times, in microseconds.
+  :param global_deltas: A list of equal timedeltas, or None.
+  :return: A tuple: an int64 array of microseconds, and a list of equal timedeltas (or None, if global_deltas was).
+  """
+  users = fudge_index.get_users()
+  if (not users): return (global_times, global_deltas)
+
+  times = global_times.copy()
+  time_deltas = (numpy.array(global_deltas, dtype=object) if (global_deltas is not None) else None)
+
+  codes_and_lookup = (snarks.get_codes("user") if (isinstance(snarks, snarktable.SnarkTable)) else None)
+  if (codes_and_lookup is not None):
+    codes = numpy.asarray(codes_and_lookup[0]).astype(numpy.int64)
+    user_codes = codes_and_lookup[1]
+  else:
+    user_codes = dict((user, n) for (n, user) in enumerate(users))
+    codes = numpy.array(map(user_codes.get, map(operator.itemgetter("user"), snarks), itertools.repeat(-1, len(snarks))), dtype=numpy.int64)
+
+  for user in users:
+    if (user not in user_codes): continue
+    bookmark_deltas, amount_deltas = fudge_index.get_entries(user)
+    bookmarks = numpy.array([delta_us(x) for x in bookmark_deltas], dtype=numpy.int64)
+    amounts = numpy.array([delta_us(x) for x in amount_deltas], dtype=numpy.int64)
+    amount_deltas = numpy.array(amount_deltas, dtype=object)
+
+    # Find the latest bookmark each snark has passed.
+    user_indices = numpy.flatnonzero(codes == user_codes[user])
+    positions = numpy.searchsorted(bookmarks, global_times[user_indices], side="right") - 1
+    passed = (positions >= 0)
+    user_indices, positions = user_indices[passed], positions[passed]
+
+    times[user_indices] += amounts[positions]
+    if (time_deltas is not None):
+      time_deltas[user_indices] += amount_deltas[positions]
+
+  return (times, (time_deltas.tolist() if (time_deltas is not None) else None))
+
+def _store_times(snarks, key, times, time_deltas):
+  """Sets a timedelta value on every snark.
+
+  :param key: The snark key to set.
+  :param times: An int64 array of microseconds.
+  :param time_deltas: A list of equal timedeltas, or None to create them as needed.
+  """
+  if (isinstance(snarks, snarktable.SnarkTable) and not (times % 1000000).any()):
+    seconds = times // 1000000
+    if (seconds.size == 0 or abs(seconds).max() < -snarktable.MISSING):
+      snarks.set_seconds(key, seconds.tolist())
+      return
+
+  if (time_deltas is None): time_deltas = _timedelta_list(times)
+  for (snark, t) in itertools.izip(snarks, time_deltas):
+    snark[key] = t
+
+def _us_array(deltas):
+  """Returns an int64 array of microseconds from a list of timedeltas.
+  Float seconds keep microsecond precision for spans up to a few centuries.
+  """
+  seconds = numpy.array(map(timedelta.total_seconds, deltas), dtype=numpy.float64)
+  return numpy.rint(seconds * 1000000).astype(numpy.int64)
+
+def _timedelta_list(us_array):
+  """Returns a list of timedeltas from an int64 array of microseconds."""
+  return (us_array.astype(object) * _ONE_MICROSECOND).tolist()